@@ -0,0 +1,156 @@
+import fs from 'fs';
+import path from 'path';
+import { spawn } from 'child_process';
+import { fileURLToPath } from 'url';
+import { EVENT_PREFIX } from './events.js';
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+/**
+ * Read a job's result.json written by grok-automation.js
+ * @param {string} manifestPath - Path from the job-completed / job-failed event
+ * @returns {Object|null} Manifest, or null when missing or unreadable
+ */
+export function readManifest(manifestPath) {
+    if (!manifestPath) return null;
+    try {
+        return JSON.parse(fs.readFileSync(manifestPath, 'utf-8'));
+    } catch (error) {
+        return null;
+    }
+}
+
+/**
+ * Long-lived `grok-automation.js --serve` process bound to one CDP port.
+ * The browser connection stays open between jobs; each job is one JSON line
+ * on stdin and finishes with a job-completed / job-failed event on stdout.
+ */
+export class AutomationWorker {
+    /**
+     * @param {Object} options - { port, downloadDir, uploadRegistry, waitProfile, maxInflight, onLine(line, event) }
+     */
+    constructor(options) {
+        this.port = options.port || 9222;
+        this.downloadDir = options.downloadDir || path.join(__dirname, 'downloads');
+        this.uploadRegistry = options.uploadRegistry || null; // Default: <downloadDir>/upload-registry.json
+        this.waitProfile = options.waitProfile || 'fast';
+        this.maxInflight = options.maxInflight || 1; // Jobs the process runs at once, one tab each
+        this.onLine = options.onLine || (() => { });
+        this.process = null;
+        this.pending = new Map(); // jobId -> { resolve, reject }
+        this.nextJobId = 1;
+    }
+
+    start() {
+        if (this.process) return;
+
+        const args = [
+            'grok-automation.js', '--serve',
+            '--port', String(this.port),
+            '--download-dir', this.downloadDir,
+            '--wait-profile', this.waitProfile,
+            '--max-inflight', String(this.maxInflight)
+        ];
+        if (this.uploadRegistry) args.push('--upload-registry', this.uploadRegistry);
+
+        const child = spawn('node', args, {
+            cwd: __dirname,
+            stdio: ['pipe', 'pipe', 'pipe'],
+            // Own process group: Ctrl+C in the terminal reaches only the batch,
+            // which drains and then ends the worker through stop() / kill()
+            detached: true,
+            windowsHide: true
+        });
+        this.process = child;
+
+        let partialLine = '';
+        child.stdout.on('data', (data) => {
+            const lines = (partialLine + data.toString()).split('\n');
+            partialLine = lines.pop();
+            lines.forEach(line => this.handleLine(line));
+        });
+
+        child.stderr.on('data', (data) => {
+            process.stderr.write(data);
+        });
+
+        const failPending = (reason) => {
+            if (this.process === child) this.process = null;
+            for (const { reject } of this.pending.values()) {
+                reject(new Error(reason));
+            }
+            this.pending.clear();
+        };
+
+        child.on('close', (code) => failPending(`Automation worker exited with code ${code}`));
+        child.on('error', (err) => failPending(err.message));
+    }
+
+    handleLine(line) {
+        if (!line.startsWith(EVENT_PREFIX)) {
+            this.onLine(line, null);
+            return;
+        }
+
+        let event;
+        try {
+            event = JSON.parse(line.slice(EVENT_PREFIX.length));
+        } catch (e) {
+            this.onLine(line, null);
+            return;
+        }
+
+        this.onLine(line, event);
+
+        const waiter = this.pending.get(event.jobId);
+        if (!waiter) return;
+
+        if (event.type !== 'job-completed' && event.type !== 'job-failed') return;
+        this.pending.delete(event.jobId);
+
+        // The job's result.json is authoritative; the event only says where it is
+        const manifest = readManifest(event.manifestPath);
+        if (manifest && manifest.status === 'completed') {
+            waiter.resolve(manifest);
+        } else {
+            const reason = manifest ? manifest.reason : event.reason;
+            const error = new Error(reason || `No result manifest at ${event.manifestPath}`);
+            error.manifest = manifest; // Failed jobs still carry stage timings
+            waiter.reject(error);
+        }
+    }
+
+    /**
+     * Run one job on the warm browser
+     * @param {Object} job - { sceneNumber, prompt, imagePath, duration, resolution, ... }
+     * @returns {Promise<Object>} The job's result.json manifest ({ videoPath, bytes, ... })
+     */
+    runJob(job) {
+        this.start();
+        const jobId = this.nextJobId++;
+
+        return new Promise((resolve, reject) => {
+            this.pending.set(jobId, { resolve, reject });
+            this.process.stdin.write(JSON.stringify({ ...job, jobId }) + '\n');
+        });
+    }
+
+    /**
+     * Let the worker finish and exit (Chrome stays open)
+     */
+    stop() {
+        if (this.process) {
+            this.process.stdin.end();
+        }
+    }
+
+    /**
+     * Kill the worker immediately, failing any running job
+     */
+    kill() {
+        if (this.process) {
+            this.process.kill();
+        }
+    }
+}
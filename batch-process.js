@@ -1,9 +1,16 @@
 import fs from 'fs';
 import path from 'path';
-import { spawn } from 'child_process';
+import readline from 'readline';
 import { fileURLToPath } from 'url';
 import { parseScriptFile, filterScenes } from './parse-script.js';
 import { generateImagePathMap } from './match-images.js';
+import { emitEvent, eventsEnabled } from './events.js';
+import { AutomationWorker } from './automation-worker.js';
+import { ProgressJournal } from './progress-journal.js';
+import { Pacer } from './pacing.js';
+import { LatencyReport } from './latency.js';
+import { ResultCache, resultKey } from './result-cache.js';
+import { RetryPolicy } from './retry-policy.js';
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
@@ -15,8 +22,15 @@ const DEFAULT_CONFIG = {
     duration: '6s',
     resolution: '720p',
     skipCompleted: true,
-    delayBetweenScenes: 30, // seconds
-    maxRetries: 2
+    delayBetweenScenes: 30, // seconds, starting pace between scene starts
+    minDelay: 5, // seconds, fastest pace while scenes keep succeeding
+    maxDelay: 300, // seconds, slowest pace while backing off from throttling
+    maxRetries: 2, // retries per scene; which failures are retried is up to retry-policy.js
+    maxInflight: 1, // scenes submitted on the account while earlier ones still generate
+    useResultCache: true, // reuse videos already generated for the same prompt/image/settings
+    port: 9222, // CDP port of the Chrome used by the automation worker
+    uploadRegistry: null, // upload registry file; default downloads/port-<port>/upload-registry.json
+    waitProfile: 'fast' // 'conservative' keeps fixed pauses between UI steps
 };
 
 /**
@@ -32,28 +46,12 @@ class ProgressTracker {
         fs.mkdirSync(path.dirname(this.progressFile), { recursive: true });
         fs.mkdirSync(path.dirname(this.logFile), { recursive: true });
 
-        this.data = this.load();
+        // Replays snapshot + journal, so a crashed run resumes where it stopped
+        this.journal = new ProgressJournal(this.progressFile);
     }
 
-    load() {
-        if (fs.existsSync(this.progressFile)) {
-            return JSON.parse(fs.readFileSync(this.progressFile, 'utf-8'));
-        }
-
-        return {
-            totalScenes: 0,
-            completed: [],
-            failed: [],
-            pending: [],
-            currentScene: null,
-            startedAt: new Date().toISOString(),
-            lastUpdated: new Date().toISOString()
-        };
-    }
-
-    save() {
-        this.data.lastUpdated = new Date().toISOString();
-        fs.writeFileSync(this.progressFile, JSON.stringify(this.data, null, 2));
+    get data() {
+        return this.journal.data;
     }
 
     log(message) {
@@ -70,36 +68,34 @@ class ProgressTracker {
         console.error(`❌ ${errorLine.trim()}`);
     }
 
+    start(sceneNumbers) {
+        this.journal.append('start', { total: sceneNumbers.length, pending: sceneNumbers });
+    }
+
     markCompleted(sceneNumber, videoPath) {
-        this.data.completed.push({
-            sceneNumber,
-            videoPath,
-            completedAt: new Date().toISOString()
-        });
-        this.data.pending = this.data.pending.filter(n => n !== sceneNumber);
-        this.save();
+        this.journal.append('completed', { sceneNumber, videoPath });
     }
 
     markFailed(sceneNumber, error) {
-        this.data.failed.push({
-            sceneNumber,
-            error: error.toString(),
-            failedAt: new Date().toISOString()
-        });
-        this.data.pending = this.data.pending.filter(n => n !== sceneNumber);
-        this.save();
+        this.journal.append('failed', { sceneNumber, error: error.toString() });
     }
 
     setCurrent(sceneNumber) {
-        this.data.currentScene = sceneNumber;
-        this.save();
+        this.journal.append('current', { sceneNumber });
+    }
+
+    /**
+     * Fold the journal into batch_progress.json
+     */
+    close() {
+        this.journal.close();
     }
 
     getProgress() {
         const total = this.data.totalScenes;
-        const completed = this.data.completed.length;
-        const failed = this.data.failed.length;
-        const pending = this.data.pending.length;
+        const completed = this.data.runCompleted;
+        const failed = this.data.runFailed;
+        const pending = this.journal.pending.size;
 
         return {
             total,
@@ -120,132 +116,200 @@ class BatchProcessor {
         this.progress = new ProgressTracker(this.config.outputFolder);
         this.isPaused = false;
         this.isStopped = false;
+        this.isAborted = false;
+        this.latency = new LatencyReport();
+        this.resultCache = this.config.useResultCache
+            ? new ResultCache({ onLog: message => this.progress.log(message) })
+            : null;
+        this.retryPolicy = new RetryPolicy({ maxRetries: this.config.maxRetries });
+        this.pacer = new Pacer({
+            minDelay: this.config.minDelay,
+            maxDelay: this.config.maxDelay,
+            initialDelay: this.config.delayBetweenScenes
+        });
+
+        // One warm browser connection for the whole batch. Downloads and the upload
+        // registry are kept per port: image posts belong to the account logged in there
+        this.worker = new AutomationWorker({
+            port: this.config.port,
+            downloadDir: path.join(__dirname, 'downloads', `port-${this.config.port}`),
+            uploadRegistry: this.config.uploadRegistry,
+            waitProfile: this.config.waitProfile,
+            maxInflight: this.config.maxInflight,
+            onLine: (line, event) => {
+                // Child events are forwarded only when our own event channel is on,
+                // so a terminal sees just the log
+                if (!event || eventsEnabled) {
+                    process.stdout.write(line + '\n');
+                }
+            }
+        });
     }
 
-    async processScene(scene, imagePath) {
+    /**
+     * Run one attempt of a scene
+     * @param {Object} scene - Parsed scene
+     * @param {string} imagePath - Scene image
+     * @param {number} attempt - 1 for the first attempt
+     * @returns {Object} { success, videoPath } or { success: false, error, retry } where
+     *   retry is the RetryPolicy decision when the scene should run again
+     */
+    async processScene(scene, imagePath, attempt = 1) {
         const sceneNumber = scene.sceneNumber;
         this.progress.setCurrent(sceneNumber);
+        emitEvent('scene-started', { sceneNumber, attempt });
         this.progress.log(`\n${'='.repeat(60)}`);
-        this.progress.log(`🎬 Processing Scene ${sceneNumber}`);
+        this.progress.log(`🎬 Processing Scene ${sceneNumber}${attempt > 1 ? ` (attempt ${attempt})` : ''}`);
         this.progress.log(`${'='.repeat(60)}`);
 
-        // Create temp config for this scene
-        const tempConfig = {
-            prompt: scene.prompt,
-            aspectRatio: '16:9', // Always from image
-            duration: this.config.duration,
-            resolution: this.config.resolution,
-            imagePath: imagePath
-        };
-
-        const tempConfigPath = path.join(__dirname, `temp_scene_${sceneNumber}.json`);
-        fs.writeFileSync(tempConfigPath, JSON.stringify(tempConfig, null, 2));
-
         try {
             // Run automation
             this.progress.log(`📸 Image: ${path.basename(imagePath)}`);
             this.progress.log(`📝 Prompt: ${scene.prompt.substring(0, 100)}...`);
             this.progress.log(`⚙️  Config: ${this.config.duration}, ${this.config.resolution}`);
 
-            await this.runAutomation(tempConfigPath);
+            const manifest = await this.worker.runJob({
+                sceneNumber: sceneNumber,
+                prompt: scene.prompt,
+                aspectRatio: '16:9', // Always from image
+                duration: this.config.duration,
+                resolution: this.config.resolution,
+                imagePath: imagePath,
+                // Survives a crash: the next run reopens the submitted post instead of resubmitting
+                checkpointPath: path.join(this.config.outputFolder, 'progress', 'checkpoints',
+                    `scene_${String(sceneNumber).padStart(3, '0')}.json`)
+            });
+
+            this.latency.add(sceneNumber, manifest);
 
-            // Find generated video
-            const videoPath = await this.findGeneratedVideo(sceneNumber);
+            // Move generated video into the output folder
+            const videoPath = this.collectVideo(sceneNumber, manifest);
 
             if (videoPath) {
+                const key = this.sceneKey(scene, imagePath);
+                if (key) this.resultCache.store(key, videoPath);
                 this.progress.markCompleted(sceneNumber, videoPath);
                 this.progress.log(`✅ Scene ${sceneNumber} completed: ${path.basename(videoPath)}`);
+                emitEvent('scene-completed', { sceneNumber, videoPath });
                 return { success: true, videoPath };
             } else {
                 throw new Error('Video file not found after generation');
             }
 
         } catch (error) {
-            this.progress.markFailed(sceneNumber, error.message);
-            this.progress.logError(sceneNumber, error.message);
-            return { success: false, error: error.message };
+            this.latency.add(sceneNumber, error.manifest);
+            if (this.isAborted) {
+                // Hard stop: the scene stays pending for the next run
+                this.progress.log(`🛑 Scene ${sceneNumber} aborted`);
+                return { success: false, error: error.message };
+            }
 
-        } finally {
-            // Cleanup temp config
-            if (fs.existsSync(tempConfigPath)) {
-                fs.unlinkSync(tempConfigPath);
+            const decision = this.retryPolicy.decide(error.message, error.manifest ? error.manifest.kind : null, attempt);
+            this.progress.logError(sceneNumber, `${error.message} [${decision.failureClass}, ${decision.action}]`);
+            if (decision.action !== 'give-up') {
+                if (this.isStopped) {
+                    // Draining: no retry now, but the scene stays pending for the next run
+                    this.progress.log(`⏸️  Scene ${sceneNumber} left pending (${decision.failureClass})`);
+                    return { success: false, error: error.message };
+                }
+                // Still pending in the journal, so a crash before the retry keeps it queued
+                emitEvent('scene-retry', { sceneNumber, attempt, ...decision });
+                return { success: false, error: error.message, retry: decision };
             }
+
+            this.progress.markFailed(sceneNumber, error.message);
+            emitEvent('scene-failed', { sceneNumber, reason: error.message, failureClass: decision.failureClass });
+            return { success: false, error: error.message };
         }
     }
 
-    async runAutomation(configPath) {
-        return new Promise((resolve, reject) => {
-            const automation = spawn('node', ['grok-automation.js', configPath], {
-                cwd: __dirname,
-                stdio: ['inherit', 'pipe', 'pipe']
-            });
-
-            let output = '';
-            let errorOutput = '';
-
-            automation.stdout.on('data', (data) => {
-                const text = data.toString();
-                output += text;
-                process.stdout.write(text); // Echo to console
-            });
-
-            automation.stderr.on('data', (data) => {
-                const text = data.toString();
-                errorOutput += text;
-                process.stderr.write(text);
+    /**
+     * Result cache key of a scene, or null when the cache is off or the image unreadable
+     * @param {Object} scene - Parsed scene
+     * @param {string} imagePath - Scene image
+     * @returns {string|null}
+     */
+    sceneKey(scene, imagePath) {
+        if (!this.resultCache) return null;
+        try {
+            return resultKey({
+                prompt: scene.prompt,
+                imagePath,
+                duration: this.config.duration,
+                resolution: this.config.resolution
             });
+        } catch (error) {
+            return null;
+        }
+    }
 
-            automation.on('close', (code) => {
-                if (code === 0) {
-                    resolve();
-                } else {
-                    reject(new Error(`Automation failed with code ${code}: ${errorOutput}`));
-                }
-            });
+    /**
+     * Complete a scene from the result cache instead of generating it
+     * @param {Object} scene - Parsed scene
+     * @param {string} imagePath - Scene image
+     * @returns {boolean} Whether the cache had its video
+     */
+    reuseCached(scene, imagePath) {
+        const key = this.sceneKey(scene, imagePath);
+        if (!key) return false;
 
-            automation.on('error', (err) => {
-                reject(err);
-            });
-        });
+        const sceneNumber = scene.sceneNumber;
+        const videoPath = path.join(this.config.outputFolder, 'videos',
+            `scene_${String(sceneNumber).padStart(3, '0')}_${Date.now()}.mp4`);
+        if (!this.resultCache.materialize(key, videoPath)) return false;
+
+        this.progress.markCompleted(sceneNumber, videoPath);
+        this.progress.log(`♻️  Scene ${sceneNumber} reused from cache: ${path.basename(videoPath)}`);
+        emitEvent('scene-completed', { sceneNumber, videoPath, cached: true });
+        return true;
     }
 
-    async findGeneratedVideo(sceneNumber) {
-        const downloadsFolder = path.join(__dirname, 'downloads');
-
-        if (!fs.existsSync(downloadsFolder)) {
+    /**
+     * Move the video named in a job manifest into output/videos and drop the job directory
+     * @param {number} sceneNumber - Scene number
+     * @param {Object} manifest - result.json of the job
+     * @returns {string|null} New video path
+     */
+    collectVideo(sceneNumber, manifest) {
+        const sourcePath = manifest.videoPath;
+        if (!sourcePath || !fs.existsSync(sourcePath) || fs.statSync(sourcePath).size !== manifest.bytes) {
             return null;
         }
 
-        // Find most recent video file
-        const files = fs.readdirSync(downloadsFolder)
-            .filter(f => f.endsWith('.mp4'))
-            .map(f => ({
-                name: f,
-                path: path.join(downloadsFolder, f),
-                mtime: fs.statSync(path.join(downloadsFolder, f)).mtime
-            }))
-            .sort((a, b) => b.mtime - a.mtime);
-
-        if (files.length > 0) {
-            const latestVideo = files[0];
+        // Rename with scene number
+        const newName = `scene_${String(sceneNumber).padStart(3, '0')}_${Date.now()}.mp4`;
+        const videosFolder = path.join(this.config.outputFolder, 'videos');
+        fs.mkdirSync(videosFolder, { recursive: true });
 
-            // Rename with scene number
-            const newName = `scene_${String(sceneNumber).padStart(3, '0')}_${Date.now()}.mp4`;
-            const videosFolder = path.join(this.config.outputFolder, 'videos');
-            fs.mkdirSync(videosFolder, { recursive: true });
-
-            const newPath = path.join(videosFolder, newName);
-            fs.renameSync(latestVideo.path, newPath);
-
-            return newPath;
+        const newPath = path.join(videosFolder, newName);
+        try {
+            fs.renameSync(sourcePath, newPath);
+        } catch (error) {
+            // Output folder on another drive
+            fs.copyFileSync(sourcePath, newPath);
+            fs.unlinkSync(sourcePath);
         }
 
-        return null;
+        // The job directory only held this video, its manifest and debug screenshots
+        fs.rmSync(path.dirname(sourcePath), { recursive: true, force: true });
+
+        return newPath;
     }
 
     async delay(seconds) {
-        this.progress.log(`⏳ Waiting ${seconds}s before next scene...`);
-        return new Promise(resolve => setTimeout(resolve, seconds * 1000));
+        this.progress.log(`⏳ Waiting ${Math.round(seconds)}s before next scene...`);
+        await this.sleep(seconds);
+    }
+
+    /**
+     * Sleep, waking early when the batch is stopped
+     * @param {number} seconds - Duration
+     */
+    async sleep(seconds) {
+        const until = Date.now() + seconds * 1000;
+        while (!this.isStopped && Date.now() < until) {
+            await new Promise(resolve => setTimeout(resolve, Math.min(500, until - Date.now())));
+        }
     }
 
     async run() {
@@ -271,37 +335,25 @@ class BatchProcessor {
         // Filter scenes with images
         const processableScenes = scenes.filter(s => imageMap[s.sceneNumber]);
 
-        this.progress.data.totalScenes = processableScenes.length;
-        this.progress.data.pending = processableScenes.map(s => s.sceneNumber);
-        this.progress.save();
+        this.progress.start(processableScenes.map(s => s.sceneNumber));
 
         this.progress.log(`\n📊 Total scenes to process: ${processableScenes.length}`);
+        emitEvent('batch-started', { total: processableScenes.length });
         this.progress.log(`${'='.repeat(60)}\n`);
 
-        // Process scenes
-        for (let i = 0; i < processableScenes.length; i++) {
-            if (this.isStopped) {
-                this.progress.log('🛑 Batch processing stopped by user');
-                break;
-            }
-
-            while (this.isPaused) {
-                await this.delay(5);
-            }
-
-            const scene = processableScenes[i];
-            const imagePath = imageMap[scene.sceneNumber];
-
-            const result = await this.processScene(scene, imagePath);
-
-            // Delay before next scene (except for last one)
-            if (i < processableScenes.length - 1 && result.success) {
-                await this.delay(this.config.delayBetweenScenes);
+        // First pass over every scene, then passes over the scenes requeued by the retry policy
+        let queue = processableScenes.map(scene => ({ scene, imagePath: imageMap[scene.sceneNumber], attempt: 1 }));
+        while (queue.length > 0 && !this.isStopped) {
+            const requeued = await this.runPass(queue);
+            queue = requeued.sort((a, b) => a.notBefore - b.notBefore);
+            if (queue.length > 0 && !this.isStopped) {
+                this.progress.log(`\n🔁 Retrying ${queue.length} failed scene(s): ${queue.map(i => i.scene.sceneNumber).join(', ')}`);
             }
         }
 
         // Final summary
         const progress = this.progress.getProgress();
+        emitEvent('batch-finished', { completed: progress.completed, failed: progress.failed, total: progress.total });
         this.progress.log(`\n${'='.repeat(60)}`);
         this.progress.log('🎊 BATCH PROCESSING COMPLETED');
         this.progress.log(`${'='.repeat(60)}`);
@@ -310,23 +362,168 @@ class BatchProcessor {
         this.progress.log(`📊 Success Rate: ${progress.percentComplete}%`);
         this.progress.log(`📁 Videos saved to: ${path.join(this.config.outputFolder, 'videos')}`);
         this.progress.log(`📄 Log file: ${this.progress.logFile}`);
+        this.logLatency();
+        this.logResultCache();
 
+        this.progress.close();
+        this.worker.stop();
         return progress;
     }
 
+    /**
+     * Run queued scenes; up to maxInflight at once, each in its own tab
+     * @param {Array<Object>} queue - { scene, imagePath, attempt, notBefore }
+     * @returns {Array<Object>} Scenes the retry policy sent to the next pass
+     */
+    async runPass(queue) {
+        const inFlight = new Set();
+        const requeued = [];
+        const pending = [...queue];
+
+        while (pending.length > 0 || inFlight.size > 0) {
+            if (pending.length === 0 || inFlight.size >= this.config.maxInflight) {
+                await Promise.race(inFlight);
+                continue;
+            }
+            const item = pending.shift();
+            const { scene, imagePath } = item;
+
+            // A video made earlier from the same inputs costs no generation (and no pacing)
+            if (item.attempt === 1 && !this.isStopped && this.reuseCached(scene, imagePath)) {
+                continue;
+            }
+
+            // Backed-off retries wait out their delay
+            if (item.notBefore > Date.now() && !this.isStopped) {
+                await this.delay((item.notBefore - Date.now()) / 1000);
+            }
+
+            const wait = this.pacer.reserve();
+            if (wait > 0 && !this.isStopped) {
+                await this.delay(wait);
+            }
+
+            // Paused: no new scene starts until resume (or stop)
+            while (this.isPaused && !this.isStopped) {
+                await this.sleep(0.5);
+            }
+
+            if (this.isStopped) {
+                this.progress.log('🛑 Batch processing stopped by user');
+                break;
+            }
+
+            const startedAt = Date.now();
+            const task = this.processScene(scene, imagePath, item.attempt).then(result => {
+                this.pacer.record(result.success, Date.now() - startedAt, result.error);
+                const pacing = this.pacer.snapshot();
+                emitEvent('pacing', pacing);
+                if (pacing.state === 'backoff') {
+                    this.progress.log(`🐢 Backing off: next scene in ${pacing.interval}s`);
+                }
+
+                if (!result.retry) return;
+                const { failureClass, action, delay } = result.retry;
+                const next = { scene, imagePath, attempt: item.attempt + 1, notBefore: Date.now() + delay * 1000 };
+                if (action === 'retry') {
+                    this.progress.log(`🔁 Scene ${scene.sceneNumber} failed (${failureClass}), retrying now`);
+                    pending.unshift(next);
+                } else {
+                    // One account here: other-account waits for the next pass like backoff
+                    this.progress.log(`🔁 Scene ${scene.sceneNumber} failed (${failureClass}), ` +
+                        `retrying at the end of the batch (${action}, ${Math.round(delay)}s)`);
+                    requeued.push(next);
+                }
+            }).finally(() => inFlight.delete(task));
+            inFlight.add(task);
+        }
+        await Promise.all(inFlight);
+        return requeued;
+    }
+
+    /**
+     * Print and emit the result cache counters of this run
+     */
+    logResultCache() {
+        if (!this.resultCache) return;
+        const summary = this.resultCache.summary();
+        emitEvent('result-cache', summary);
+        this.progress.log(`♻️  Result cache: ${summary.hits} hits, ${summary.misses} misses, ${summary.stored} stored, ` +
+            `${summary.evicted} evicted (${summary.entries} videos, ${(summary.bytes / 1024 / 1024).toFixed(0)} MB)`);
+    }
+
+    /**
+     * Write the per-stage latency report and print its table
+     */
+    logLatency() {
+        const summary = this.latency.summary();
+        if (summary.length === 0) return;
+
+        const { jsonPath, csvPath } = this.latency.write(this.config.outputFolder);
+        emitEvent('latency-report', { jsonPath, csvPath });
+
+        const format = (row, value) => row.unit === 'ms' ? `${(value / 1000).toFixed(1)}s` : value.toFixed(2);
+        this.progress.log(`\n⏱️  Stage latency (${this.latency.scenes.length} jobs)`);
+        this.progress.log(`   ${'stage'.padEnd(14)}${'p50'.padStart(9)}${'p95'.padStart(9)}${'max'.padStart(9)}`);
+        for (const row of summary) {
+            const unit = row.unit === 'ms' ? '' : ` ${row.unit}`;
+            this.progress.log(`   ${row.metric.padEnd(14)}${format(row, row.p50).padStart(9)}` +
+                `${format(row, row.p95).padStart(9)}${format(row, row.max).padStart(9)}${unit}`);
+        }
+        this.progress.log(`📄 Latency report: ${csvPath}`);
+    }
+
+    /**
+     * Stop dispatching new scenes; the running scene finishes and downloads
+     */
     pause() {
+        if (this.isStopped || this.isPaused) return;
         this.isPaused = true;
-        this.progress.log('⏸️  Batch processing paused');
+        this.progress.log('⏸️  Batch processing paused (current scene will finish)');
+        emitEvent('batch-state', { state: 'paused' });
     }
 
     resume() {
+        if (this.isStopped || !this.isPaused) return;
         this.isPaused = false;
         this.progress.log('▶️  Batch processing resumed');
+        emitEvent('batch-state', { state: 'running' });
     }
 
+    /**
+     * Drain: finish the running scene, then stop
+     */
     stop() {
+        if (this.isStopped) return;
+        this.isStopped = true;
+        this.progress.log('🛑 Stopping after the current scene...');
+        emitEvent('batch-state', { state: 'draining' });
+    }
+
+    /**
+     * Hard stop: kill the automation worker; the running scene stays pending
+     */
+    abort() {
+        if (this.isAborted) return;
         this.isStopped = true;
-        this.progress.log('🛑 Stopping batch processing...');
+        this.isAborted = true;
+        this.progress.log('⛔ Aborting batch processing now');
+        emitEvent('batch-state', { state: 'stopping' });
+        this.worker.kill();
+    }
+
+    /**
+     * Apply one control command
+     * @param {string} command - pause | resume | drain | stop
+     */
+    control(command) {
+        switch (command) {
+            case 'pause': this.pause(); break;
+            case 'resume': this.resume(); break;
+            case 'drain': this.stop(); break;
+            case 'stop': this.abort(); break;
+            default: this.progress.log(`⚠️  Unknown control command: ${command}`);
+        }
     }
 }
 
@@ -335,7 +532,7 @@ if (import.meta.url === `file://${process.argv[1]}`) {
     const args = process.argv.slice(2);
 
     if (args.length < 3) {
-        console.log('Usage: node batch-process.js <script-file> <images-folder> <output-folder> [--duration 6s|10s] [--resolution 480p|720p] [--include-completed]');
+        console.log('Usage: node batch-process.js <script-file> <images-folder> <output-folder> [--duration 6s|10s] [--resolution 480p|720p] [--port 9222] [--wait-profile fast|conservative] [--delay 30] [--min-delay 5] [--max-delay 300] [--max-inflight 1] [--max-retries 2] [--upload-registry <file>] [--no-cache] [--include-completed]');
         process.exit(1);
     }
 
@@ -345,14 +542,29 @@ if (import.meta.url === `file://${process.argv[1]}`) {
         outputFolder: args[2],
         duration: args.includes('--duration') ? args[args.indexOf('--duration') + 1] : '6s',
         resolution: args.includes('--resolution') ? args[args.indexOf('--resolution') + 1] : '720p',
+        port: args.includes('--port') ? parseInt(args[args.indexOf('--port') + 1]) : 9222,
+        waitProfile: args.includes('--wait-profile') ? args[args.indexOf('--wait-profile') + 1] : 'fast',
+        delayBetweenScenes: args.includes('--delay') ? parseFloat(args[args.indexOf('--delay') + 1]) : 30,
+        minDelay: args.includes('--min-delay') ? parseFloat(args[args.indexOf('--min-delay') + 1]) : 5,
+        maxDelay: args.includes('--max-delay') ? parseFloat(args[args.indexOf('--max-delay') + 1]) : 300,
+        maxInflight: args.includes('--max-inflight') ? Math.max(1, parseInt(args[args.indexOf('--max-inflight') + 1])) : 1,
+        maxRetries: args.includes('--max-retries') ? Math.max(0, parseInt(args[args.indexOf('--max-retries') + 1])) : 2,
+        uploadRegistry: args.includes('--upload-registry') ? path.resolve(args[args.indexOf('--upload-registry') + 1]) : null,
+        useResultCache: !args.includes('--no-cache'),
         skipCompleted: !args.includes('--include-completed')
     };
 
     const processor = new BatchProcessor(config);
 
-    // Handle Ctrl+C
+    // Control channel: one command per stdin line (pause | resume | drain | stop)
+    readline.createInterface({ input: process.stdin }).on('line', (line) => {
+        if (line.trim()) processor.control(line.trim().toLowerCase());
+    });
+
+    // Handle Ctrl+C: first drains, second aborts
     process.on('SIGINT', () => {
-        processor.stop();
+        if (processor.isStopped) processor.abort();
+        else processor.stop();
     });
 
     processor.run()
@@ -0,0 +1,943 @@
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from chrome_pool import NEW_PROCESS_GROUP, ChromePool
+from events import parse_event_line, read_manifest
+import image_prep
+from image_index import get_image_index
+from latency import LatencyReport
+from pacing import Pacer
+from progress_journal import ProgressJournal
+from project_queue import PRIORITIES, FairScheduler, ProjectQueue
+from result_cache import ResultCache, result_key
+from script_parser import parse_script_file
+
+# Batch orchestration without any UI: validation, job planning, the worker
+# pool that supervises the `grok-automation.js --serve` processes, progress
+# tracking and the storyboard report. grok-batch-gui.py and grok-batch-cli.py
+# are thin clients that pass options and callbacks into a BatchEngine.
+# A batch runs every project of a ProjectQueue (project_queue.py) on one set
+# of workers; each project keeps its own output folder, progress and reports.
+DEFAULT_OPTIONS = {
+    'script_path': '',
+    'images_folder': '',
+    'output_folder': '',
+    'duration': '6s',
+    'resolution': '720p',
+    'workers': 1,
+    'base_port': 9222,
+    'max_inflight': 1,
+    'min_delay': 5,
+    'max_delay': 300,
+    'wait_profile': 'fast',
+    'skip_completed': True,
+    'prep_images': image_prep.available,
+    'result_cache': True,
+    'priority': 'normal',
+    'queue_file': None  # projects.json to persist the queue in; None keeps it in memory
+}
+
+# Failure reasons meaning a job lost its browser (retry-policy.js's disconnect
+# class, plus a crashed tab); only these make the Chrome pool check early
+DISCONNECT_RE = re.compile(
+    r"ECONNREFUSED|ECONNRESET|Target (page, context or browser )?(has been )?closed|browser has been closed"
+    r"|has been disconnected|worker exited|WebSocket|connectOverCDP|tab crashed", re.I)
+
+
+class BatchError(Exception):
+    """Options or inputs that keep a batch from starting (message is user-facing)"""
+
+
+class ProgressTracker:
+    """Python side of batch-process.js ProgressTracker (same files and format)"""
+
+    def __init__(self, output_folder):
+        self.progress_file = os.path.join(output_folder, 'progress', 'batch_progress.json')
+        self.log_file = os.path.join(output_folder, 'logs', f"batch_{int(time.time() * 1000)}.log")
+        self.error_file = os.path.join(output_folder, 'logs', 'errors.log')
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.progress_file), exist_ok=True)
+        os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
+
+        # Replays snapshot + journal, so a crashed run resumes where it stopped
+        self.journal = ProgressJournal(self.progress_file)
+
+    @property
+    def data(self):
+        with self.lock:
+            return self.journal.snapshot()
+
+    def start(self, scene_numbers):
+        with self.lock:
+            self.journal.append('start', total=len(scene_numbers), pending=list(scene_numbers))
+
+    def mark_completed(self, scene_number, video_path):
+        with self.lock:
+            self.journal.append('completed', sceneNumber=scene_number, videoPath=video_path)
+
+    def mark_failed(self, scene_number, error):
+        with self.lock:
+            self.journal.append('failed', sceneNumber=scene_number, error=str(error))
+        with open(self.error_file, 'a', encoding='utf-8') as f:
+            f.write(f"[{datetime.now().isoformat()}] Scene {scene_number}: {error}\n")
+
+    def close(self):
+        """Fold the journal into batch_progress.json"""
+        with self.lock:
+            self.journal.close()
+
+
+class Worker:
+    """One automation worker bound to its own CDP port and Chrome profile
+
+    The worker keeps a `grok-automation.js --serve` process (and its browser
+    connection) alive across scenes and sends it one JSON job per line. With
+    max_inflight > 1 several slot threads share it, each job in its own tab.
+    """
+
+    def __init__(self, worker_id, port, download_dir, pacer):
+        self.id = worker_id
+        self.port = port
+        self.download_dir = download_dir
+        self.process = None
+        self.pending = {}  # jobId -> queue receiving the job's result event
+        self.job_projects = {}  # jobId -> Project the job belongs to
+        self.next_job_id = 1
+        self.status = 'idle'
+        self.current_scene = None
+        self.scenes = []  # scene numbers in flight
+        self.slots = 0  # slot threads still running
+        self.failed = False
+        self.pacer = pacer
+        self.lock = threading.Lock()
+
+
+class Project:
+    """One script/images/output set on the pool, with its own progress files and reports"""
+
+    def __init__(self, entry, scenes, jobs):
+        self.id = entry['id']
+        self.name = entry['name']
+        self.priority = entry['priority']
+        self.output_folder = entry['outputFolder']
+        self.scenes = scenes  # every scene of the script, for the storyboard
+        self.jobs = jobs
+        self.progress = None  # ProgressTracker, once the pool has the project
+        self.latency = LatencyReport()
+        self.events_file = os.path.join(self.output_folder, 'logs', 'events.jsonl')
+        self.running = 0  # scenes in flight
+        self.cancelled = False
+        self.finished = False
+
+
+class WorkerPool:
+    """Runs the scenes of one or more projects on N workers concurrently
+
+    Scenes are handed out by a FairScheduler (weighted by project priority).
+    Slots with nothing to do wait while other scenes are still running, so a
+    project added mid-run gets every worker; the pool ends once all are idle.
+    """
+
+    def __init__(self, options, callbacks):
+        self.options = options
+        self.cwd = os.path.dirname(os.path.abspath(__file__))
+        self.on_log = callbacks['on_log']
+        self.on_worker_update = callbacks['on_worker_update']
+        self.on_event = callbacks['on_event']
+        self.on_project_finished = callbacks['on_project_finished']
+        self.on_finished = callbacks['on_finished']
+        self.stop_event = threading.Event()  # hard stop: running scenes are killed
+        self.halt_event = threading.Event()  # no new scenes (drain or hard stop)
+        self.run_event = threading.Event()  # cleared while paused
+        self.run_event.set()
+        self.state = 'running'
+        self.latency = LatencyReport()  # every project, for the GUI
+        self.result_cache = ResultCache(on_log=self.on_log) if options.get('result_cache', True) else None
+        self.events_lock = threading.Lock()
+
+        self.projects = {}  # project id -> Project
+        self.scheduler = FairScheduler()
+        self.schedule = threading.Condition()  # guards scheduler, projects and running counts
+        self.running = 0
+
+        # Images are normalized in a process pool while earlier scenes run
+        self.images = None
+        if options.get('prep_images') and image_prep.available:
+            self.images = image_prep.ImagePreparer(None, options['resolution'])
+
+        # One browser per worker; worker i always leases instance i (its account)
+        self.chrome = ChromePool(
+            options['base_port'],
+            options['workers'],
+            os.path.join(self.cwd, 'chrome-profiles'),
+            on_log=lambda message: self.log(None, message)
+        )
+        self.workers = [
+            Worker(
+                i + 1,
+                self.chrome.instances[i].port,
+                os.path.join(self.cwd, 'downloads', f"worker-{i + 1}"),
+                Pacer(options['min_delay'], options['max_delay'])
+            )
+            for i in range(options['workers'])
+        ]
+
+    def log(self, worker, message):
+        prefix = f"[Worker {worker.id}] " if worker else ''
+        self.on_log(prefix + message)
+
+    def emit(self, worker, event, project=None):
+        """Record one protocol event (see events.js) and hand it to the GUI
+
+        Project events go to that project's events.jsonl, pool events to every project's.
+        """
+        event.setdefault('ts', datetime.now().isoformat())
+        if worker:
+            event['workerId'] = worker.id
+        if project:
+            event['projectId'] = project.id
+        files = [project.events_file] if project else [p.events_file for p in list(self.projects.values())]
+        line = json.dumps(event, ensure_ascii=False) + '\n'
+        with self.events_lock:
+            for events_file in files:
+                with open(events_file, 'a', encoding='utf-8') as f:
+                    f.write(line)
+        self.on_event(event)
+
+    def set_status(self, worker, status, scene_number=None):
+        # While scenes are in flight the row shows all of them as working
+        in_flight = list(worker.scenes)
+        if in_flight and status not in ('error', 'offline'):
+            status, scene_number = 'working', ', '.join(map(str, in_flight))
+        worker.status = status
+        worker.current_scene = scene_number
+        self.on_worker_update(worker)
+
+    def add_project(self, project):
+        """Queue a project's scenes; works before start() and while running"""
+        project.progress = ProgressTracker(project.output_folder)
+        project.progress.start([job['scene']['sceneNumber'] for job in project.jobs])
+        if self.images:
+            self.images.add([job['image_path'] for job in project.jobs],
+                            os.path.join(project.output_folder, 'cache', 'images'))
+        with self.schedule:
+            self.projects[project.id] = project
+            self.scheduler.add(project.id, project.jobs, PRIORITIES[project.priority])
+            self.schedule.notify_all()
+        self.emit(None, {'type': 'project-started', 'name': project.name,
+                         'priority': project.priority, 'total': len(project.jobs)}, project)
+        if not project.jobs:
+            self.job_done(project, counted=False)
+
+    def cancel_project(self, project_id):
+        """Drop a project's waiting scenes; running ones finish. Returns how many were dropped"""
+        with self.schedule:
+            project = self.projects.get(project_id)
+            if not project or project.finished:
+                return 0
+            project.cancelled = True
+            dropped = self.scheduler.cancel(project_id)
+        self.log(None, f"🚫 Project {project.name}: cancelled, {dropped} scenes dropped")
+        self.job_done(project, counted=False)
+        return dropped
+
+    def set_priority(self, project_id, priority):
+        with self.schedule:
+            self.scheduler.set_weight(project_id, PRIORITIES[priority])
+            if project_id in self.projects:
+                self.projects[project_id].priority = priority
+
+    def set_order(self, project_ids):
+        with self.schedule:
+            self.scheduler.set_order(project_ids)
+
+    def start(self, projects):
+        self.chrome.start()
+        if self.images:
+            self.images.start([])
+        for project in projects:
+            self.add_project(project)
+        self.emit(None, {'type': 'batch-started', 'total': sum(len(p.jobs) for p in projects)})
+        threads = []
+        for worker in self.workers:
+            worker.slots = self.options.get('max_inflight', 1)
+            threads += [
+                threading.Thread(target=self.run_worker, args=(worker,), daemon=True)
+                for _ in range(worker.slots)
+            ]
+        for thread in threads:
+            thread.start()
+
+        def wait_all():
+            for thread in threads:
+                thread.join()
+            self.chrome.close()
+            if self.images:
+                self.images.close()
+            # Stopped or drained: the rest of these projects runs next time
+            for project in list(self.projects.values()):
+                if not project.finished:
+                    self.close_project(project)
+            if self.result_cache:
+                summary = self.result_cache.summary()
+                self.log(None, f"♻️  Result cache: {summary['hits']} hits, {summary['misses']} misses, "
+                               f"{summary['stored']} stored, {summary['evicted']} evicted "
+                               f"({summary['entries']} videos, {summary['bytes'] / 1024 / 1024:.0f} MB)")
+                self.emit(None, {'type': 'result-cache', **summary})
+            data = self.totals()
+            self.emit(None, {
+                'type': 'batch-finished',
+                'completed': data['runCompleted'],
+                'failed': data['runFailed'],
+                'total': data['totalScenes']
+            })
+            self.on_finished(data)
+
+        threading.Thread(target=wait_all, daemon=True).start()
+
+    def totals(self):
+        """Run counters summed over the projects"""
+        data = {'totalScenes': 0, 'runCompleted': 0, 'runFailed': 0}
+        for project in list(self.projects.values()):
+            progress = project.progress.data
+            for key in data:
+                data[key] += progress[key]
+        return data
+
+    def job_done(self, project, counted=True):
+        """Count one scene of a project as settled; finishes the project after its last one"""
+        with self.schedule:
+            if counted:
+                project.running -= 1
+                self.running -= 1
+            finished = (not project.finished and project.running == 0
+                        and self.scheduler.pending(project.id) == 0 and not self.stop_event.is_set())
+            if finished:
+                project.finished = True
+                self.scheduler.cancel(project.id)
+            self.schedule.notify_all()
+        if finished:
+            self.close_project(project)
+            data = project.progress.data
+            self.log(None, f"🏁 Project {project.name}: {data['runCompleted']} completed, "
+                           f"{data['runFailed']} failed{' (cancelled)' if project.cancelled else ''}")
+            self.emit(None, {
+                'type': 'project-finished',
+                'completed': data['runCompleted'],
+                'failed': data['runFailed'],
+                'total': data['totalScenes'],
+                'cancelled': project.cancelled
+            }, project)
+            self.on_project_finished(project)
+
+    def close_project(self, project):
+        """Fold the project's journal and write its latency report"""
+        project.progress.close()
+        if project.latency.scenes:
+            json_path, csv_path = project.latency.write(project.output_folder)
+            self.log(None, f"⏱️  Latency report: {csv_path}")
+            self.emit(None, {'type': 'latency-report', 'jsonPath': json_path, 'csvPath': csv_path}, project)
+
+    def set_state(self, state):
+        self.state = state
+        self.emit(None, {'type': 'batch-state', 'state': state})
+
+    def pause(self):
+        """Dispatch no new scenes; running scenes finish and download"""
+        if self.state == 'running':
+            self.run_event.clear()
+            self.set_state('paused')
+
+    def resume(self):
+        if self.state == 'paused':
+            self.run_event.set()
+            self.set_state('running')
+
+    def drain(self):
+        """Let running scenes finish, then stop"""
+        if self.state in ('running', 'paused'):
+            self.halt_event.set()
+            self.run_event.set()
+            self.wake()
+            self.set_state('draining')
+
+    def stop(self):
+        """Hard stop: kill running scenes (they stay pending for the next run)"""
+        self.stop_event.set()
+        self.halt_event.set()
+        self.run_event.set()
+        self.wake()
+        self.set_state('stopping')
+        for worker in self.workers:
+            process = worker.process
+            if process and process.poll() is None:
+                process.terminate()
+
+    def wake(self):
+        """Let slots waiting for work see a drain or stop"""
+        with self.schedule:
+            self.schedule.notify_all()
+
+    def wait_while_paused(self, worker):
+        """Block while paused; returns False once no new scene should start"""
+        if not self.run_event.is_set():
+            self.set_status(worker, 'paused')
+            self.run_event.wait()
+        return not self.halt_event.is_set()
+
+    def lease_chrome(self, worker):
+        """Wait for the worker's browser to be healthy; False if it cannot be"""
+        if self.chrome.instances[worker.id - 1].ready.is_set():
+            return True
+        self.set_status(worker, 'chrome')
+        if self.chrome.acquire(worker.id - 1, self.halt_event):
+            return True
+        if not self.halt_event.is_set():
+            self.log(worker, "❌ Chrome is not available for this worker")
+        return False
+
+    def run_worker(self, worker):
+        """One slot: runs scenes one after another; a worker has max_inflight slots"""
+        while self.wait_while_paused(worker):
+            picked = self.next_job(worker)
+            if picked is None:
+                break
+            project, job = picked
+
+            try:
+                with worker.lock:
+                    wait = worker.pacer.reserve()
+                if wait > 0:
+                    self.set_status(worker, 'waiting')
+                    if self.halt_event.wait(wait):
+                        self.requeue(project, job)
+                        break
+
+                # Pause may have been pressed during the pacing wait
+                if not self.wait_while_paused(worker):
+                    self.requeue(project, job)
+                    break
+                # A crashed browser is being restarted by the pool
+                if not self.lease_chrome(worker):
+                    worker.failed = not self.halt_event.is_set()
+                    self.requeue(project, job)
+                    break
+
+                scene_number = job['scene']['sceneNumber']
+                worker.scenes.append(scene_number)
+                self.set_status(worker, 'working', scene_number)
+                started = time.monotonic()
+                try:
+                    error = self.run_job(worker, project, job)
+                finally:
+                    worker.scenes.remove(scene_number)
+            finally:
+                self.job_done(project)
+
+            if self.stop_event.is_set():
+                break
+            if error is not None and DISCONNECT_RE.search(error):
+                self.chrome.report_failure(worker.id - 1)
+
+            with worker.lock:
+                worker.pacer.record(error is None, time.monotonic() - started, error)
+                pacing = worker.pacer.snapshot()
+            self.emit(worker, {'type': 'pacing', **pacing})
+
+        with worker.lock:
+            worker.slots -= 1
+            if worker.slots > 0:
+                return
+        self.stop_process(worker)
+        self.set_status(worker, 'error' if worker.failed else 'offline')
+
+    def requeue(self, project, job):
+        """Give back a scene this slot took but did not start"""
+        with self.schedule:
+            if not project.cancelled:
+                self.scheduler.add(project.id, [job], PRIORITIES[project.priority])
+
+    def next_job(self, worker):
+        """(project, job) of the next scene to generate, or None once the pool is done
+
+        Scenes in the result cache are completed on the way. With nothing
+        waiting the slot idles until the scenes still running settle, since a
+        project may be added meanwhile.
+        """
+        while True:
+            with self.schedule:
+                while True:
+                    if self.halt_event.is_set():
+                        return None
+                    picked = self.scheduler.next()
+                    if picked:
+                        break
+                    if self.running == 0:
+                        return None
+                    self.schedule.wait()
+                project = self.projects[picked[0]]
+                project.running += 1
+                self.running += 1
+            job = picked[1]
+            if not self.reuse_cached(worker, project, job):
+                return project, job
+            self.job_done(project)
+
+    def scene_label(self, project, scene_number):
+        """Scene N, prefixed with the project name once several projects share the pool"""
+        return f"{project.name} Scene {scene_number}" if len(self.projects) > 1 else f"Scene {scene_number}"
+
+    def scene_key(self, job):
+        """Result cache key of a job, or None when the cache is off or the image unreadable"""
+        if not self.result_cache:
+            return None
+        try:
+            return result_key(job['scene']['prompt'], job['image_path'],
+                              self.options['duration'], self.options['resolution'])
+        except OSError:
+            return None
+
+    def reuse_cached(self, worker, project, job):
+        """Complete a scene from the result cache; returns whether it was there"""
+        key = self.scene_key(job)
+        if not key:
+            return False
+
+        scene_number = job['scene']['sceneNumber']
+        video_path = os.path.join(project.output_folder, 'videos',
+                                  f"scene_{scene_number:03d}_{int(time.time() * 1000)}.mp4")
+        if not self.result_cache.materialize(key, video_path):
+            return False
+
+        project.progress.mark_completed(scene_number, video_path)
+        self.log(worker, f"♻️ {self.scene_label(project, scene_number)} reused from cache: {Path(video_path).name}")
+        self.emit(worker, {'type': 'scene-completed', 'sceneNumber': scene_number,
+                           'videoPath': video_path, 'cached': True}, project)
+        return True
+
+    def start_process(self, worker):
+        worker.process = subprocess.Popen(
+            [
+                'node', 'grok-automation.js', '--serve',
+                '--port', str(worker.port),
+                '--download-dir', worker.download_dir,
+                '--wait-profile', self.options.get('wait_profile', 'fast'),
+                '--max-inflight', str(self.options.get('max_inflight', 1))
+            ],
+            cwd=self.cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+            **NEW_PROCESS_GROUP
+        )
+        worker.pending = {}
+        threading.Thread(
+            target=self.read_output,
+            args=(worker, worker.process, worker.pending),
+            daemon=True
+        ).start()
+
+    def stop_process(self, worker):
+        process = worker.process
+        worker.process = None
+        if not process or process.poll() is not None:
+            return
+        try:
+            process.stdin.close()
+            process.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            process.terminate()
+
+    def read_output(self, worker, process, pending):
+        for line in process.stdout:
+            text, event = parse_event_line(line.rstrip())
+            if text:
+                self.log(worker, text)
+            if event:
+                with worker.lock:
+                    project = worker.job_projects.get(event.get('jobId'))
+                    results = None
+                    if event['type'] in ('job-completed', 'job-failed'):
+                        results = pending.pop(event.get('jobId'), None)
+                        worker.job_projects.pop(event.get('jobId'), None)
+                if results:
+                    results.put(event)
+                self.emit(worker, event, project)
+        # Process exited: fail whatever was still running on it
+        with worker.lock:
+            waiting = list(pending.values())
+            pending.clear()
+        for results in waiting:
+            results.put(None)
+
+    def send_job(self, worker, project, payload):
+        """Run one job on the worker's warm process and return its result event"""
+        results = queue.Queue()
+        with worker.lock:
+            if not worker.process or worker.process.poll() is not None:
+                self.start_process(worker)
+            process = worker.process
+
+            job_id = worker.next_job_id
+            worker.next_job_id += 1
+            worker.pending[job_id] = results
+            worker.job_projects[job_id] = project
+            process.stdin.write(json.dumps({**payload, 'jobId': job_id}, ensure_ascii=False) + '\n')
+            process.stdin.flush()
+
+        event = results.get()
+        if event is None:
+            with worker.lock:
+                worker.job_projects.pop(job_id, None)
+                if worker.process is process:
+                    worker.process = None
+            raise RuntimeError('Automation worker exited')
+        return event
+
+    def run_job(self, worker, project, job):
+        """Run one scene; returns None on success, else the failure reason"""
+        scene = job['scene']
+        scene_number = scene['sceneNumber']
+        self.log(worker, f"🎬 Processing {self.scene_label(project, scene_number)} ({Path(job['image_path']).name})")
+        self.emit(worker, {'type': 'scene-started', 'sceneNumber': scene_number}, project)
+
+        try:
+            image_path = self.prepare_image(worker, project, scene_number, job['image_path'])
+            result = self.send_job(worker, project, {
+                'sceneNumber': scene_number,
+                'prompt': scene['prompt'],
+                'aspectRatio': '16:9',
+                'duration': self.options['duration'],
+                'resolution': self.options['resolution'],
+                'imagePath': image_path,
+                # Lets a restarted batch reopen an already submitted post
+                'checkpointPath': os.path.join(
+                    project.output_folder, 'progress', 'checkpoints', f"scene_{scene_number:03d}.json")
+            })
+
+            # The job's result.json is authoritative; the event only says where it is
+            manifest = read_manifest(result.get('manifestPath'))
+            self.latency.add(scene_number, manifest)
+            project.latency.add(scene_number, manifest)
+            if not manifest:
+                raise RuntimeError(result.get('reason') or 'No result manifest from automation')
+            if manifest.get('status') != 'completed':
+                raise RuntimeError(manifest.get('reason') or 'Automation failed')
+
+            video_path = self.collect_video(project, scene_number, manifest)
+            if not video_path:
+                raise RuntimeError('Video file not found after generation')
+            key = self.scene_key(job)
+            if key:
+                self.result_cache.store(key, video_path)
+
+            project.progress.mark_completed(scene_number, video_path)
+            self.log(worker, f"✅ {self.scene_label(project, scene_number)} completed: {Path(video_path).name}")
+            self.emit(worker, {'type': 'scene-completed', 'sceneNumber': scene_number,
+                               'videoPath': video_path}, project)
+            return None
+
+        except Exception as e:
+            if self.stop_event.is_set():
+                return str(e)
+            project.progress.mark_failed(scene_number, e)
+            self.log(worker, f"❌ {self.scene_label(project, scene_number)}: {e}")
+            self.emit(worker, {'type': 'scene-failed', 'sceneNumber': scene_number, 'reason': str(e)}, project)
+            self.set_status(worker, 'error', scene_number)
+            return str(e)
+
+    def prepare_image(self, worker, project, scene_number, image_path):
+        """Path to upload for a scene: its prepared copy, or the original"""
+        if not self.images:
+            return image_path
+        prepared = self.images.get(image_path)
+        if prepared.get('error'):
+            self.log(worker, f"⚠️ Could not prepare {Path(image_path).name}, uploading original: {prepared['error']}")
+        self.emit(worker, {
+            'type': 'image-prepared',
+            'sceneNumber': scene_number,
+            'sourceBytes': prepared['sourceBytes'],
+            'bytes': prepared['bytes'],
+            'cached': prepared['cached']
+        }, project)
+        return prepared['path']
+
+    def collect_video(self, project, scene_number, manifest):
+        """Move the manifest's video into the project's videos/ and drop the job directory"""
+        source_path = manifest.get('videoPath')
+        if not source_path or not os.path.exists(source_path):
+            return None
+        if os.path.getsize(source_path) != manifest.get('bytes'):
+            return None
+
+        videos_folder = os.path.join(project.output_folder, 'videos')
+        os.makedirs(videos_folder, exist_ok=True)
+
+        new_name = f"scene_{scene_number:03d}_{int(time.time() * 1000)}.mp4"
+        new_path = os.path.join(videos_folder, new_name)
+        shutil.move(source_path, new_path)
+
+        # The job directory only held this video, its manifest and debug screenshots
+        shutil.rmtree(os.path.dirname(source_path), ignore_errors=True)
+        return new_path
+
+
+class BatchEngine:
+    """One batch run over the project queue: plan() validates and builds the jobs, start() runs them
+
+    The options' script/images/output (if given) join the queue as a project;
+    every queued project runs on the same workers, shared by priority.
+    Projects can be added, cancelled, reordered and re-prioritized while the
+    batch runs.
+
+    Callbacks (all optional, called from worker threads):
+      on_log(message), on_worker_update(worker), on_event(event),
+      on_project_update(entry) whenever a queue entry changes state,
+      on_finished(totals) once the pool is done and the storyboards written
+    """
+
+    def __init__(self, options, on_log=None, on_worker_update=None, on_event=None, on_finished=None,
+                 on_project_update=None, project_queue=None):
+        self.options = {**DEFAULT_OPTIONS, **options}
+        self.cwd = os.path.dirname(os.path.abspath(__file__))
+        self.on_log = on_log or print
+        self.on_worker_update = on_worker_update or (lambda worker: None)
+        self.on_event = on_event or (lambda event: None)
+        self.on_finished = on_finished or (lambda data: None)
+        self.on_project_update = on_project_update or (lambda entry: None)
+        self.queue = project_queue or ProjectQueue(self.options['queue_file'], on_log=self.on_log)
+        self.projects = {}  # project id -> Project, planned
+        self.jobs = []
+        self.pool = None
+        self.finished = threading.Event()
+
+    def plan(self):
+        """Check the options and match scenes to images for every queued project; raises BatchError"""
+        options = self.options
+        explicit = bool(options['script_path']) or not self.queue.entries('queued')
+        if explicit:
+            self.check_project(options['script_path'], options['images_folder'], options['output_folder'])
+        if options['workers'] < 1 or options['max_inflight'] < 1:
+            raise BatchError("Số workers và tab/worker phải lớn hơn 0!")
+        if options['min_delay'] > options['max_delay']:
+            raise BatchError("Delay min phải nhỏ hơn hoặc bằng delay max!")
+
+        workers, base_port = options['workers'], options['base_port']
+        self.on_log(f"🚀 Khởi động batch processing...")
+        self.on_log(f"⚙️  Config: {options['duration']}, {options['resolution']}, waits: {options['wait_profile']}, "
+                    f"delay {options['min_delay']}-{options['max_delay']}s")
+        self.on_log(f"👷 Workers: {workers} (ports {base_port}-{base_port + workers - 1}), "
+                    f"{options['max_inflight']} tab(s) each")
+        if options['prep_images'] and not image_prep.available:
+            self.on_log("ℹ️  Pillow not installed: images are uploaded without pre-processing")
+
+        if explicit:
+            self.enqueue(options['script_path'], options['images_folder'], options['output_folder'],
+                         options['priority'], options['skip_completed'])
+        for entry in self.queue.entries('queued'):
+            if entry['id'] in self.projects:
+                continue
+            try:
+                self.plan_project(entry)
+            except BatchError as e:
+                self.on_log(f"⚠️  Project {entry['name']} skipped: {e}")
+
+        self.jobs = [job for project in self.projects.values() for job in project.jobs]
+        self.on_log(f"📊 Total scenes to process: {len(self.jobs)} ({len(self.projects)} projects)")
+        self.on_log("")
+        return self.jobs
+
+    def check_project(self, script_path, images_folder, output_folder):
+        if not script_path:
+            raise BatchError("Vui lòng chọn file kịch bản!")
+        if not images_folder:
+            raise BatchError("Vui lòng chọn folder hình ảnh!")
+        if not output_folder:
+            raise BatchError("Vui lòng chọn folder output!")
+        for entry in self.queue.entries('queued', 'running'):
+            if (os.path.abspath(entry['outputFolder']) == os.path.abspath(output_folder)
+                    and os.path.abspath(entry['scriptPath']) != os.path.abspath(script_path)):
+                raise BatchError(f"Folder output đang được dùng bởi project {entry['name']}!")
+
+    def enqueue(self, script_path, images_folder, output_folder, priority, skip_completed):
+        """Queue entry for a project, reusing the unfinished one with the same script and output"""
+        entry = self.queue.find(script_path, output_folder)
+        if entry:
+            return self.queue.update(entry['id'], imagesFolder=images_folder, priority=priority,
+                                     skipCompleted=skip_completed)
+        return self.queue.add(script_path, images_folder, output_folder, priority, skip_completed)
+
+    def plan_project(self, entry):
+        """Parse one queued project and match its images; raises BatchError"""
+        try:
+            all_scenes = parse_script_file(entry['scriptPath'])
+        except OSError as e:
+            raise BatchError(f"Không đọc được kịch bản: {e}")
+        scenes = all_scenes
+        if entry['skipCompleted']:
+            scenes = [s for s in scenes if not s['isDone']]
+
+        try:
+            image_map, missing, ambiguous = get_image_index(entry['imagesFolder']).match(
+                [s['sceneNumber'] for s in scenes])
+        except OSError as e:
+            raise BatchError(f"Không đọc được folder hình ảnh: {e}")
+        jobs = [
+            {'scene': scene, 'image_path': image_map[scene['sceneNumber']]}
+            for scene in scenes
+            if scene['sceneNumber'] in image_map
+        ]
+
+        self.on_log(f"📝 Project #{entry['id']} {entry['name']} (priority {entry['priority']}): "
+                    f"{len(jobs)} scenes")
+        self.on_log(f"   🖼️  Images: {entry['imagesFolder']}")
+        self.on_log(f"   📂 Output: {entry['outputFolder']}")
+        if missing:
+            self.on_log(f"   ⚠️  Missing images for scenes: {', '.join(map(str, missing))}")
+        if ambiguous:
+            self.on_log(f"   ⚠️  {len(ambiguous)} scenes have several images (run 🔍 Kiểm Tra Ảnh for details)")
+        project = Project(entry, all_scenes, jobs)
+        self.projects[project.id] = project
+        return project
+
+    def start(self):
+        """Start the planned projects on the worker pool; False when there is nothing to run"""
+        if not self.jobs:
+            # Nothing left to generate in any of them
+            for project_id in self.projects:
+                self.on_project_update(self.queue.update(project_id, state='done'))
+            return False
+        options = self.options
+        self.pool = WorkerPool({
+            'duration': options['duration'],
+            'resolution': options['resolution'],
+            'min_delay': options['min_delay'],
+            'max_delay': options['max_delay'],
+            'workers': min(options['workers'], len(self.jobs)),
+            'base_port': options['base_port'],
+            'max_inflight': options['max_inflight'],
+            'wait_profile': options['wait_profile'],
+            'prep_images': options['prep_images'],
+            'result_cache': options['result_cache']
+        }, {
+            'on_log': self.on_log,
+            'on_worker_update': self.on_worker_update,
+            'on_event': self.on_event,
+            'on_project_finished': self.project_finished,
+            'on_finished': self.pool_finished
+        })
+        projects = [self.projects[i] for i in self.queue.order() if i in self.projects]
+        for project in projects:
+            self.on_project_update(self.queue.update(project.id, state='running'))
+        self.pool.set_order(self.queue.order())
+        self.pool.start(projects)
+        return True
+
+    def add_project(self, script_path, images_folder, output_folder, priority='normal', skip_completed=True):
+        """Queue a project; while the batch runs it joins right away. Raises BatchError"""
+        self.check_project(script_path, images_folder, output_folder)
+        known = self.queue.find(script_path, output_folder)
+        if known and known['state'] == 'running':
+            raise BatchError(f"Project {known['name']} đang chạy!")
+        entry = self.enqueue(script_path, images_folder, output_folder, priority, skip_completed)
+        self.on_project_update(entry)
+        if not self.pool or self.finished.is_set() or self.pool.halt_event.is_set():
+            return entry
+        project = self.plan_project(entry)
+        self.on_project_update(self.queue.update(entry['id'], state='running'))
+        self.pool.set_order(self.queue.order())
+        self.pool.add_project(project)
+        return entry
+
+    def cancel_project(self, project_id):
+        """Cancel a project: it leaves the queue and its waiting scenes are dropped"""
+        entry = self.queue.get(project_id)
+        if not entry or entry['state'] in ('done', 'cancelled'):
+            return
+        if entry['state'] == 'running' and self.pool:
+            # Marked cancelled by project_finished once its running scenes settle
+            self.pool.cancel_project(project_id)
+            return
+        self.projects.pop(project_id, None)
+        self.on_project_update(self.queue.update(project_id, state='cancelled'))
+
+    def move_project(self, project_id, offset):
+        """Move a project up (offset < 0) or down; earlier projects win ties for a worker"""
+        if self.queue.move(project_id, offset) and self.pool:
+            self.pool.set_order(self.queue.order())
+
+    def set_priority(self, project_id, priority):
+        self.on_project_update(self.queue.update(project_id, priority=priority))
+        if self.pool:
+            self.pool.set_priority(project_id, priority)
+
+    def project_finished(self, project):
+        self.write_storyboard(project)
+        entry = self.queue.update(project.id, state='cancelled' if project.cancelled else 'done')
+        self.on_project_update(entry)
+
+    def pool_finished(self, data):
+        # Stopped or drained before the end: write what there is and keep them queued
+        for project in self.pool.projects.values():
+            if not project.finished:
+                self.write_storyboard(project)
+                self.on_project_update(self.queue.update(project.id, state='queued'))
+        self.on_finished(data)
+        self.finished.set()
+
+    def write_storyboard(self, project):
+        """Write batch-report.json (generate-storyboard-report.js) and storyboard.html into the project's output"""
+        output = project.output_folder
+        scenes_path = os.path.join(output, 'progress', 'scenes.json')
+        try:
+            with open(scenes_path, 'w', encoding='utf-8') as f:
+                json.dump(project.scenes, f, ensure_ascii=False)
+            result = subprocess.run(
+                ['node', 'generate-storyboard-report.js', output, scenes_path],
+                cwd=self.cwd, capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=60)
+            if result.returncode != 0:
+                self.on_log(f"⚠️ Storyboard report failed: {(result.stderr or result.stdout).strip()}")
+                return
+            storyboard = os.path.join(output, 'storyboard.html')
+            if not os.path.exists(storyboard):
+                shutil.copyfile(os.path.join(self.cwd, 'storyboard.html'), storyboard)
+            self.on_log(f"📊 Storyboard: {storyboard}")
+        except (OSError, subprocess.TimeoutExpired) as e:
+            self.on_log(f"⚠️ Storyboard report failed: {e}")
+
+    @property
+    def state(self):
+        return self.pool.state if self.pool else 'idle'
+
+    def pause(self):
+        if self.pool:
+            self.pool.pause()
+
+    def resume(self):
+        if self.pool:
+            self.pool.resume()
+
+    def drain(self):
+        if self.pool:
+            self.pool.drain()
+
+    def stop(self):
+        if self.pool:
+            self.pool.stop()
+
+    def wait(self, timeout=None):
+        """Block until the batch finished; returns whether it did"""
+        return self.finished.wait(timeout)
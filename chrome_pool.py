@@ -0,0 +1,239 @@
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+from chrome_probe import GROK_IMAGINE_URL, find_page, open_page, probe_browser
+
+# Chrome binaries by platform; CHROME_PATH overrides them all
+WINDOWS_CHROME_PATHS = [
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    os.path.expanduser(r"~\AppData\Local\Google\Chrome\Application\chrome.exe")
+]
+MAC_CHROME_PATHS = [
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+    '/Applications/Chromium.app/Contents/MacOS/Chromium'
+]
+LINUX_CHROME_NAMES = [
+    'google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome'
+]
+
+FAILURES_BEFORE_RESTART = 3  # consecutive failed health checks of a running browser
+STARTUP_GRACE = 30  # seconds a freshly launched browser gets before checks count
+STABLE_AFTER = 600  # seconds healthy after which the restart budget is refilled
+
+# Child processes get their own process group, so Ctrl+C in the runner's
+# terminal reaches only the runner (which drains) and not the browsers/workers
+NEW_PROCESS_GROUP = ({'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP} if os.name == 'nt'
+                     else {'start_new_session': True})
+
+
+def find_chrome():
+    """Path of a Chrome/Chromium binary on this machine, or None"""
+    override = os.environ.get('CHROME_PATH')
+    if override:
+        return override if os.path.exists(override) else None
+    if sys.platform.startswith('win'):
+        return next((p for p in WINDOWS_CHROME_PATHS if os.path.exists(p)), None)
+    if sys.platform == 'darwin':
+        found = next((p for p in MAC_CHROME_PATHS if os.path.exists(p)), None)
+        if found:
+            return found
+    return next((shutil.which(name) for name in LINUX_CHROME_NAMES if shutil.which(name)), None)
+
+
+class ChromeInstance:
+    """One browser on its own CDP port and profile (one account)"""
+
+    def __init__(self, index, port, profile_dir):
+        self.index = index
+        self.port = port
+        self.profile_dir = profile_dir
+        self.process = None  # None when the browser was already running (not ours)
+        self.adopted = False  # already running at start; its profile is unknown
+        self.state = 'stopped'  # stopped | starting | healthy | unhealthy | failed
+        self.ready = threading.Event()  # set while healthy
+        self.failures = 0
+        self.restarts = 0
+        self.launched_at = 0
+        self.healthy_since = None
+
+
+class ChromePool:
+    """Launches, health-checks and restarts one Chrome per account
+
+    Instance i runs on base_port + i with profile_root/worker-<i+1>. A monitor
+    thread probes every instance's DevTools endpoint, keeps a grok.com/imagine
+    tab open in it and relaunches browsers that crashed or stopped answering.
+    A browser that was already running on the port is used as is and never
+    relaunched (its profile is not known); when it goes away its slot fails.
+    Workers take a lease with acquire(), which blocks until their browser is
+    healthy, and report_failure() when a job lost its browser.
+    """
+
+    def __init__(self, base_port, count, profile_root, on_log=None, on_state=None,
+                 check_interval=5, max_restarts=5):
+        self.instances = [
+            ChromeInstance(i, base_port + i, os.path.join(profile_root, f"worker-{i + 1}"))
+            for i in range(count)
+        ]
+        self.on_log = on_log or (lambda message: None)
+        self.on_state = on_state or (lambda instance: None)
+        self.check_interval = check_interval
+        self.max_restarts = max_restarts
+        self.chrome_exe = find_chrome()
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.closed = threading.Event()
+        self.monitor = None
+
+    def log(self, instance, message):
+        self.on_log(f"[Chrome :{instance.port}] {message}")
+
+    def set_state(self, instance, state):
+        if state == 'healthy':
+            instance.ready.set()
+        else:
+            instance.ready.clear()
+        if instance.state != state:
+            instance.state = state
+            self.on_state(instance)
+
+    def start(self):
+        """Adopt browsers already listening, launch the rest, start monitoring"""
+        for instance in self.instances:
+            if probe_browser(instance.port):
+                self.log(instance, "♻️ Using the browser already running on this port")
+                instance.adopted = True
+                self.set_state(instance, 'starting')
+            else:
+                self.launch(instance)
+        self.monitor = threading.Thread(target=self.run_monitor, daemon=True)
+        self.monitor.start()
+        self.wake.set()
+
+    def launch(self, instance):
+        if not self.chrome_exe:
+            self.log(instance, "❌ Could not find Chrome (set CHROME_PATH to its binary)")
+            self.set_state(instance, 'failed')
+            return False
+
+        os.makedirs(instance.profile_dir, exist_ok=True)
+        self.log(instance, "🌐 Launching Chrome...")
+        try:
+            instance.process = subprocess.Popen(
+                [
+                    self.chrome_exe,
+                    f"--remote-debugging-port={instance.port}",
+                    f"--user-data-dir={instance.profile_dir}",
+                    '--no-first-run',
+                    '--no-default-browser-check',
+                    GROK_IMAGINE_URL
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                **NEW_PROCESS_GROUP
+            )
+        except OSError as e:
+            self.log(instance, f"❌ Error launching Chrome: {e}")
+            self.set_state(instance, 'failed')
+            return False
+        instance.launched_at = time.monotonic()
+        instance.failures = 0
+        self.set_state(instance, 'starting')
+        return True
+
+    def restart(self, instance, reason):
+        if instance.adopted:
+            # Relaunching with worker-N would lose the login of the profile it ran with
+            self.log(instance, f"❌ {reason}; it was not launched by the batch, restart it yourself")
+            self.set_state(instance, 'failed')
+            return
+        if instance.restarts >= self.max_restarts:
+            self.log(instance, f"❌ {reason}; gave up after {instance.restarts} restarts")
+            self.set_state(instance, 'failed')
+            return
+        instance.restarts += 1
+        self.log(instance, f"🔁 {reason}; restarting ({instance.restarts}/{self.max_restarts})")
+        process = instance.process
+        if process and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.launch(instance)
+
+    def check(self, instance):
+        """One health check; restarts the browser when it is gone for good"""
+        if instance.state in ('failed', 'stopped'):
+            return
+
+        if instance.process and instance.process.poll() is not None:
+            self.restart(instance, f"Chrome exited (code {instance.process.returncode})")
+            return
+
+        if probe_browser(instance.port):
+            # Keep a warm /imagine tab so jobs do not start from a blank page
+            if not find_page(instance.port, 'grok.com/imagine'):
+                open_page(instance.port, GROK_IMAGINE_URL)
+            if instance.state != 'healthy':
+                self.log(instance, "✅ Chrome ready")
+                instance.healthy_since = time.monotonic()
+            elif instance.restarts and time.monotonic() - instance.healthy_since > STABLE_AFTER:
+                instance.restarts = 0
+            instance.failures = 0
+            self.set_state(instance, 'healthy')
+            return
+
+        if instance.state == 'starting' and time.monotonic() - instance.launched_at < STARTUP_GRACE:
+            return
+        instance.failures += 1
+        self.set_state(instance, 'unhealthy')
+        if instance.failures >= FAILURES_BEFORE_RESTART:
+            self.restart(instance, "Chrome stopped answering on its DevTools port")
+
+    def run_monitor(self):
+        while not self.closed.is_set():
+            # Poll faster while any browser is on its way up
+            settling = any(i.state in ('starting', 'unhealthy') for i in self.instances)
+            self.wake.wait(1 if settling else self.check_interval)
+            self.wake.clear()
+            if self.closed.is_set():
+                break
+            for instance in self.instances:
+                with self.lock:
+                    self.check(instance)
+
+    def acquire(self, index, cancel_event):
+        """Block until instance `index` is healthy; None if cancelled or failed"""
+        instance = self.instances[index]
+        while not cancel_event.is_set() and not self.closed.is_set():
+            if instance.ready.wait(0.5):
+                return instance
+            if instance.state == 'failed':
+                return None
+        return None
+
+    def report_failure(self, index):
+        """A job lost its browser: check it now instead of at the next interval"""
+        instance = self.instances[index]
+        with self.lock:
+            if instance.state == 'healthy':
+                self.set_state(instance, 'unhealthy')
+        self.wake.set()
+
+    def close(self, stop_browsers=False):
+        """Stop monitoring; browsers stay open (and logged in) unless stop_browsers"""
+        self.closed.set()
+        self.wake.set()
+        if self.monitor:
+            self.monitor.join(timeout=self.check_interval + 5)
+        for instance in self.instances:
+            process = instance.process
+            if stop_browsers and process and process.poll() is None:
+                process.terminate()
+            self.set_state(instance, 'stopped')
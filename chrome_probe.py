@@ -0,0 +1,77 @@
+import json
+import time
+import urllib.parse
+import urllib.request
+
+# Readiness checks against Chrome's DevTools HTTP endpoints (/json/version,
+# /json/list, /json/new). A TCP connect alone is not enough: the port opens
+# before the browser accepts CDP sessions, which is when connectOverCDP fails.
+GROK_IMAGINE_URL = 'https://grok.com/imagine'
+
+
+def devtools_request(port, path, method='GET', timeout=2):
+    """JSON from a DevTools endpoint, or None when Chrome is not answering"""
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def probe_browser(port, timeout=2):
+    """/json/version of a browser that accepts CDP connections, else None"""
+    version = devtools_request(port, '/json/version', timeout=timeout)
+    if isinstance(version, dict) and version.get('webSocketDebuggerUrl'):
+        return version
+    return None
+
+
+def find_page(port, url_part, timeout=2):
+    """First open page whose URL contains url_part, else None"""
+    targets = devtools_request(port, '/json/list', timeout=timeout)
+    for target in targets if isinstance(targets, list) else []:
+        if target.get('type') == 'page' and url_part in target.get('url', ''):
+            return target
+    return None
+
+
+def open_page(port, url, timeout=2):
+    """Open a new tab on url (Chrome only accepts PUT for /json/new)"""
+    return devtools_request(port, '/json/new?' + urllib.parse.quote(url, safe=':/?=&'), method='PUT',
+                            timeout=timeout)
+
+
+def wait_for_chrome(port, cancel_event, on_status=None, timeout=60, page_url=GROK_IMAGINE_URL):
+    """Poll until Chrome accepts CDP connections and has a page on page_url
+
+    Polls with exponential backoff (0.2s doubling up to 2s) and opens the page
+    once if it is missing. Returns 'ready', 'cancelled' (cancel_event set) or
+    'timeout'. on_status(text) is called from this thread on every attempt.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.2
+    attempt = 0
+    page_requested = False
+    url_part = urllib.parse.urlparse(page_url).netloc + urllib.parse.urlparse(page_url).path
+
+    while not cancel_event.is_set():
+        attempt += 1
+        if not probe_browser(port):
+            status = f"Waiting for Chrome on port {port}... (check {attempt})"
+        elif find_page(port, url_part):
+            return 'ready'
+        else:
+            if not page_requested:
+                open_page(port, page_url)
+                page_requested = True
+            status = f"Chrome is up, waiting for {url_part}... (check {attempt})"
+
+        if on_status:
+            on_status(status)
+        if time.monotonic() + delay > deadline:
+            return 'timeout'
+        cancel_event.wait(delay)
+        delay = min(delay * 2, 2)
+
+    return 'cancelled'
@@ -0,0 +1,191 @@
+import fs from 'fs';
+import http from 'http';
+import https from 'https';
+import { Transform } from 'stream';
+import { pipeline } from 'stream/promises';
+
+/**
+ * Streaming, resumable file download.
+ *
+ * The body is streamed into `<filePath>.part` chunk by chunk (never buffered
+ * whole). When the connection drops, the next attempt asks for the remaining
+ * bytes with an HTTP Range request and appends to the partial file; servers
+ * that ignore Range restart from zero. A 416 finishes a partial file whose
+ * size matches the video and restarts any other from zero. Once the size matches the expected
+ * length the partial file is renamed into place, so filePath either does not
+ * exist or holds the complete video.
+ */
+
+const PROGRESS_INTERVAL_MS = 250;
+
+/**
+ * Parse "bytes start-end/total" from a Content-Range header
+ * @param {string} header - Content-Range header value
+ * @returns {Object|null} { start, total } (total is null when "*")
+ */
+function parseContentRange(header) {
+    const match = /^bytes (\d+)-\d+\/(\d+|\*)$/.exec(header || '');
+    if (!match) return null;
+    return {
+        start: parseInt(match[1]),
+        total: match[2] === '*' ? null : parseInt(match[2])
+    };
+}
+
+// Sent only to the origin that was asked for, never along a redirect elsewhere (e.g. a CDN)
+const CREDENTIAL_HEADERS = ['cookie', 'authorization'];
+
+/**
+ * Copy of headers without the credential headers (any letter case)
+ * @param {Object} headers - Request headers
+ * @returns {Object}
+ */
+function withoutCredentials(headers) {
+    return Object.fromEntries(Object.entries(headers)
+        .filter(([name]) => !CREDENTIAL_HEADERS.includes(name.toLowerCase())));
+}
+
+/**
+ * Issue a GET and resolve with the response stream (follows redirects; credentials
+ * stay with the original origin)
+ * @param {string} url - URL to fetch
+ * @param {Object} headers - Request headers
+ * @param {number} timeoutMs - Socket idle timeout
+ * @param {number} redirects - Remaining redirects
+ * @returns {Promise<Object>} Node IncomingMessage
+ */
+function request(url, headers, timeoutMs, redirects = 5) {
+    return new Promise((resolve, reject) => {
+        const client = url.startsWith('https:') ? https : http;
+        const req = client.get(url, { headers }, (res) => {
+            if (res.statusCode >= 300 && res.statusCode < 400 && res.headers.location) {
+                res.resume();
+                if (redirects <= 0) return reject(new Error('Too many redirects'));
+                const next = new URL(res.headers.location, url);
+                const nextHeaders = next.origin === new URL(url).origin ? headers : withoutCredentials(headers);
+                return resolve(request(next.toString(), nextHeaders, timeoutMs, redirects - 1));
+            }
+            resolve(res);
+        });
+        req.setTimeout(timeoutMs, () => req.destroy(new Error(`No data for ${timeoutMs / 1000}s`)));
+        req.on('error', reject);
+    });
+}
+
+/**
+ * Download url into filePath with resume on failure
+ * @param {string} url - Video URL
+ * @param {string} filePath - Final destination
+ * @param {Object} options - { headers, maxAttempts, retryDelayMs, timeoutMs, onProgress(bytes, total) }
+ * @returns {Promise<number>} Size of the downloaded file in bytes
+ */
+export async function downloadFile(url, filePath, options = {}) {
+    const {
+        headers = {},
+        maxAttempts = 5,
+        retryDelayMs = 2000,
+        timeoutMs = 30000,
+        onProgress = () => { }
+    } = options;
+
+    const partPath = `${filePath}.part`;
+    let total = null;
+    let lastError = null;
+
+    for (let attempt = 1; attempt <= maxAttempts; attempt++) {
+        let offset = fs.existsSync(partPath) ? fs.statSync(partPath).size : 0;
+
+        try {
+            const requestHeaders = { ...headers };
+            if (offset > 0) requestHeaders.Range = `bytes=${offset}-`;
+
+            const res = await request(url, requestHeaders, timeoutMs);
+
+            if (res.statusCode === 416 && offset > 0) {
+                res.resume();
+                // "bytes */<size>": the size of the whole file, also on a fresh run
+                const unsatisfied = /^bytes \*\/(\d+)$/.exec(res.headers['content-range'] || '');
+                if (unsatisfied) total = parseInt(unsatisfied[1]);
+                if (total === null || offset !== total) {
+                    // The partial file does not fit the video: start over on the next attempt
+                    fs.rmSync(partPath, { force: true });
+                    throw new Error(`Range not satisfiable at ${offset} bytes, restarting from zero`);
+                }
+                // Everything already arrived before the connection dropped (or the run crashed)
+            } else if (res.statusCode === 206) {
+                const range = parseContentRange(res.headers['content-range']);
+                if (!range || range.start !== offset) {
+                    res.resume();
+                    throw new Error(`Unexpected Content-Range: ${res.headers['content-range']}`);
+                }
+                if (range.total !== null) total = range.total;
+                await writeBody(res, partPath, 'a', offset, total, onProgress);
+            } else if (res.statusCode === 200) {
+                // No range support (or fresh start): rewrite from zero
+                offset = 0;
+                const length = parseInt(res.headers['content-length']);
+                total = Number.isNaN(length) ? null : length;
+                await writeBody(res, partPath, 'w', 0, total, onProgress);
+            } else {
+                res.resume();
+                const error = new Error(`HTTP ${res.statusCode}`);
+                error.fatal = res.statusCode >= 400 && res.statusCode < 500 && res.statusCode !== 416;
+                throw error;
+            }
+
+            const size = fs.statSync(partPath).size;
+            if (total !== null && size !== total) {
+                throw new Error(`Incomplete download: ${size} of ${total} bytes`);
+            }
+            if (size === 0) {
+                throw new Error('Empty download');
+            }
+
+            fs.renameSync(partPath, filePath);
+            return size;
+
+        } catch (error) {
+            lastError = error;
+            if (error.fatal) break;
+            if (attempt < maxAttempts) {
+                const have = fs.existsSync(partPath) ? fs.statSync(partPath).size : 0;
+                console.log(`⚠️ Download interrupted (${error.message}), resuming at ${have} bytes [${attempt}/${maxAttempts}]...`);
+                await new Promise(resolve => setTimeout(resolve, retryDelayMs * attempt));
+            }
+        }
+    }
+
+    fs.rmSync(partPath, { force: true });
+    throw lastError;
+}
+
+/**
+ * Stream a response body into the partial file, reporting progress
+ */
+async function writeBody(res, partPath, flags, offset, total, onProgress) {
+    let bytes = offset;
+    let lastReport = 0;
+
+    const counter = new Transform({
+        transform(chunk, encoding, callback) {
+            bytes += chunk.length;
+            const now = Date.now();
+            if (now - lastReport >= PROGRESS_INTERVAL_MS) {
+                lastReport = now;
+                onProgress(bytes, total);
+            }
+            callback(null, chunk);
+        }
+    });
+
+    try {
+        await pipeline(res, counter, fs.createWriteStream(partPath, { flags }));
+    } finally {
+        onProgress(bytes, total);
+    }
+
+    // A dropped connection can end the stream "cleanly" without an error
+    if (!res.complete) {
+        throw new Error('Connection closed before the body was complete');
+    }
+}
@@ -0,0 +1,72 @@
+import fs from 'fs';
+
+/**
+ * Machine-readable event channel shared by batch-process.js and grok-automation.js.
+ *
+ * Each event is one JSON object on its own stdout line behind EVENT_PREFIX, so
+ * readers can split events from the human log without any regex scraping.
+ * Events go to stdout when it is piped (GUIs, batch-process.js) or when
+ * GROK_EVENTS=1; an interactive terminal only sees the normal log.
+ * Set GROK_EVENTS_FILE to also append the bare JSON lines to a file (inherited by
+ * child processes, so one file collects the whole batch).
+ *
+ * Event types:
+ *   batch-started      { total }
+ *   batch-finished     { completed, failed, total }
+ *   batch-state        { state }                    running | paused | draining | stopping
+ *   scene-started      { sceneNumber, attempt }
+ *   stage              { stage }                    connect | resume | navigate | upload | transition |
+ *                                                   prompt | options | submit | waiting | download
+ *   poll               { attempt }
+ *   video-found        { url, via }                 via: network | dom
+ *   download-progress  { bytes, total }
+ *   job-completed      { videoPath, manifestPath }  one grok-automation.js job succeeded
+ *   job-failed         { reason, kind, manifestPath }  one grok-automation.js job failed; kind
+ *                                                   (when known) from video-watcher.js: moderated |
+ *                                                   quota | server-error | rejected | navigated |
+ *                                                   progress-lost | page-crashed | timeout
+ *   image-prepared     { sceneNumber, sourceBytes, bytes, cached }  upload copy from image_prep.py
+ *   scene-completed    { sceneNumber, videoPath, cached }  cached: served from the result cache
+ *   scene-failed       { sceneNumber, reason, failureClass }
+ *   scene-retry        { sceneNumber, attempt, failureClass, action, delay }  retry-policy.js decision
+ *   pacing             { interval, perHour, state }  state: steady | speeding-up | backoff
+ *   latency-report     { jsonPath, csvPath }        per-stage p50/p95/max of the run (latency.js)
+ *   result-cache       { hits, misses, stored, evicted, entries, bytes }  result-cache.js counters
+ *   project-started    { name, priority, total }    a queued project joined the batch (batch_engine.py)
+ *   project-finished   { completed, failed, total, cancelled }
+ *
+ * grok-automation.js events carry the sceneNumber (and in --serve mode the jobId)
+ * of the job they belong to. When batch_engine.py runs several projects, the
+ * events of a project's scenes also carry its projectId.
+ */
+export const EVENT_PREFIX = '@@grok-event ';
+
+export let eventsEnabled = !process.stdout.isTTY || process.env.GROK_EVENTS === '1';
+
+const eventsFile = process.env.GROK_EVENTS_FILE || null;
+
+/**
+ * Turn the stdout event channel on regardless of the terminal check
+ */
+export function enableEvents() {
+    eventsEnabled = true;
+}
+
+/**
+ * Emit one event on the event channel
+ * @param {string} type - Event type
+ * @param {Object} data - Event payload
+ */
+export function emitEvent(type, data = {}) {
+    const line = JSON.stringify({ type, ts: new Date().toISOString(), ...data });
+
+    if (eventsEnabled) {
+        process.stdout.write(`${EVENT_PREFIX}${line}\n`);
+    }
+
+    if (eventsFile) {
+        try {
+            fs.appendFileSync(eventsFile, line + '\n');
+        } catch (e) { }
+    }
+}
@@ -0,0 +1,90 @@
+import json
+
+# Must match EVENT_PREFIX in events.js
+EVENT_PREFIX = '@@grok-event '
+
+
+def parse_event_line(line):
+    """Split one stdout line into (log_text, event)
+
+    log_text is None for pure event lines and event is None for plain log
+    lines. Malformed event payloads are returned as log text.
+    """
+    index = line.find(EVENT_PREFIX)
+    if index < 0:
+        return line, None
+
+    text = line[:index].rstrip() or None
+    try:
+        event = json.loads(line[index + len(EVENT_PREFIX):])
+    except ValueError:
+        return line, None
+
+    if not isinstance(event, dict) or 'type' not in event:
+        return line, None
+    return text, event
+
+
+def read_manifest(manifest_path):
+    """Load the result.json a grok-automation.js job wrote into its directory
+
+    job-completed / job-failed events carry its path as manifestPath. Returns
+    None when the manifest is missing or unreadable.
+    """
+    if not manifest_path:
+        return None
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class BatchStats:
+    """Batch counters and per-scene status
+
+    Completed/failed counts come from the progress journal (update_progress);
+    protocol events keep the per-scene status current.
+    """
+
+    def __init__(self, total=0):
+        self.total = total
+        self.completed = 0
+        self.failed = 0
+        self.scenes = {}  # sceneNumber -> status/stage
+
+    @property
+    def pending(self):
+        return max(self.total - self.completed - self.failed, 0)
+
+    @property
+    def percent(self):
+        return round((self.completed + self.failed) * 100 / self.total) if self.total else 0
+
+    def update_progress(self, data):
+        """Take the run counters from progress data; returns True when they changed"""
+        counters = (data['totalScenes'], data['runCompleted'], data['runFailed'])
+        if counters == (self.total, self.completed, self.failed):
+            return False
+        self.total, self.completed, self.failed = counters
+        return True
+
+    def apply(self, event):
+        """Fold one event in; returns True when the counters changed"""
+        kind = event['type']
+        scene = event.get('sceneNumber')
+
+        if kind == 'batch-started':
+            self.total = event.get('total', self.total)
+            return True
+        if kind == 'scene-started':
+            self.scenes[scene] = 'started'
+        elif kind == 'stage' and scene is not None:
+            self.scenes[scene] = event.get('stage')
+        elif kind == 'scene-completed':
+            self.scenes[scene] = 'completed'
+        elif kind == 'scene-failed':
+            self.scenes[scene] = 'failed'
+        elif kind == 'scene-retry':
+            self.scenes[scene] = 'retrying'
+        return False
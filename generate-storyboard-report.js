@@ -1,6 +1,7 @@
 import fs from 'fs';
 import path from 'path';
 import { fileURLToPath } from 'url';
+import { journalPath, loadProgress } from './progress-journal.js';
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
@@ -13,11 +14,12 @@ const __dirname = path.dirname(__filename);
 export function generateStoryboardReport(outputFolder, scenesMap) {
     const progressFile = path.join(outputFolder, 'progress', 'batch_progress.json');
 
-    if (!fs.existsSync(progressFile)) {
+    if (!fs.existsSync(progressFile) && !fs.existsSync(journalPath(progressFile))) {
         throw new Error('Progress file not found');
     }
 
-    const progress = JSON.parse(fs.readFileSync(progressFile, 'utf-8'));
+    // Snapshot plus anything still in the journal
+    const progress = loadProgress(progressFile);
 
     // Build scenes data
     const scenes = [];
@@ -1,15 +1,54 @@
-import { chromium } from 'playwright';
 import fs from 'fs';
 import path from 'path';
+import readline from 'readline';
 import { fileURLToPath } from 'url';
+import { emitEvent, enableEvents, eventsEnabled } from './events.js';
+import { GenerationFailedError, watchForVideo } from './video-watcher.js';
+import { downloadFile } from './download.js';
+import { hashFile } from './result-cache.js';
+import { UploadRegistry } from './upload-registry.js';
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 
-console.log('🚀 Starting Grok Video Generation Automation (CDP Mode)...\n');
-
-// Load config from command line argument if provided
-let videoConfig = {
+// Usage:
+//   node grok-automation.js <config.json> [--port 9222] [--download-dir <dir>] [--wait-profile fast|conservative]
+//   node grok-automation.js --serve [--port 9222] [--download-dir <dir>] [--wait-profile fast|conservative]
+//                                   [--max-inflight 1] [--upload-registry <file>]
+//
+// --serve keeps one CDP connection open and reads one JSON job per stdin line
+// ({ jobId, sceneNumber, prompt, imagePath, duration, resolution, downloadDir, waitProfile,
+// checkpointPath }).
+// With --max-inflight N, up to N jobs run at once, each in its own tab: while one
+// tab waits for its generation, the next job uploads, pastes and submits in another.
+// Only one tab drives the UI at a time (focus and the clipboard are per browser).
+// Each job writes into its own directory, records the outcome in result.json there
+// and ends with a job-completed / job-failed event carrying its jobId and manifestPath.
+// With checkpointPath, the post URL of a submitted generation is saved there so a
+// later job for the same scene can reopen it instead of submitting again.
+// Image posts are remembered in the upload registry (default <download dir>/upload-registry.json,
+// one per account): a job whose image was uploaded before reopens that post and skips the upload.
+const args = process.argv;
+const serveMode = args.includes('--serve');
+
+const portIndex = args.indexOf('--port');
+const port = portIndex !== -1 ? args[portIndex + 1] : '9222';
+
+const downloadDirIndex = args.indexOf('--download-dir');
+const downloadDir = downloadDirIndex !== -1 ? path.resolve(args[downloadDirIndex + 1]) : path.join(__dirname, 'downloads');
+
+const waitProfileIndex = args.indexOf('--wait-profile');
+const waitProfile = waitProfileIndex !== -1 ? args[waitProfileIndex + 1] : 'fast';
+
+const maxInflightIndex = args.indexOf('--max-inflight');
+const maxInflight = maxInflightIndex !== -1 ? Math.max(1, parseInt(args[maxInflightIndex + 1], 10) || 1) : 1;
+
+const uploadRegistryIndex = args.indexOf('--upload-registry');
+const uploadRegistry = new UploadRegistry(uploadRegistryIndex !== -1
+    ? path.resolve(args[uploadRegistryIndex + 1])
+    : path.join(downloadDir, 'upload-registry.json'));
+
+const DEFAULT_VIDEO_CONFIG = {
     prompt: 'a cat playing with a butterfly in a sunny garden',
     imagePath: null,
     aspectRatio: '16:9',
@@ -17,58 +56,273 @@ let videoConfig = {
     resolution: '720p'
 };
 
-// Check if config file path is provided
-if (process.argv[2]) {
+// Configuration
+export const CONFIG = {
+    cdpUrl: `http://127.0.0.1:${port}`, // Chrome DevTools Protocol URL
+    grokUrl: 'https://grok.com/imagine',
+    downloadDir: downloadDir,
+    polling: {
+        timeoutMs: 360000,       // 6 minutes max wait time
+        fallbackIntervalMs: 10000 // poll events; the page itself is probed every 2s and the network listener fires immediately
+    },
+    waitProfile: waitProfile,
+    resume: {
+        minWaitMs: 60000,             // Always give a reopened post this long to show its video
+        maxAgeMs: 24 * 60 * 60 * 1000 // Older checkpoints are ignored
+    }
+};
+
+// UI synchronization. Every step waits for a real condition (element visible or
+// enabled, textarea holding the prompt, popover rendered, URL transition) with
+// its own timeout. The "conservative" profile also keeps the old fixed pauses
+// after each condition, for when Grok is slow to settle after rendering.
+const STEP_TIMEOUTS = {
+    pageReady: 15000,     // Composer visible after navigation
+    menu: 5000,           // Attach menu / options popover rendered
+    transition: 30000,    // Upload finished, URL moved to /imagine/post/*
+    postSettle: 5000,     // Reopened image post done loading its earlier videos
+    input: 15000,         // Prompt textarea visible and editable
+    focus: 3000,          // Textarea focused after click
+    promptValue: 5000,    // Textarea holds the pasted prompt
+    submit: 10000         // Submit button enabled
+};
+
+const WAIT_PROFILES = {
+    fast: {},
+    conservative: {
+        navigate: 3000,
+        onPage: 1000,
+        attach: 2000,
+        inputReady: 2000,
+        beforePaste: 3000,
+        afterPaste: 3000,
+        afterFill: 2000,
+        popover: 1500,
+        option: 500,
+        reopen: 800,
+        beforeSubmit: 1500,
+        settingsMenu: 1000,
+        settingsClose: 500,
+        textBeforePaste: 2000,
+        textAfterPaste: 2000
+    }
+};
+
+/**
+ * Fixed pause kept by the conservative profile (no-op for fast)
+ * @param {Object} page - Playwright page
+ * @param {Object} pauses - Entry of WAIT_PROFILES
+ * @param {string} step - Pause name
+ */
+async function settle(page, pauses, step) {
+    if (pauses[step]) await page.waitForTimeout(pauses[step]);
+}
+
+/**
+ * Wait until a locator is visible and enabled
+ * @param {Object} locator - Playwright locator
+ * @param {number} timeout - Timeout in ms
+ */
+async function waitForEnabled(locator, timeout) {
+    await locator.waitFor({ state: 'visible', timeout });
+    const handle = await locator.elementHandle({ timeout });
+    await handle.waitForElementState('enabled', { timeout });
+}
+
+/**
+ * Wait until a textarea / contenteditable holds the given text
+ * @param {Object} locator - Playwright locator of the input
+ * @param {string} text - Expected text (compared trimmed)
+ * @param {number} timeout - Timeout in ms
+ * @returns {boolean} Whether the text showed up in time
+ */
+async function waitForInputValue(locator, text, timeout) {
     try {
-        const configPath = path.resolve(process.argv[2]);
-        const configData = JSON.parse(fs.readFileSync(configPath, 'utf-8'));
-
-        if (configData.prompt) videoConfig.prompt = configData.prompt;
-        if (configData.aspectRatio) videoConfig.aspectRatio = configData.aspectRatio;
-        if (configData.duration) videoConfig.duration = configData.duration;
-        if (configData.resolution) videoConfig.resolution = configData.resolution;
-        if (configData.imagePath) videoConfig.imagePath = configData.imagePath;
-
-        console.log('✓ Config loaded from:', configPath);
-        console.log('📝 Prompt:', videoConfig.prompt);
-        console.log('⚙️  Video config:', `${videoConfig.aspectRatio} | ${videoConfig.duration} | ${videoConfig.resolution}\n`);
+        const handle = await locator.elementHandle({ timeout });
+        await locator.page().waitForFunction(([el, expected]) =>
+            ('value' in el ? el.value : el.innerText || '').trim() === expected,
+            [handle, text.trim()], { timeout });
+        return true;
+    } catch (e) {
+        return false;
+    }
+}
+
+/**
+ * Build a job from a config object (config file or one --serve stdin line)
+ * @param {Object} configData - Parsed config
+ * @returns {Object} Job with videoConfig, downloadDir and event fields
+ */
+export function createJob(configData) {
+    const videoConfig = { ...DEFAULT_VIDEO_CONFIG };
+
+    if (configData.prompt) videoConfig.prompt = configData.prompt;
+    if (configData.aspectRatio) videoConfig.aspectRatio = configData.aspectRatio;
+    if (configData.duration) videoConfig.duration = configData.duration;
+    if (configData.resolution) videoConfig.resolution = configData.resolution;
+    if (configData.imagePath) videoConfig.imagePath = configData.imagePath;
+
+    const eventFields = {};
+    if (configData.jobId !== undefined) eventFields.jobId = configData.jobId;
+    if (configData.sceneNumber !== undefined) eventFields.sceneNumber = configData.sceneNumber;
+
+    let profileName = configData.waitProfile || CONFIG.waitProfile;
+    if (!WAIT_PROFILES[profileName]) {
+        console.log(`⚠️ Unknown wait profile "${profileName}", using "fast"`);
+        profileName = 'fast';
+    }
+
+    // Every job gets its own directory (the caller's, or a fresh one under
+    // CONFIG.downloadDir) holding the video, debug screenshots and result.json
+    const stamp = new Date().toISOString().replace(/[:.]/g, '-');
+    const jobName = configData.sceneNumber !== undefined
+        ? `scene_${String(configData.sceneNumber).padStart(3, '0')}_${stamp}`
+        : `job_${stamp}`;
+
+    const jobDir = configData.downloadDir
+        ? path.resolve(configData.downloadDir)
+        : path.join(CONFIG.downloadDir, jobName);
+
+    return {
+        videoConfig,
+        downloadDir: jobDir,
+        manifestPath: path.join(jobDir, 'result.json'),
+        startedAt: new Date().toISOString(),
+        eventFields,
+        waitProfile: profileName,
+        pauses: WAIT_PROFILES[profileName],
+        resetToBase: false,
+        checkpointPath: configData.checkpointPath ? path.resolve(configData.checkpointPath) : null,
+        checkpoint: {},
+        resumedFrom: null,
+        imageHash: null,
+        reusedUpload: null,   // Post reopened instead of uploading, see openUploadedPost
+        acquireUi: null,      // Set by serve() when tabs share the browser, see createUiLock
+        stages: {},           // stage -> ms spent, see markStage
+        lastMark: Date.now()
+    };
+}
+
+/**
+ * Close a stage: everything since the previous mark is charged to it.
+ * Stages: connect, resume, queue (waiting for another tab to submit), navigate,
+ * upload, transition, paste, options, submit, generate (submit to first video
+ * seen), download.
+ * @param {Object} job - Job from createJob
+ * @param {string} stage - Stage that just ended
+ */
+function markStage(job, stage) {
+    const now = Date.now();
+    job.stages[stage] = (job.stages[stage] || 0) + now - job.lastMark;
+    job.lastMark = now;
+}
+
+/**
+ * Load the scene's checkpoint if it records a submitted generation of this same job
+ * @param {Object} job - Job from createJob
+ * @returns {Object|null} { postUrl, submittedAt, knownSrcs, ... }
+ */
+function readCheckpoint(job) {
+    if (!job.checkpointPath || !fs.existsSync(job.checkpointPath)) return null;
+
+    let checkpoint;
+    try {
+        checkpoint = JSON.parse(fs.readFileSync(job.checkpointPath, 'utf-8'));
     } catch (error) {
-        console.error('✗ Error loading config file:', error.message);
-        console.log('Using default configuration\n');
+        return null;
+    }
+
+    const age = Date.now() - Date.parse(checkpoint.submittedAt);
+    if (!checkpoint.postUrl || !(age < CONFIG.resume.maxAgeMs)) return null;
+
+    // An edited prompt or a different image means a different video
+    if (checkpoint.prompt !== job.videoConfig.prompt ||
+        (checkpoint.imagePath || null) !== (job.videoConfig.imagePath || null)) {
+        return null;
     }
+    return checkpoint;
 }
 
-// Configuration
-const CONFIG = {
-    cdpUrl: 'http://127.0.0.1:9222', // Chrome DevTools Protocol URL
-    grokUrl: 'https://grok.com/imagine',
-    downloadDir: path.join(__dirname, 'downloads'),
-    videoConfig: videoConfig,
-    polling: {
-        maxAttempts: 120, // 6 minutes max wait time
-        intervalMs: 3000  // Check every 3 seconds
+/**
+ * Merge fields into the job's checkpoint file (temp file + rename)
+ * @param {Object} job - Job from createJob
+ * @param {Object} fields - { postUrl, submittedAt, knownSrcs }
+ */
+function writeCheckpoint(job, fields) {
+    if (!job.checkpointPath) return;
+
+    job.checkpoint = {
+        ...job.checkpoint,
+        ...fields,
+        sceneNumber: job.eventFields.sceneNumber,
+        prompt: job.videoConfig.prompt,
+        imagePath: job.videoConfig.imagePath,
+        updatedAt: new Date().toISOString()
+    };
+
+    try {
+        fs.mkdirSync(path.dirname(job.checkpointPath), { recursive: true });
+        const tempPath = `${job.checkpointPath}.tmp`;
+        fs.writeFileSync(tempPath, JSON.stringify(job.checkpoint, null, 2));
+        fs.renameSync(tempPath, job.checkpointPath);
+    } catch (error) {
+        console.error(`⚠️ Could not write checkpoint ${job.checkpointPath}: ${error.message}`);
     }
-};
+}
+
+function clearCheckpoint(job) {
+    if (job.checkpointPath) {
+        fs.rmSync(job.checkpointPath, { force: true });
+    }
+}
 
-// Ensure download directory exists
-if (!fs.existsSync(CONFIG.downloadDir)) {
-    fs.mkdirSync(CONFIG.downloadDir, { recursive: true });
+/**
+ * Checkpoint a generation right after submit. The text flow may only move to its
+ * /imagine/post/ URL a moment later, so the URL is filled in once it shows up.
+ * @param {Object} page - Playwright page
+ * @param {Object} job - Job from createJob
+ * @param {Object} videoWatcher - Armed watcher (its known srcs are saved)
+ */
+function checkpointSubmit(page, job, videoWatcher) {
+    const fields = { submittedAt: new Date().toISOString(), knownSrcs: videoWatcher.knownSources() };
+    if (page.url().includes('/imagine/post/')) {
+        writeCheckpoint(job, { ...fields, postUrl: page.url() });
+        return;
+    }
+
+    writeCheckpoint(job, fields);
+    page.waitForURL('**/imagine/post/**', { timeout: STEP_TIMEOUTS.transition, waitUntil: 'commit' })
+        .then(() => writeCheckpoint(job, { postUrl: page.url() }))
+        .catch(() => { });
 }
 
-async function downloadVideo(page, url, filename) {
+/**
+ * Stream the video to disk with the browser's cookies, resuming on dropped connections
+ * @param {Object} page - Page the video was generated on
+ * @param {string} url - Video URL
+ * @param {string} filePath - Destination path
+ * @param {Function} emit - Event emitter for the current job
+ * @returns {string|null} filePath, or null when the download failed
+ */
+async function downloadVideo(page, url, filePath, emit) {
     console.log(`📥 Downloading video from: ${url}`);
     try {
-        const response = await page.context().request.get(url);
-        if (!response.ok()) {
-            console.error(`❌ Download failed: ${response.status()} ${response.statusText()}`);
-            return null;
+        // Authenticate like the page does
+        const cookies = await page.context().cookies(url);
+        const headers = {
+            'User-Agent': await page.evaluate(() => navigator.userAgent),
+            'Referer': page.url()
+        };
+        if (cookies.length > 0) {
+            headers.Cookie = cookies.map(c => `${c.name}=${c.value}`).join('; ');
         }
-        const buffer = await response.body();
 
-        const filePath = path.join(CONFIG.downloadDir, filename);
-        fs.writeFileSync(filePath, buffer);
+        const size = await downloadFile(url, filePath, {
+            headers,
+            onProgress: (bytes, total) => emit('download-progress', { bytes, total })
+        });
 
-        const sizeMB = (buffer.length / 1024 / 1024).toFixed(2);
+        const sizeMB = (size / 1024 / 1024).toFixed(2);
         console.log(`✅ Video saved: ${filePath} (${sizeMB} MB)`);
         return filePath;
     } catch (error) {
@@ -77,443 +331,759 @@ async function downloadVideo(page, url, filename) {
     }
 }
 
-async function main() {
-    let browser;
+/**
+ * Connect to the Chrome instance on CONFIG.cdpUrl
+ * @param {Function} emit - Event emitter for the current job
+ * @returns {Object} { browser, context }
+ */
+async function connectBrowser(emit) {
+    console.log(`🔌 Connecting to Chrome on ${CONFIG.cdpUrl}...`);
+    emit('stage', { stage: 'connect' });
+    // Loaded here so the job functions can be imported (tests) without Playwright
+    const { chromium } = await import('playwright');
+    const browser = await chromium.connectOverCDP(CONFIG.cdpUrl);
+    const context = browser.contexts()[0];
+
+    console.log('✅ Connected to Chrome!');
+
+    // Grant clipboard permissions
+    await context.grantPermissions(['clipboard-read', 'clipboard-write'], {
+        origin: 'https://grok.com'
+    });
+
+    return { browser, context };
+}
+
+function printConnectionHelp() {
+    console.log('\n💡 Solution:');
+    console.log('1. Launch Chrome with debugging:');
+    console.log(`   "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe" --remote-debugging-port=${port} --user-data-dir="C:\\chrome-debug-profile"`);
+    console.log('2. Navigate to https://grok.com/imagine');
+    console.log('3. Run this script again');
+}
 
+/**
+ * Generate and download one video in a tab of an already connected browser
+ * @param {Object} page - Playwright page the job may drive
+ * @param {Object} job - Job from createJob
+ * @param {Function} generate - Fresh-generation step (page, job, videoWatcher), generateVideo
+ * @returns {string} Path of the downloaded video
+ */
+export async function runJob(page, job, generate = generateVideo) {
+    fs.mkdirSync(job.downloadDir, { recursive: true });
+
+    // Listen for the video before anything is submitted so no response is missed
+    let videoWatcher = watchForVideo(page);
     try {
-        // Connect to existing Chrome instance
-        console.log(`🔌 Connecting to Chrome on ${CONFIG.cdpUrl}...`);
-        browser = await chromium.connectOverCDP(CONFIG.cdpUrl);
+        // A generation submitted by an earlier run may still be running (or done) server-side
+        const checkpoint = readCheckpoint(job);
+        if (checkpoint) {
+            const resumedPath = await resumeFromCheckpoint(page, job, videoWatcher, checkpoint)
+                .catch(error => {
+                    console.log(`⚠️ Resume failed: ${error.message}`);
+                    return null;
+                });
+            if (resumedPath) {
+                clearCheckpoint(job);
+                return resumedPath;
+            }
+            job.resetToBase = true; // Start over from /imagine, not from the old post
+
+            // The resume armed the watcher on the old post: leaving it for /imagine
+            // would count as a failure, so the new generation gets its own
+            videoWatcher.dispose();
+            videoWatcher = watchForVideo(page);
+        }
 
-        const context = browser.contexts()[0];
-        const page = context.pages()[0] || await context.newPage();
+        const videoPath = await generate(page, job, videoWatcher);
+        clearCheckpoint(job);
+        return videoPath;
+    } finally {
+        videoWatcher.dispose();
+    }
+}
 
-        console.log('✅ Connected to Chrome!');
+/**
+ * Reopen the post of a generation submitted by an earlier run and wait for its video
+ * @param {Object} page - Playwright page
+ * @param {Object} job - Job from createJob
+ * @param {Object} videoWatcher - Watcher from watchForVideo (not armed yet)
+ * @param {Object} checkpoint - Checkpoint from readCheckpoint
+ * @returns {string|null} Downloaded video path, or null to generate from scratch
+ */
+async function resumeFromCheckpoint(page, job, videoWatcher, checkpoint) {
+    const emit = (type, data = {}) => emitEvent(type, { ...job.eventFields, ...data });
+    console.log(`♻️  Resuming generation submitted at ${checkpoint.submittedAt}`);
+    console.log(`   Post: ${checkpoint.postUrl}`);
+    emit('stage', { stage: 'resume' });
+
+    // Armed with the srcs from before the original submit, so the finished video counts as new
+    await videoWatcher.arm(checkpoint.knownSrcs || []);
+    await page.goto(checkpoint.postUrl, { waitUntil: 'domcontentloaded' });
+
+    const elapsed = Date.now() - Date.parse(checkpoint.submittedAt);
+    const found = await videoWatcher.wait({
+        timeoutMs: Math.max(CONFIG.resume.minWaitMs, CONFIG.polling.timeoutMs - elapsed),
+        intervalMs: CONFIG.polling.fallbackIntervalMs,
+        onTick: (attempt) => pollTick(emit, attempt)
+    });
+
+    markStage(job, 'resume');
+    if (!found) {
+        console.log('\n⚠️ No video on the checkpointed post, generating again');
+        return null;
+    }
+
+    console.log('\n');
+    job.resumedFrom = checkpoint.postUrl;
+    return await saveVideo(page, job, found, emit);
+}
+
+function pollTick(emit, attempt) {
+    if (eventsEnabled) emit('poll', { attempt });
+    else process.stdout.write('.');
+}
 
-        // Grant clipboard permissions
-        await context.grantPermissions(['clipboard-read', 'clipboard-write'], {
-            origin: 'https://grok.com'
+/**
+ * Report and download the video found by the watcher into the job directory
+ * @param {Object} page - Playwright page
+ * @param {Object} job - Job from createJob
+ * @param {Object} found - { url, via } from the watcher
+ * @param {Function} emit - Event emitter for the current job
+ * @returns {string} Path of the downloaded video
+ */
+async function saveVideo(page, job, found, emit) {
+    const videoSrc = found.url;
+    console.log(`🎉 Video generated successfully!`);
+    console.log(`URL: ${videoSrc} (detected via ${found.via})\n`);
+    emit('video-found', { url: videoSrc, via: found.via });
+    emit('stage', { stage: 'download' });
+
+    const timestamp = new Date().toISOString().replace(/[:.]/g, '-');
+    const filePath = path.join(job.downloadDir, `grok_video_${timestamp}.mp4`);
+
+    const savedPath = await downloadVideo(page, videoSrc, filePath, emit);
+    markStage(job, 'download');
+    if (!savedPath) {
+        throw new Error('Video download failed');
+    }
+    return savedPath;
+}
+
+/**
+ * Record the job's outcome in <job dir>/result.json and emit job-completed / job-failed.
+ * Runners read the manifest to find the output instead of scanning directories.
+ * @param {Object} job - Job from createJob
+ * @param {Object} result - { videoPath } on success, { reason } on failure
+ */
+function finishJob(job, result) {
+    const status = result.videoPath ? 'completed' : 'failed';
+    const manifest = {
+        status,
+        ...job.eventFields,
+        prompt: job.videoConfig.prompt,
+        imagePath: job.videoConfig.imagePath,
+        ...result,
+        ...(job.resumedFrom ? { resumedFrom: job.resumedFrom } : {}),
+        ...(job.reusedUpload ? { reusedUpload: job.reusedUpload } : {}),
+        stages: job.stages,
+        totalMs: Date.now() - Date.parse(job.startedAt),
+        startedAt: job.startedAt,
+        finishedAt: new Date().toISOString()
+    };
+    if (result.videoPath) {
+        manifest.bytes = fs.statSync(result.videoPath).size;
+    }
+
+    try {
+        // Write-then-rename so a reader never sees a half-written manifest
+        fs.mkdirSync(job.downloadDir, { recursive: true });
+        const tempPath = `${job.manifestPath}.tmp`;
+        fs.writeFileSync(tempPath, JSON.stringify(manifest, null, 2));
+        fs.renameSync(tempPath, job.manifestPath);
+    } catch (error) {
+        console.error(`⚠️ Could not write ${job.manifestPath}: ${error.message}`);
+    }
+
+    emitEvent(status === 'completed' ? 'job-completed' : 'job-failed', {
+        ...job.eventFields,
+        ...result,
+        manifestPath: job.manifestPath
+    });
+}
+
+/**
+ * Serializes the UI-driving part of jobs that share one browser. Focus and the
+ * system clipboard belong to the browser, so only one tab may upload, paste and
+ * submit at a time; generation waits and downloads run concurrently.
+ * @returns {Function} acquire() resolving to a release function
+ */
+function createUiLock() {
+    let tail = Promise.resolve();
+    return () => {
+        let release;
+        const turn = new Promise(resolve => { release = resolve; });
+        const acquired = tail.then(() => release);
+        tail = tail.then(() => turn);
+        return acquired;
+    };
+}
+
+/**
+ * Upload the job's image and wait for Grok to open its /imagine/post/ page
+ * @param {Object} page - Playwright page (on /imagine)
+ * @param {Object} job - Job from createJob
+ * @param {Function} emit - Event emitter for the current job
+ */
+async function uploadImage(page, job, emit) {
+    console.log(`📤 Uploading image: ${job.videoConfig.imagePath}`);
+    emit('stage', { stage: 'upload' });
+
+    // 1. Click Attach Button (Paperclip)
+    const attachBtn = page.locator('button[aria-label="Attach files"], button[aria-label="Attach"]').first();
+    await attachBtn.waitFor({ state: 'visible', timeout: 10000 });
+    await attachBtn.click();
+
+    // 2. Click "Upload a file" from menu once the menu has rendered
+    const uploadOption = page.locator('div[role="menuitem"], button').filter({ hasText: 'Upload a file' }).first();
+    await uploadOption.waitFor({ state: 'visible', timeout: STEP_TIMEOUTS.menu });
+    await settle(page, job.pauses, 'attach');
+
+    // Start file chooser *before* clicking upload
+    const fileChooserPromise = page.waitForEvent('filechooser');
+    await uploadOption.click();
+    const fileChooser = await fileChooserPromise;
+
+    // 3. Select file
+    await fileChooser.setFiles(job.videoConfig.imagePath);
+    console.log('✅ File selected in system dialog');
+    markStage(job, 'upload');
+
+    // 4. Wait for upload to complete and URL to change to /post/*
+    console.log('⏳ Waiting for image upload and page transition...');
+    emit('stage', { stage: 'transition' });
+
+    // Wait for URL to change to /post/* format (Image-to-Video page)
+    try {
+        await page.waitForURL('**/imagine/post/**', {
+            timeout: STEP_TIMEOUTS.transition,
+            waitUntil: 'commit'
         });
+        const newUrl = page.url();
+        console.log(`✅ Transitioned to Image-to-Video page: ${newUrl}`);
+        writeCheckpoint(job, { postUrl: newUrl });
+        if (job.imageHash) uploadRegistry.set(job.imageHash, newUrl);
+    } catch (e) {
+        console.log('⚠️ URL did not change to /post/* format, but continuing...');
+        console.log(`   Current URL: ${page.url()}`);
+    }
+    markStage(job, 'transition');
+}
 
-        // Navigate to Grok Imagine only if not already there
-        const currentUrl = page.url();
-        const isOnGrokImagine = currentUrl.includes('grok.com/imagine');
+/**
+ * Reopen the post of an earlier upload of the job's image, if this account has one
+ * @param {Object} page - Playwright page
+ * @param {Object} job - Job from createJob
+ * @param {Function} emit - Event emitter for the current job
+ * @returns {boolean} Whether the page is on that post, ready for the prompt
+ */
+async function openUploadedPost(page, job, emit) {
+    const { imagePath } = job.videoConfig;
+    if (!imagePath || imagePath.trim() === "") return false;
 
-        if (!isOnGrokImagine) {
-            console.log(`📍 Navigating to https://grok.com/imagine...`);
-            await page.goto('https://grok.com/imagine', { waitUntil: 'domcontentloaded' });
-            console.log('⏳ Waiting for UI to load...');
-            await page.waitForTimeout(3000); // Wait for initialization
-        } else {
-            console.log(`✅ Already on Grok Imagine page: ${currentUrl}`);
-            // Don't reload - we might already have an image uploaded or be in a post
-            await page.waitForTimeout(1000); // Small wait for stability
+    try {
+        job.imageHash = hashFile(imagePath);
+    } catch (error) {
+        return false; // The upload itself will report the unreadable image
+    }
+    const entry = uploadRegistry.get(job.imageHash);
+    if (!entry) return false;
+
+    console.log(`♻️  Image uploaded before, reopening its post: ${entry.postUrl}`);
+    emit('stage', { stage: 'navigate' });
+    try {
+        await page.goto(entry.postUrl, { waitUntil: 'domcontentloaded' });
+        // A deleted post redirects away or never shows the video prompt
+        await page.locator('textarea[aria-label="Make a video"]').first()
+            .waitFor({ state: 'visible', timeout: STEP_TIMEOUTS.pageReady });
+        if (!page.url().includes('/imagine/post/')) {
+            throw new Error(`redirected to ${page.url()}`);
         }
+        // Let videos generated on this post earlier load now, so the watcher
+        // records them as known before it is armed
+        await page.waitForLoadState('networkidle', { timeout: STEP_TIMEOUTS.postSettle }).catch(() => { });
+    } catch (error) {
+        console.log(`⚠️ Uploaded post not usable (${error.message}), uploading again`);
+        uploadRegistry.delete(job.imageHash);
+        job.resetToBase = true;
+        return false;
+    }
+
+    uploadRegistry.set(job.imageHash, entry.postUrl);
+    writeCheckpoint(job, { postUrl: entry.postUrl });
+    job.reusedUpload = entry.postUrl;
+    return true;
+}
+
+/**
+ * Drive the Grok UI for one job up to and including the submit
+ * @param {Object} page - Playwright page
+ * @param {Object} job - Job from createJob
+ * @param {Object} videoWatcher - Watcher from watchForVideo (armed here before submitting)
+ */
+async function submitVideo(page, job, videoWatcher) {
+    const { videoConfig, downloadDir, pauses } = job;
+    const emit = (type, data = {}) => emitEvent(type, { ...job.eventFields, ...data });
+
+    console.log('📝 Prompt:', videoConfig.prompt);
+    console.log('⚙️  Video config:', `${videoConfig.aspectRatio} | ${videoConfig.duration} | ${videoConfig.resolution}\n`);
+    console.log(`⏱️  Wait profile: ${job.waitProfile}`);
+
+    // An image this account uploaded before: go straight to its post
+    const reusedPost = await openUploadedPost(page, job, emit);
+
+    // Navigate to Grok Imagine only if not already there
+    // (a warm worker may still sit on the previous job's /imagine/post/ page)
+    const currentUrl = page.url();
+    const isOnGrokImagine = currentUrl.includes('grok.com/imagine') &&
+        !(job.resetToBase && currentUrl.includes('/imagine/post/'));
+
+    // The composer (attach button or prompt box) means the UI has initialized
+    const composer = page.locator('button[aria-label="Attach files"], button[aria-label="Attach"], textarea').first();
+
+    if (reusedPost) {
+        console.log(`✅ Reopened uploaded image: ${currentUrl}`);
+        await settle(page, pauses, 'onPage');
+    } else if (!isOnGrokImagine) {
+        console.log(`📍 Navigating to https://grok.com/imagine...`);
+        emit('stage', { stage: 'navigate' });
+        await page.goto('https://grok.com/imagine', { waitUntil: 'domcontentloaded' });
+        console.log('⏳ Waiting for UI to load...');
+        await composer.waitFor({ state: 'visible', timeout: STEP_TIMEOUTS.pageReady })
+            .catch(() => console.log('⚠️ Composer not visible yet, continuing...'));
+        await settle(page, pauses, 'navigate');
+    } else {
+        console.log(`✅ Already on Grok Imagine page: ${currentUrl}`);
+        // Don't reload - we might already have an image uploaded or be in a post
+        await composer.waitFor({ state: 'visible', timeout: STEP_TIMEOUTS.pageReady })
+            .catch(() => console.log('⚠️ Composer not visible yet, continuing...'));
+        await settle(page, pauses, 'onPage');
+    }
+
+    console.log('✅ Page ready!\n');
+    markStage(job, 'navigate');
 
-        console.log('✅ Page ready!\n');
+    // ==========================================
+    // VIDEO GENERATION FLOW
+    // ==========================================
 
+    if (videoConfig.imagePath && videoConfig.imagePath.trim() !== "") {
         // ==========================================
-        // VIDEO GENERATION FLOW
+        // IMAGE-TO-VIDEO FLOW
         // ==========================================
+        console.log('🖼️ Mode: Image-to-Video detected');
 
-        if (CONFIG.videoConfig.imagePath && CONFIG.videoConfig.imagePath.trim() !== "") {
-            // ==========================================
-            // IMAGE-TO-VIDEO FLOW
-            // ==========================================
-            console.log('🖼️ Mode: Image-to-Video detected');
-            console.log(`📤 Uploading image: ${CONFIG.videoConfig.imagePath}`);
+        if (!reusedPost) {
+            await uploadImage(page, job, emit);
+        }
+
+        // 5. Enter Prompt (Copy-Paste)
+        // Use the verified selector for Image-to-Video input
+        const customizingInput = page.locator('textarea[aria-label="Make a video"]').first();
 
-            // 1. Click Attach Button (Paperclip)
-            const attachBtn = page.locator('button[aria-label="Attach files"], button[aria-label="Attach"]').first();
-            await attachBtn.waitFor({ state: 'visible', timeout: 10000 });
-            await attachBtn.click();
-            await page.waitForTimeout(2000);
+        // Wait for the input area to be ready
+        console.log('⏳ Waiting for input area to be ready...');
+        try {
+            await waitForEnabled(customizingInput, STEP_TIMEOUTS.input);
+            console.log('✅ Input area ready');
+        } catch (e) {
+            console.log(`⚠️ Input area not ready within ${STEP_TIMEOUTS.input / 1000}s: ${e.message}`);
+            console.log('   Continuing anyway...');
+        }
+        await settle(page, pauses, 'inputReady');
+
+        // No fallback needed - we have the exact selector
+        console.log('✍️ Targeting input: Image-to-Video textarea');
+        emit('stage', { stage: 'prompt' });
+        await customizingInput.click();
+        await customizingInput.evaluate(
+            (el, timeout) => new Promise(resolve => {
+                if (document.activeElement === el) return resolve();
+                el.addEventListener('focus', resolve, { once: true });
+                setTimeout(resolve, timeout);
+            }),
+            STEP_TIMEOUTS.focus
+        );
+        await settle(page, pauses, 'beforePaste');
+
+        console.log(`   Pasting prompt...`);
+        if (reusedPost) {
+            await customizingInput.fill(''); // A reopened post may keep the last prompt
+        }
 
-            // 2. Click "Upload a file" from menu
-            const uploadOption = page.locator('div[role="menuitem"], button').filter({ hasText: 'Upload a file' }).first();
+        // Clipboard paste trick
+        await page.evaluate((text) => navigator.clipboard.writeText(text), videoConfig.prompt);
+        await customizingInput.press('Control+V');
+
+        // Verify the text was pasted
+        // The clipboard is shared by every Chrome on this machine, so with parallel
+        // workers another worker may have overwritten it between write and paste.
+        const pasted = await waitForInputValue(customizingInput, videoConfig.prompt, STEP_TIMEOUTS.promptValue);
+        await settle(page, pauses, 'afterPaste');
+        if (!pasted) {
+            console.log('⚠️ Paste might have failed, trying fallback typing...');
+            await customizingInput.fill(videoConfig.prompt);
+            await waitForInputValue(customizingInput, videoConfig.prompt, STEP_TIMEOUTS.promptValue);
+            await settle(page, pauses, 'afterFill');
+        } else {
+            console.log('✅ Prompt paste verified');
+        }
+        markStage(job, 'paste');
 
-            // Start file chooser *before* clicking upload
-            const fileChooserPromise = page.waitForEvent('filechooser');
-            await uploadOption.click();
-            const fileChooser = await fileChooserPromise;
+        // ==========================================
+        // STEP 5.5: CONFIGURE VIDEO OPTIONS
+        // ==========================================
+        console.log('⚙️ Configuring Video Options...');
+        emit('stage', { stage: 'options' });
 
-            // 3. Select file
-            await fileChooser.setFiles(CONFIG.videoConfig.imagePath);
-            console.log('✅ File selected in system dialog');
+        // VERIFIED: Image-to-Video uses "Video Options"
+        const optionsBtn = page.locator('button[aria-label="Video Options"]').first();
 
-            // 4. Wait for upload to complete and URL to change to /post/*
-            console.log('⏳ Waiting for image upload and page transition...');
+        // Popover buttons: aria-label first, visible text as fallback
+        const optionButton = (value) => page.locator(`button[aria-label="${value}"]`)
+            .or(page.getByRole('button').filter({ hasText: value }))
+            .first();
 
-            // Wait for URL to change to /post/* format (Image-to-Video page)
+        try {
+            // Wait for button to be ready
+            await optionsBtn.waitFor({ state: 'visible', timeout: 5000 });
+            console.log('   Found Video Options button, clicking...');
+            await optionsBtn.click();
+
+            // Duration - gated on the popover having rendered its buttons
+            const duration = videoConfig.duration;
+            const durationBtn = optionButton(duration);
             try {
-                await page.waitForFunction(
-                    () => window.location.href.includes('/imagine/post/'),
-                    { timeout: 30000 }
-                );
-                const newUrl = page.url();
-                console.log(`✅ Transitioned to Image-to-Video page: ${newUrl}`);
-            } catch (e) {
-                console.log('⚠️ URL did not change to /post/* format, but continuing...');
-                console.log(`   Current URL: ${page.url()}`);
-            }
-
-            // Wait for the input area to be ready
-            console.log('⏳ Waiting for input area to be visible...');
+                await durationBtn.waitFor({ state: 'visible', timeout: STEP_TIMEOUTS.menu });
+                await settle(page, pauses, 'popover');
+                await durationBtn.click();
+                console.log(`   ✅ Set Duration: ${duration}`);
+                await settle(page, pauses, 'option');
+            } catch (e) { console.log(`   ⚠️ Failed to set duration: ${e.message}`); }
+
+            // IMPORTANT: Menu auto-closes after clicking duration
+            // Need to reopen menu to select resolution
+            console.log('   🔄 Reopening menu for resolution selection...');
+            await durationBtn.waitFor({ state: 'hidden', timeout: STEP_TIMEOUTS.menu }).catch(() => { });
+            await settle(page, pauses, 'reopen');
+            await optionsBtn.click();
+
+            // Resolution
+            const resolution = videoConfig.resolution;
             try {
-                const promptArea = page.locator('textarea[aria-label="Make a video"]').first();
-                await promptArea.waitFor({ state: 'visible', timeout: 15000 });
-                console.log('✅ Input area ready');
-            } catch (e) {
-                console.log(`⚠️ Input area not detected within 15s: ${e.message}`);
-                console.log('   Continuing anyway...');
-            }
-            await page.waitForTimeout(2000); // Extra wait for stability
-
-            // 5. Enter Prompt (Copy-Paste)
-            // Use the verified selector for Image-to-Video input
-            const customizingInput = page.locator('textarea[aria-label="Make a video"]').first();
-
-            // No fallback needed - we have the exact selector
-            console.log('✍️ Targeting input: Image-to-Video textarea');
-            await customizingInput.click();
-            console.log('   Input clicked, waiting 3s...');
-            await page.waitForTimeout(3000); // WAIT 3 SECONDS
-
-            console.log(`   Pasting prompt...`);
-
-            // Clipboard paste trick
-            await page.evaluate((text) => navigator.clipboard.writeText(text), CONFIG.videoConfig.prompt);
-            await customizingInput.press('Control+V');
-
-            console.log('   Paste command sent, waiting 3s...');
-            await page.waitForTimeout(3000); // WAIT 3 SECONDS
-
-            // Verify if text was pasted
-            const inputValue = await customizingInput.inputValue().catch(async () => await customizingInput.innerText());
-            if (!inputValue || inputValue.length < 5) {
-                console.log('⚠️ Paste might have failed, trying fallback typing...');
-                await customizingInput.fill(CONFIG.videoConfig.prompt);
-                await page.waitForTimeout(2000);
-            } else {
-                console.log('✅ Prompt paste verified');
-            }
+                const resolutionBtn = optionButton(resolution);
+                await resolutionBtn.waitFor({ state: 'visible', timeout: STEP_TIMEOUTS.menu });
+                await settle(page, pauses, 'popover');
+                await resolutionBtn.click();
+                console.log(`   ✅ Set Resolution: ${resolution}`);
+                await settle(page, pauses, 'option');
+            } catch (e) { console.log(`   ⚠️ Could not set Resolution ${resolution}: ${e.message}`); }
+
+            // NOTE: Aspect Ratio is NOT available in Image-to-Video mode
+            // The aspect ratio is determined by the uploaded image
+            console.log('   ℹ️ Aspect Ratio not configurable in Image-to-Video mode (inherited from image)');
+
+            // CRITICAL FIX: DO NOT PRESS ESCAPE!
+            // Escape key triggers "Back" navigation in Grok, returning to /imagine
+            // Instead, we click Make video button directly with the menu still open
+            console.log('   ✅ Video options configured (menu left open)');
+
+        } catch (e) {
+            console.log(`⚠️ Video Options button not found or error occurred: ${e.message}`);
+            console.log('   Skipping video configuration.');
+        }
+        markStage(job, 'options');
 
-            // ==========================================
-            // STEP 5.5: CONFIGURE VIDEO OPTIONS
-            // ==========================================
-            console.log('⚙️ Configuring Video Options...');
+        // NO REFOCUS NEEDED - We're not closing the menu
+        // Just take debug screenshot and proceed to submit
 
-            // VERIFIED: Image-to-Video uses "Video Options"
-            const optionsBtn = page.locator('button[aria-label="Video Options"]').first();
+        // DEBUG: Take screenshot to see UI state
+        await page.screenshot({ path: path.join(downloadDir, 'debug_after_paste.png') });
+        console.log('📸 Debug screenshot saved: debug_after_paste.png');
 
-            try {
-                // Wait for button to be ready
-                await optionsBtn.waitFor({ state: 'visible', timeout: 5000 });
-                console.log('   Found Video Options button, clicking...');
-                await optionsBtn.click();
-
-                // CRITICAL: Wait longer for popover menu to fully render
-                await page.waitForTimeout(1500);
-
-                // Duration - using aria-label for precise targeting
-                const duration = CONFIG.videoConfig.duration;
-                try {
-                    const durationBtn = page.locator(`button[aria-label="${duration}"]`);
-                    if (await durationBtn.isVisible({ timeout: 2000 })) {
-                        await durationBtn.click();
-                        console.log(`   ✅ Set Duration: ${duration}`);
-                        await page.waitForTimeout(500);
-                    } else {
-                        console.log(`   ⚠️ Duration aria-label not found, trying text selector...`);
-                        const durationText = page.getByRole('button').filter({ hasText: duration });
-                        await durationText.click({ timeout: 2000 });
-                        console.log(`   ✅ Set Duration (text): ${duration}`);
-                    }
-                } catch (e) { console.log(`   ⚠️ Failed to set duration: ${e.message}`); }
-
-                // IMPORTANT: Menu auto-closes after clicking duration
-                // Need to reopen menu to select resolution
-                console.log('   🔄 Reopening menu for resolution selection...');
-                await page.waitForTimeout(800);
-                await optionsBtn.click();
-                await page.waitForTimeout(1500);
-
-                // Resolution - using multiple selector strategies
-                const resolution = CONFIG.videoConfig.resolution;
-                try {
-                    // Try aria-label first
-                    let resolutionSet = false;
-                    const resolutionBtn = page.locator(`button[aria-label="${resolution}"]`);
-
-                    if (await resolutionBtn.count() > 0 && await resolutionBtn.first().isVisible({ timeout: 2000 })) {
-                        await resolutionBtn.first().click();
-                        console.log(`   ✅ Set Resolution: ${resolution}`);
-                        resolutionSet = true;
-                    } else {
-                        // Fallback: Try to find button containing text
-                        console.log(`   ⚠️ Resolution aria-label not found, trying text selector...`);
-                        const resolutionText = page.getByRole('button').filter({ hasText: resolution });
-                        if (await resolutionText.count() > 0) {
-                            await resolutionText.first().click({ timeout: 2000 });
-                            console.log(`   ✅ Set Resolution (text): ${resolution}`);
-                            resolutionSet = true;
-                        }
-                    }
+        // 6. Submit
+        console.log('🎬 Generating video...');
+        emit('stage', { stage: 'submit' });
+        await videoWatcher.arm();
 
-                    if (resolutionSet) {
-                        await page.waitForTimeout(500);
-                    } else {
-                        console.log(`   ⚠️ Could not find Resolution button for ${resolution}`);
-                    }
-                } catch (e) { console.log(`   ⚠️ Failed to set resolution: ${e.message}`); }
+        // Verify we're still on the Image-to-Video page (/post/*)
+        const currentUrl = page.url();
+        if (!currentUrl.includes('/imagine/post/')) {
+            console.log(`❌ ERROR: Page navigated away from Image-to-Video interface!`);
+            console.log(`   Expected URL pattern: https://grok.com/imagine/post/*`);
+            console.log(`   Current URL: ${currentUrl}`);
+            console.log('   This usually means the image upload failed or the UI was interrupted.');
+            console.log('   Attempting to continue anyway, but video generation might fail...');
+        } else {
+            console.log(`✅ Still on Image-to-Video page: ${currentUrl}`);
+        }
 
-                // NOTE: Aspect Ratio is NOT available in Image-to-Video mode
-                // The aspect ratio is determined by the uploaded image
-                console.log('   ℹ️ Aspect Ratio not configurable in Image-to-Video mode (inherited from image)');
+        // In Image-to-Video mode, the submit button has aria-label="Make video"
+        // Try "Make video" first (Image-to-Video), then "Submit" (fallback)
+        let buttonFound = false;
 
-                // CRITICAL FIX: DO NOT PRESS ESCAPE!
-                // Escape key triggers "Back" navigation in Grok, returning to /imagine
-                // Instead, we click Make video button directly with the menu still open
-                console.log('   ✅ Video options configured (menu left open)');
+        try {
+            const submitBtn = page.locator('button[aria-label="Make video"]')
+                .or(page.locator('button[aria-label="Submit"]'))
+                .first();
+            await waitForEnabled(submitBtn, STEP_TIMEOUTS.submit);
+            await settle(page, pauses, 'beforeSubmit');
+            const label = await submitBtn.getAttribute('aria-label');
+            console.log(`   Found "${label}" button, clicking...`);
+            await submitBtn.click();
+            buttonFound = true;
+            console.log(`   ✅ ${label} button clicked`);
+            checkpointSubmit(page, job, videoWatcher);
+        } catch (e) {
+            console.log(`   ⚠️ Error finding button: ${e.message}`);
+        }
 
-            } catch (e) {
-                console.log(`⚠️ Video Options button not found or error occurred: ${e.message}`);
-                console.log('   Skipping video configuration.');
-            }
+        // Final fallback: Enter key
+        if (!buttonFound) {
+            console.log('   No submit button found, using Enter key...');
+            await page.keyboard.press('Enter');
+            console.log('   ✅ Enter key pressed');
+            checkpointSubmit(page, job, videoWatcher);
+        }
 
-            // NO REFOCUS NEEDED - We're not closing the menu
-            // Just take debug screenshot and proceed to submit
-
-            // DEBUG: Take screenshot to see UI state
-            await page.screenshot({ path: path.join(__dirname, 'debug_after_paste.png') });
-            console.log('📸 Debug screenshot saved: debug_after_paste.png');
-
-            // 6. Submit
-            console.log('🎬 Generating video...');
-            await page.waitForTimeout(1500); // Wait for button to become enabled
-
-            // Verify we're still on the Image-to-Video page (/post/*)
-            const currentUrl = page.url();
-            if (!currentUrl.includes('/imagine/post/')) {
-                console.log(`❌ ERROR: Page navigated away from Image-to-Video interface!`);
-                console.log(`   Expected URL pattern: https://grok.com/imagine/post/*`);
-                console.log(`   Current URL: ${currentUrl}`);
-                console.log('   This usually means the image upload failed or the UI was interrupted.');
-                console.log('   Attempting to continue anyway, but video generation might fail...');
-            } else {
-                console.log(`✅ Still on Image-to-Video page: ${currentUrl}`);
-            }
+        console.log('✅ Request sent');
+        markStage(job, 'submit');
 
-            // In Image-to-Video mode, the submit button has aria-label="Make video"
-            // Try "Make video" first (Image-to-Video), then "Submit" (fallback)
-            let buttonFound = false;
+    } else {
+        // ==========================================
+        // TEXT-TO-VIDEO FLOW (Standard)
+        // ==========================================
+        console.log('📝 Mode: Text-to-Video');
 
+        // Step 1: Open Settings
+        console.log('⚙️ Step 1: Configuring Video Settings...');
+        emit('stage', { stage: 'options' });
+
+        const settingsTrigger = page.locator('button', { hasText: 'Video' }).first();
+        await settingsTrigger.waitFor({ state: 'visible', timeout: 10000 });
+
+        if (await settingsTrigger.isVisible()) {
+            await settingsTrigger.click();
+            console.log('   Opened settings menu');
+
+            // The menu is rendered once its duration entry shows up
+            const duration = videoConfig.duration;
+            const durationOption = page.locator(`text=${duration}`).last();
+            await durationOption.waitFor({ state: 'visible', timeout: STEP_TIMEOUTS.menu }).catch(() => { });
+            await settle(page, pauses, 'settingsMenu');
+
+            // Duration
             try {
-                // Priority 1: "Make video" button (Image-to-Video mode)
-                const makeVideoBtn = page.locator('button[aria-label="Make video"]').first();
-                if (await makeVideoBtn.count() > 0 && await makeVideoBtn.isVisible({ timeout: 2000 })) {
-                    console.log('   Found "Make video" button, clicking...');
-                    await makeVideoBtn.click();
-                    buttonFound = true;
-                    console.log('   ✅ Make video button clicked');
-                } else {
-                    // Priority 2: "Submit" button (Text-to-Video mode fallback)
-                    console.log('   "Make video" not found, trying "Submit"...');
-                    const submitBtn = page.locator('button[aria-label="Submit"]').first();
-                    if (await submitBtn.count() > 0 && await submitBtn.isVisible({ timeout: 2000 })) {
-                        console.log('   Found "Submit" button, clicking...');
-                        await submitBtn.click();
-                        buttonFound = true;
-                        console.log('   ✅ Submit button clicked');
-                    }
+                if (await durationOption.isVisible()) {
+                    await durationOption.click();
+                    console.log(`   ✅ Set Duration: ${duration}`);
                 }
-            } catch (e) {
-                console.log(`   ⚠️ Error finding button: ${e.message}`);
-            }
+            } catch (e) { console.log(`   ⚠️ Failed to set duration: ${e.message}`); }
 
-            // Final fallback: Enter key
-            if (!buttonFound) {
-                console.log('   No submit button found, using Enter key...');
-                await page.keyboard.press('Enter');
-                console.log('   ✅ Enter key pressed');
-            }
-
-            console.log('✅ Request sent');
+            // Resolution
+            const resolution = videoConfig.resolution;
+            try {
+                const resolutionOption = page.locator(`text=${resolution}`).last();
+                if (await resolutionOption.isVisible()) {
+                    await resolutionOption.click();
+                    console.log(`   ✅ Set Resolution: ${resolution}`);
+                }
+            } catch (e) { console.log(`   ⚠️ Failed to set resolution: ${e.message}`); }
 
-        } else {
-            // ==========================================
-            // TEXT-TO-VIDEO FLOW (Standard)
-            // ==========================================
-            console.log('📝 Mode: Text-to-Video');
-
-            // Step 1: Open Settings
-            console.log('⚙️ Step 1: Configuring Video Settings...');
-
-            const settingsTrigger = page.locator('button', { hasText: 'Video' }).first();
-            await settingsTrigger.waitFor({ state: 'visible', timeout: 10000 });
-
-            if (await settingsTrigger.isVisible()) {
-                await settingsTrigger.click();
-                console.log('   Opened settings menu');
-                await page.waitForTimeout(1000);
-
-                // Duration
-                const duration = CONFIG.videoConfig.duration;
-                try {
-                    const durationOption = page.locator(`text=${duration}`).last();
-                    if (await durationOption.isVisible()) {
-                        await durationOption.click();
-                        console.log(`   ✅ Set Duration: ${duration}`);
-                    }
-                } catch (e) { console.log(`   ⚠️ Failed to set duration: ${e.message}`); }
-
-                // Resolution
-                const resolution = CONFIG.videoConfig.resolution;
-                try {
-                    const resolutionOption = page.locator(`text=${resolution}`).last();
-                    if (await resolutionOption.isVisible()) {
-                        await resolutionOption.click();
-                        console.log(`   ✅ Set Resolution: ${resolution}`);
-                    }
-                } catch (e) { console.log(`   ⚠️ Failed to set resolution: ${e.message}`); }
-
-                // Aspect Ratio (Global Indexing)
-                const aspectStr = CONFIG.videoConfig.aspectRatio;
-                try {
-                    let globalIndex = -1;
-                    if (aspectStr === '16:9') globalIndex = 8;
-                    else if (aspectStr === '9:16') globalIndex = 4;
-                    else if (aspectStr === '1:1') globalIndex = 6;
-
-                    if (globalIndex !== -1) {
-                        // Find container with "Aspect Ratio" and "6s"
-                        const container = page.locator('div', { has: page.locator('text=Aspect Ratio') }).filter({ has: page.locator('text=6s') }).last();
-                        if (await container.isVisible()) {
-                            const buttonsInMenu = container.locator('button');
-                            if (await buttonsInMenu.count() >= 9) {
-                                await buttonsInMenu.nth(globalIndex).click();
-                                console.log(`   ✅ Set Aspect Ratio: ${aspectStr} (Menu Index ${globalIndex})`);
-                            }
+            // Aspect Ratio (Global Indexing)
+            const aspectStr = videoConfig.aspectRatio;
+            try {
+                let globalIndex = -1;
+                if (aspectStr === '16:9') globalIndex = 8;
+                else if (aspectStr === '9:16') globalIndex = 4;
+                else if (aspectStr === '1:1') globalIndex = 6;
+
+                if (globalIndex !== -1) {
+                    // Find container with "Aspect Ratio" and "6s"
+                    const container = page.locator('div', { has: page.locator('text=Aspect Ratio') }).filter({ has: page.locator('text=6s') }).last();
+                    if (await container.isVisible()) {
+                        const buttonsInMenu = container.locator('button');
+                        if (await buttonsInMenu.count() >= 9) {
+                            await buttonsInMenu.nth(globalIndex).click();
+                            console.log(`   ✅ Set Aspect Ratio: ${aspectStr} (Menu Index ${globalIndex})`);
                         }
                     }
-                } catch (e) { console.log(`   ⚠️ Failed to set aspect ratio: ${e.message}`); }
-
-                // Mode: Video
-                try {
-                    const videoModeBtn = page.locator('div, button').filter({ hasText: 'Generate a video' }).last();
-                    if (await videoModeBtn.isVisible()) {
-                        await videoModeBtn.click();
-                        console.log('   ✅ Selected Mode: Video');
-                    }
-                } catch (e) { console.log(`   ⚠️ Failed to set Video mode: ${e.message}`); }
+                }
+            } catch (e) { console.log(`   ⚠️ Failed to set aspect ratio: ${e.message}`); }
 
-                await page.waitForTimeout(500);
+            // Mode: Video
+            try {
+                const videoModeBtn = page.locator('div, button').filter({ hasText: 'Generate a video' }).last();
+                if (await videoModeBtn.isVisible()) {
+                    await videoModeBtn.click();
+                    console.log('   ✅ Selected Mode: Video');
+                }
+            } catch (e) { console.log(`   ⚠️ Failed to set Video mode: ${e.message}`); }
 
-                // Close settings
-                const promptArea = page.locator('textarea, div[contenteditable="true"]').first();
-                if (await promptArea.isVisible()) await promptArea.click();
-                else await page.keyboard.press('Escape');
-                await page.waitForTimeout(500);
+            await settle(page, pauses, 'settingsClose');
 
-            } else {
-                console.log('⚠️ Could not find Settings/Video menu button. Using defaults.');
-            }
+            // Close settings and wait for the menu to go away
+            const promptArea = page.locator('textarea, div[contenteditable="true"]').first();
+            if (await promptArea.isVisible()) await promptArea.click();
+            else await page.keyboard.press('Escape');
+            await durationOption.waitFor({ state: 'hidden', timeout: STEP_TIMEOUTS.menu }).catch(() => { });
+            await settle(page, pauses, 'settingsClose');
 
-            // Step 2: Prompt (Copy-Paste)
-            console.log(`✍️  Step 2: Pasting prompt: "${CONFIG.videoConfig.prompt}"`);
-            let promptInput = page.locator('textarea');
-            if (await promptInput.count() === 0) {
-                promptInput = page.locator('div[contenteditable="true"], div[role="textbox"]');
-            }
+        } else {
+            console.log('⚠️ Could not find Settings/Video menu button. Using defaults.');
+        }
+        markStage(job, 'options');
+
+        // Step 2: Prompt (Copy-Paste)
+        console.log(`✍️  Step 2: Pasting prompt: "${videoConfig.prompt}"`);
+        emit('stage', { stage: 'prompt' });
+        let promptInput = page.locator('textarea');
+        if (await promptInput.count() === 0) {
+            promptInput = page.locator('div[contenteditable="true"], div[role="textbox"]');
+        }
 
-            await promptInput.first().click();
-            await page.waitForTimeout(2000); // WAIT 2 SECONDS
+        await waitForEnabled(promptInput.first(), STEP_TIMEOUTS.input).catch(() => { });
+        await promptInput.first().click();
+        await settle(page, pauses, 'textBeforePaste');
 
-            // Clipboard paste trick
-            await page.evaluate((text) => navigator.clipboard.writeText(text), CONFIG.videoConfig.prompt);
-            await promptInput.first().press('Control+V');
+        // Clipboard paste trick
+        await page.evaluate((text) => navigator.clipboard.writeText(text), videoConfig.prompt);
+        await promptInput.first().press('Control+V');
 
-            await page.waitForTimeout(2000); // WAIT 2 SECONDS
-            console.log('✅ Prompt pasted');
+        if (!await waitForInputValue(promptInput.first(), videoConfig.prompt, STEP_TIMEOUTS.promptValue)) {
+            console.log('⚠️ Paste might have failed, trying fallback typing...');
+            await promptInput.first().fill(videoConfig.prompt);
+            await waitForInputValue(promptInput.first(), videoConfig.prompt, STEP_TIMEOUTS.promptValue);
+        }
+        await settle(page, pauses, 'textAfterPaste');
+        console.log('✅ Prompt pasted');
+        markStage(job, 'paste');
+
+        // Step 3: Submit
+        console.log('🎬 Step 3: Generating video...');
+        emit('stage', { stage: 'submit' });
+        await videoWatcher.arm();
+        await page.keyboard.press('Enter');
+        console.log('✅ Request sent (Enter key)');
+        checkpointSubmit(page, job, videoWatcher);
+        markStage(job, 'submit');
+    }
+}
 
-            // Step 3: Submit
-            console.log('🎬 Step 3: Generating video...');
-            await page.keyboard.press('Enter');
-            console.log('✅ Request sent (Enter key)');
+/**
+ * Submit the job, then wait for its video and download it
+ * @param {Object} page - Playwright page
+ * @param {Object} job - Job from createJob
+ * @param {Object} videoWatcher - Watcher from watchForVideo
+ * @returns {string} Path of the downloaded video
+ */
+async function generateVideo(page, job, videoWatcher) {
+    if (job.acquireUi) {
+        const releaseUi = await job.acquireUi();
+        markStage(job, 'queue');
+        try {
+            await page.bringToFront();
+            await submitVideo(page, job, videoWatcher);
+        } finally {
+            releaseUi();
         }
+    } else {
+        await submitVideo(page, job, videoWatcher);
+    }
 
-        console.log('⏳ Waiting for video generation...');
+    const { downloadDir } = job;
+    const emit = (type, data = {}) => emitEvent(type, { ...job.eventFields, ...data });
 
-        // ==========================================
-        // STEP 4: POLL FOR VIDEO
-        // ==========================================
+    console.log('⏳ Waiting for video generation...');
+    emit('stage', { stage: 'waiting' });
 
-        try {
-            // Capture existing videos to ignore them
-            const existingVideos = await page.evaluate(() =>
-                Array.from(document.querySelectorAll('video')).map(v => v.src)
-            );
-
-            let videoSrc = null;
-            let attempts = 0;
-
-            while (!videoSrc && attempts < CONFIG.polling.maxAttempts) {
-                await page.waitForTimeout(CONFIG.polling.intervalMs);
-                process.stdout.write('.');
-
-                videoSrc = await page.evaluate((known) => {
-                    const videos = Array.from(document.querySelectorAll('video'));
-                    const newVideo = videos.find(v =>
-                        v.src &&
-                        !v.src.startsWith('blob:') &&
-                        !known.includes(v.src)
-                    );
-                    return newVideo ? newVideo.src : null;
-                }, existingVideos);
-
-                attempts++;
-            }
+    // ==========================================
+    // STEP 4: WAIT FOR VIDEO
+    // ==========================================
 
-            console.log('\n');
+    let found = null;
 
-            if (videoSrc) {
-                console.log(`🎉 Video generated successfully!`);
-                console.log(`URL: ${videoSrc}\n`);
+    try {
+        found = await videoWatcher.wait({
+            timeoutMs: CONFIG.polling.timeoutMs,
+            intervalMs: CONFIG.polling.fallbackIntervalMs,
+            onTick: (attempt) => pollTick(emit, attempt)
+        });
+        markStage(job, 'generate');
 
-                const timestamp = new Date().toISOString().replace(/[:.]/g, '-');
-                const filename = `grok_video_${timestamp}.mp4`;
+        console.log('\n');
+    } catch (error) {
+        console.error('❌ Error during video polling:', error.message);
+        const screenshotPath = path.join(downloadDir, 'error_screenshot.png');
+        await page.screenshot({ path: screenshotPath }).catch(() => { });
+        console.log(`Screenshot saved: ${screenshotPath}`);
+        throw error;
+    }
 
-                await downloadVideo(page, videoSrc, filename);
+    if (!found) {
+        const minutes = CONFIG.polling.timeoutMs / 60000;
+        console.error(`❌ Timeout: Video did not appear after ${minutes} minutes`);
+        const screenshotPath = path.join(downloadDir, 'error_screenshot.png');
+        await page.screenshot({ path: screenshotPath }).catch(() => { });
+        console.log(`Screenshot saved: ${screenshotPath}`);
+        throw new GenerationFailedError('timeout', `video did not appear after ${minutes} minutes`);
+    }
 
-                // Close browser after successful download
-                console.log('\n🔒 Closing browser...');
-                await browser.close();
-                console.log('✅ Browser closed successfully!');
-                console.log('\n🎊 ALL DONE! Video downloaded and browser closed.');
-            } else {
-                console.error('❌ Timeout: Video did not appear after 6 minutes');
-                const screenshotPath = path.join(__dirname, 'error_screenshot.png');
-                await page.screenshot({ path: screenshotPath });
-                console.log(`Screenshot saved: ${screenshotPath}`);
-                process.exit(1); // Exit with error code
-            }
+    return await saveVideo(page, job, found, emit);
+}
+
+/**
+ * Single-shot mode: run the job in configPath, then close the connection
+ * @param {string} configPath - Path of the job config JSON
+ */
+async function runOnce(configPath) {
+    let configData = {};
+    if (configPath) {
+        try {
+            configData = JSON.parse(fs.readFileSync(path.resolve(configPath), 'utf-8'));
+            console.log('✓ Config loaded from:', path.resolve(configPath));
         } catch (error) {
-            console.error('❌ Error during video polling:', error.message);
-            const screenshotPath = path.join(__dirname, 'error_screenshot.png');
-            await page.screenshot({ path: screenshotPath }).catch(() => { });
-            console.log(`Screenshot saved: ${screenshotPath}`);
-            throw error; // Re-throw to be caught by main try-catch
+            console.error('✗ Error loading config file:', error.message);
+            console.log('Using default configuration\n');
         }
+    }
+
+    const job = createJob(configData);
+    const emit = (type, data = {}) => emitEvent(type, { ...job.eventFields, ...data });
+    let browser;
+
+    try {
+        const connection = await connectBrowser(emit);
+        browser = connection.browser;
+        markStage(job, 'connect');
+
+        const page = connection.context.pages()[0] || await connection.context.newPage();
+        const videoPath = await runJob(page, job);
+        finishJob(job, { videoPath });
+
+        // Close browser after successful download
+        console.log('\n🔒 Closing browser...');
+        await browser.close();
+        console.log('✅ Browser closed successfully!');
+        console.log('\n🎊 ALL DONE! Video downloaded and browser closed.');
 
     } catch (error) {
         console.error('\n❌ Error:', error.message);
+        process.exitCode = 1; // Let the batch runner see the failure
+        finishJob(job, { reason: error.message, ...(error.kind ? { kind: error.kind } : {}) });
 
         if (error.message.includes('ECONNREFUSED')) {
-            console.log('\n💡 Solution:');
-            console.log('1. Launch Chrome with debugging:');
-            console.log('   "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe" --remote-debugging-port=9222 --user-data-dir="C:\\chrome-debug-profile"');
-            console.log('2. Navigate to https://grok.com/imagine');
-            console.log('3. Run this script again');
+            printConnectionHelp();
         }
     } finally {
         // Browser is now closed in the success path (after download)
@@ -526,5 +1096,119 @@ async function main() {
     }
 }
 
-// Run automation
-main().catch(console.error);
+/**
+ * Worker mode: connect once and run jobs read from stdin, one JSON object per line.
+ * Up to maxInflight jobs run at once, each in its own tab of the same browser.
+ */
+async function serve() {
+    enableEvents(); // Results are reported as events even on a terminal
+    console.log(`👷 Worker mode: waiting for jobs on stdin (port ${port}, up to ${maxInflight} in flight)`);
+
+    let connection = null;
+    let connecting = null;
+    let jobsRun = 0;
+    const tabs = [];            // { page, busy, used }, reused across jobs
+    const running = new Set();  // Promises of the jobs in flight
+    const acquireUi = maxInflight > 1 ? createUiLock() : null;
+    const lines = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+
+    // Jobs in flight share one connection; the first to find it gone reconnects
+    const getConnection = async (job, emit) => {
+        if (connection && connection.browser.isConnected()) return connection;
+        if (!connecting) {
+            connecting = connectBrowser(emit)
+                .then(fresh => {
+                    connection = fresh;
+                    tabs.length = 0; // Pages of the old connection are gone
+                    return fresh;
+                })
+                .finally(() => { connecting = null; });
+        }
+        const fresh = await connecting;
+        markStage(job, 'connect');
+        return fresh;
+    };
+
+    const takeTab = async (context) => {
+        for (let i = tabs.length - 1; i >= 0; i--) {
+            if (tabs[i].page.isClosed()) tabs.splice(i, 1);
+        }
+        let tab = tabs.find(t => !t.busy);
+        if (!tab) {
+            // The first tab is the one already open; extra in-flight jobs get new ones
+            const page = (tabs.length === 0 && context.pages()[0]) || await context.newPage();
+            tab = { page, busy: false, used: false };
+            tabs.push(tab);
+        }
+        tab.busy = true;
+        return tab;
+    };
+
+    const handleJob = async (configData, job) => {
+        const emit = (type, data = {}) => emitEvent(type, { ...job.eventFields, ...data });
+        let tab = null;
+        try {
+            const { context } = await getConnection(job, emit);
+            tab = await takeTab(context);
+            // A used tab may still sit on the previous job's post
+            job.resetToBase = tab.used;
+            tab.used = true;
+            const videoPath = await runJob(tab.page, job);
+            finishJob(job, { videoPath });
+        } catch (error) {
+            console.error(`❌ Job ${configData.jobId ?? ''} failed: ${error.message}`);
+            finishJob(job, { reason: error.message, ...(error.kind ? { kind: error.kind } : {}) });
+            if (error.message.includes('ECONNREFUSED')) {
+                printConnectionHelp();
+            }
+        } finally {
+            if (tab) tab.busy = false;
+        }
+    };
+
+    for await (const line of lines) {
+        if (!line.trim()) continue;
+
+        let configData;
+        try {
+            configData = JSON.parse(line);
+        } catch (error) {
+            console.error(`✗ Invalid job line: ${error.message}`);
+            continue;
+        }
+
+        // Every slot busy: the next job starts when one finishes
+        while (running.size >= maxInflight) {
+            await Promise.race(running);
+        }
+
+        const job = createJob(configData);
+        job.acquireUi = acquireUi;
+        jobsRun++;
+
+        console.log(`\n${'='.repeat(60)}`);
+        console.log(`📦 Job ${configData.jobId ?? jobsRun}`);
+
+        const task = handleJob(configData, job).finally(() => running.delete(task));
+        running.add(task);
+    }
+
+    await Promise.all(running);
+
+    // stdin closed: detach from Chrome without closing it
+    console.log('👋 Worker shutting down');
+    process.exit(0);
+}
+
+// Run automation (not when imported, e.g. by the tests)
+const isMain = /grok-automation\.c?js$/.test(process.argv[1] || '');
+if (isMain && serveMode) {
+    console.log('🚀 Starting Grok Video Generation Automation (CDP Worker Mode)...\n');
+    serve().catch(error => {
+        console.error('❌ Fatal error:', error);
+        process.exit(1);
+    });
+} else if (isMain) {
+    console.log('🚀 Starting Grok Video Generation Automation (CDP Mode)...\n');
+    runOnce(args[2] && !args[2].startsWith('--') ? args[2] : null).catch(console.error);
+}
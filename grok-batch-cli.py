@@ -0,0 +1,143 @@
+import argparse
+import shlex
+import signal
+import sys
+import threading
+
+from batch_engine import DEFAULT_OPTIONS, BatchEngine, BatchError
+from project_queue import PRIORITIES
+
+# Headless batch runner: same engine and options as grok-batch-gui.py, no Tk.
+#
+#   python grok-batch-cli.py <script> <images-folder> <output-folder> [--workers 3] [--max-inflight 2] ...
+#   python grok-batch-cli.py --queue projects.json [<script> <images> <output> --priority high]
+#
+# With --queue every project queued there (e.g. by the GUI) runs too, the
+# workers shared between them by priority.
+#
+# Ctrl+C / SIGTERM drains (running scenes finish), a second one stops hard.
+# Control commands, one per stdin line: pause | resume | drain | stop | list
+# | add <script> <images> <output> [priority] | cancel <id> | up <id> | down <id>
+# | priority <id> <high|normal|low>.
+# Exits with 1 when any scene failed.
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Generate every scene of a script with Grok Imagine")
+    parser.add_argument('script_path', nargs='?', default='', help="script file (Scene N: ... blocks)")
+    parser.add_argument('images_folder', nargs='?', default='', help="folder with one image per scene")
+    parser.add_argument('output_folder', nargs='?', default='', help="videos, progress and logs go here")
+    parser.add_argument('--priority', choices=list(PRIORITIES), default=DEFAULT_OPTIONS['priority'],
+                        help="share of the workers this project gets next to other queued ones")
+    parser.add_argument('--queue', help="project queue file (projects.json) to run and add to")
+    parser.add_argument('--duration', choices=['6s', '10s'], default=DEFAULT_OPTIONS['duration'])
+    parser.add_argument('--resolution', choices=['480p', '720p'], default=DEFAULT_OPTIONS['resolution'])
+    parser.add_argument('--workers', type=int, default=DEFAULT_OPTIONS['workers'],
+                        help="accounts (one Chrome each) working in parallel")
+    parser.add_argument('--base-port', type=int, default=DEFAULT_OPTIONS['base_port'],
+                        help="CDP port of worker 1; worker N uses base-port + N - 1")
+    parser.add_argument('--max-inflight', type=int, default=DEFAULT_OPTIONS['max_inflight'],
+                        help="scenes per worker generating at once, one tab each")
+    parser.add_argument('--min-delay', type=int, default=DEFAULT_OPTIONS['min_delay'])
+    parser.add_argument('--max-delay', type=int, default=DEFAULT_OPTIONS['max_delay'])
+    parser.add_argument('--conservative-waits', action='store_true',
+                        help="keep fixed pauses between UI steps")
+    parser.add_argument('--no-prep-images', action='store_true', help="upload the original images")
+    parser.add_argument('--no-cache', action='store_true', help="do not reuse videos from the result cache")
+    parser.add_argument('--include-completed', action='store_true', help="also run scenes marked (done)")
+    return parser.parse_args(argv)
+
+
+def print_projects(engine):
+    for entry in engine.queue.entries():
+        print(f"  #{entry['id']} {entry['name']}  {entry['priority']}  {entry['state']}", flush=True)
+
+
+def read_commands(engine):
+    """Apply control commands from stdin until it closes"""
+    actions = {'pause': engine.pause, 'resume': engine.resume, 'drain': engine.drain, 'stop': engine.stop}
+    project_actions = {
+        'cancel': engine.cancel_project,
+        'up': lambda project_id: engine.move_project(project_id, -1),
+        'down': lambda project_id: engine.move_project(project_id, 1)
+    }
+    for line in sys.stdin:
+        try:
+            words = shlex.split(line)
+        except ValueError:
+            words = line.split()
+        command, args = (words[0].lower(), words[1:]) if words else ('', [])
+        try:
+            if command in actions and not args:
+                actions[command]()
+            elif command == 'list':
+                print_projects(engine)
+            elif command == 'add' and len(args) in (3, 4):
+                engine.add_project(*args[:3], priority=args[3] if len(args) == 4 else 'normal')
+            elif command in project_actions and len(args) == 1:
+                project_actions[command](int(args[0]))
+            elif command == 'priority' and len(args) == 2 and args[1] in PRIORITIES:
+                engine.set_priority(int(args[0]), args[1])
+            elif command:
+                print(f"⚠️  Unknown control command: {line.strip()}", flush=True)
+        except (BatchError, ValueError) as e:
+            print(f"⚠️  {line.strip()}: {e}", flush=True)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    finished = {}
+
+    engine = BatchEngine(
+        {
+            'script_path': args.script_path,
+            'images_folder': args.images_folder,
+            'output_folder': args.output_folder,
+            'duration': args.duration,
+            'resolution': args.resolution,
+            'workers': args.workers,
+            'base_port': args.base_port,
+            'max_inflight': args.max_inflight,
+            'min_delay': args.min_delay,
+            'max_delay': args.max_delay,
+            'wait_profile': 'conservative' if args.conservative_waits else 'fast',
+            'skip_completed': not args.include_completed,
+            'prep_images': not args.no_prep_images,
+            'result_cache': not args.no_cache,
+            'priority': args.priority,
+            'queue_file': args.queue
+        },
+        on_log=lambda message: print(message, flush=True),
+        on_finished=finished.update
+    )
+
+    try:
+        jobs = engine.plan()
+    except BatchError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    if not engine.start():
+        print("Không có scene nào để xử lý")
+        return 0
+
+    def on_signal(signum, frame):
+        if engine.state == 'draining':
+            engine.stop()
+        else:
+            engine.drain()
+
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+    threading.Thread(target=read_commands, args=(engine,), daemon=True).start()
+
+    # Short waits keep the main thread responsive to signals
+    while not engine.wait(0.5):
+        pass
+
+    print(f"\n✅ Completed: {finished.get('runCompleted', 0)}/{finished.get('totalScenes', len(jobs))}  "
+          f"❌ Failed: {finished.get('runFailed', 0)}", flush=True)
+    return 1 if finished.get('runFailed') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
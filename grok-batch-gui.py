@@ -1,22 +1,47 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext, messagebox
-import json
-import subprocess
 import threading
+import time
 import os
-from pathlib import Path
+
+from batch_engine import BatchEngine, BatchError
+from events import BatchStats
+import image_prep
+from image_index import get_image_index
+from log_pipeline import LogPipeline
+from progress_journal import ProgressTail
+from project_queue import ProjectQueue
+from script_parser import get_script_parser, parse_script_file
+
+# Priority labels of the project queue (weights in project_queue.PRIORITIES)
+PRIORITY_LABELS = {'high': 'Cao', 'normal': 'Thường', 'low': 'Thấp'}
+STATE_LABELS = {'queued': '⏳ Chờ', 'running': '▶️ Đang chạy', 'done': '✅ Xong', 'cancelled': '🚫 Đã hủy'}
 
 class BatchVideoGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Grok Batch Video Generator")
-        self.root.geometry("900x700")
+        self.root.geometry("900x860")
         self.root.configure(bg='#2b2b2b')
         
         # State
-        self.process = None
+        self.engine = None
+        self.pool = None
         self.is_running = False
         self.is_paused = False
+        self.closing = None  # 'drain' or 'stop' once the window was closed during a batch
+        self.worker_labels = {}
+        self.worker_state = {}
+        self.worker_details = {}
+        self.worker_pacing = {}
+        self.stats = BatchStats()
+        self.image_bytes = [0, 0]
+        self.progress_tails = {}  # project id -> ProgressTail
+        self.project_queue = ProjectQueue(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'projects.json'),
+                                          on_log=self.log)
+        self.scene_rows = []
+        self.scene_source = None
+        self.scene_loading = False
         
         # Create GUI
         self.create_widgets()
@@ -163,6 +188,176 @@ class BatchVideoGUI:
             padx=15
         ).pack(side=tk.LEFT)
         
+        # Priority of this project next to the others in the queue
+        queue_row = tk.Frame(input_frame, bg='#363636')
+        queue_row.pack(fill=tk.X, padx=10, pady=5)
+        
+        tk.Label(
+            queue_row,
+            text="Ưu tiên:",
+            font=('Segoe UI', 9),
+            fg='#ffffff',
+            bg='#363636',
+            width=12,
+            anchor='w'
+        ).pack(side=tk.LEFT)
+        
+        self.priority = tk.StringVar(value=PRIORITY_LABELS['normal'])
+        ttk.Combobox(
+            queue_row,
+            textvariable=self.priority,
+            values=list(PRIORITY_LABELS.values()),
+            state='readonly',
+            width=10
+        ).pack(side=tk.LEFT, padx=5)
+        
+        tk.Button(
+            queue_row,
+            text="➕ Thêm vào hàng đợi",
+            command=self.add_project,
+            bg='#0d7377',
+            fg='#ffffff',
+            font=('Segoe UI', 9),
+            cursor='hand2',
+            relief=tk.FLAT,
+            padx=15
+        ).pack(side=tk.LEFT, padx=5)
+        
+        # Scene preview / latency summary tabs
+        info_tabs = ttk.Notebook(main_container)
+        info_tabs.pack(fill=tk.X, pady=(0, 10))
+        
+        scenes_frame = tk.Frame(info_tabs, bg='#363636')
+        info_tabs.add(scenes_frame, text=" 📋 Scenes ")
+        
+        self.scene_summary = tk.Label(
+            scenes_frame,
+            text="Chưa chọn kịch bản",
+            font=('Segoe UI', 9),
+            fg='#aaaaaa',
+            bg='#363636',
+            anchor='w'
+        )
+        self.scene_summary.pack(fill=tk.X, padx=10, pady=(5, 0))
+        
+        table_row = tk.Frame(scenes_frame, bg='#363636')
+        table_row.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.scene_table = ttk.Treeview(
+            table_row,
+            columns=('scene', 'done', 'image', 'prompt'),
+            show='headings',
+            height=6
+        )
+        for column, heading, width, anchor in (
+            ('scene', 'Scene', 60, 'center'),
+            ('done', 'Done', 50, 'center'),
+            ('image', 'Ảnh', 50, 'center'),
+            ('prompt', 'Prompt', 600, 'w')
+        ):
+            self.scene_table.heading(column, text=heading)
+            self.scene_table.column(column, width=width, anchor=anchor, stretch=(column == 'prompt'))
+        self.scene_table.tag_configure('done', foreground='#888888')
+        self.scene_table.tag_configure('missing', foreground='#f44336')
+        
+        scene_scroll = ttk.Scrollbar(table_row, orient=tk.VERTICAL, command=self.scene_table.yview)
+        self.scene_table.configure(yscrollcommand=scene_scroll.set)
+        self.scene_table.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        scene_scroll.pack(side=tk.LEFT, fill=tk.Y)
+        
+        latency_frame = tk.Frame(info_tabs, bg='#363636')
+        info_tabs.add(latency_frame, text=" ⏱️ Latency ")
+        
+        self.latency_summary = tk.Label(
+            latency_frame,
+            text="Chưa có dữ liệu (thời gian từng bước của mỗi scene, theo p50/p95/max)",
+            font=('Segoe UI', 9),
+            fg='#aaaaaa',
+            bg='#363636',
+            anchor='w'
+        )
+        self.latency_summary.pack(fill=tk.X, padx=10, pady=(5, 0))
+        
+        latency_row = tk.Frame(latency_frame, bg='#363636')
+        latency_row.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.latency_table = ttk.Treeview(
+            latency_row,
+            columns=('metric', 'count', 'p50', 'p95', 'max'),
+            show='headings',
+            height=6
+        )
+        for column, heading, width in (
+            ('metric', 'Bước', 160),
+            ('count', 'Số job', 70),
+            ('p50', 'p50', 100),
+            ('p95', 'p95', 100),
+            ('max', 'Max', 100)
+        ):
+            self.latency_table.heading(column, text=heading)
+            self.latency_table.column(column, width=width, anchor='w' if column == 'metric' else 'e')
+        
+        latency_scroll = ttk.Scrollbar(latency_row, orient=tk.VERTICAL, command=self.latency_table.yview)
+        self.latency_table.configure(yscrollcommand=latency_scroll.set)
+        self.latency_table.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        latency_scroll.pack(side=tk.LEFT, fill=tk.Y)
+        
+        projects_frame = tk.Frame(info_tabs, bg='#363636')
+        info_tabs.add(projects_frame, text=" 📚 Hàng đợi ")
+        
+        projects_row = tk.Frame(projects_frame, bg='#363636')
+        projects_row.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.project_table = ttk.Treeview(
+            projects_row,
+            columns=('id', 'name', 'priority', 'state', 'progress', 'output'),
+            show='headings',
+            height=6,
+            selectmode='browse'
+        )
+        for column, heading, width in (
+            ('id', '#', 40),
+            ('name', 'Project', 160),
+            ('priority', 'Ưu tiên', 70),
+            ('state', 'Trạng thái', 110),
+            ('progress', 'Tiến độ', 80),
+            ('output', 'Output', 300)
+        ):
+            self.project_table.heading(column, text=heading)
+            self.project_table.column(column, width=width, anchor='w' if column in ('name', 'output') else 'center',
+                                      stretch=(column == 'output'))
+        
+        projects_scroll = ttk.Scrollbar(projects_row, orient=tk.VERTICAL, command=self.project_table.yview)
+        self.project_table.configure(yscrollcommand=projects_scroll.set)
+        self.project_table.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        projects_scroll.pack(side=tk.LEFT, fill=tk.Y)
+        
+        # Reorder / re-prioritize / cancel the selected project, also while the batch runs
+        project_buttons = tk.Frame(projects_frame, bg='#363636')
+        project_buttons.pack(fill=tk.X, padx=10, pady=(0, 5))
+        for text, command in (
+            ("⬆ Lên", lambda: self.move_project(-1)),
+            ("⬇ Xuống", lambda: self.move_project(1)),
+            ("⚡ Đặt ưu tiên đã chọn", self.set_project_priority),
+            ("✖ Hủy / Xóa", self.cancel_project)
+        ):
+            tk.Button(
+                project_buttons,
+                text=text,
+                command=command,
+                bg='#607D8B',
+                fg='#ffffff',
+                font=('Segoe UI', 9),
+                cursor='hand2',
+                relief=tk.FLAT,
+                padx=10
+            ).pack(side=tk.LEFT, padx=(0, 5))
+        self.refresh_projects()
+        
+        self.script_path.trace_add('write', lambda *_: self.watch_scenes(reschedule=False))
+        self.images_folder.trace_add('write', lambda *_: self.watch_scenes(reschedule=False))
+        self.root.after(1000, self.watch_scenes)
+        
         # Settings Section
         settings_frame = tk.LabelFrame(
             main_container,
@@ -231,40 +426,151 @@ class BatchVideoGUI:
         )
         skip_check.grid(row=0, column=4, padx=20, pady=5)
         
+        # Wait profile: conservative keeps the fixed pauses between UI steps
+        self.conservative_waits = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            settings_grid,
+            text="Chờ an toàn (chậm hơn)",
+            variable=self.conservative_waits,
+            font=('Segoe UI', 9),
+            fg='#ffffff',
+            bg='#363636',
+            selectcolor='#2b2b2b',
+            activebackground='#363636',
+            activeforeground='#ffffff'
+        ).grid(row=0, column=5, padx=5, pady=5)
+        
+        # Downscale / re-encode images before upload (needs Pillow)
+        self.prep_images = tk.BooleanVar(value=image_prep.available)
+        tk.Checkbutton(
+            settings_grid,
+            text="Tối ưu ảnh trước khi upload",
+            variable=self.prep_images,
+            state=tk.NORMAL if image_prep.available else tk.DISABLED,
+            font=('Segoe UI', 9),
+            fg='#ffffff',
+            bg='#363636',
+            selectcolor='#2b2b2b',
+            activebackground='#363636',
+            activeforeground='#ffffff'
+        ).grid(row=1, column=4, columnspan=2, padx=20, pady=5, sticky=tk.W)
+        
+        # Scenes generated before from the same prompt, image and settings are copied
+        self.use_result_cache = tk.BooleanVar(value=True)
+        tk.Checkbutton(
+            settings_grid,
+            text="Dùng lại video đã tạo",
+            variable=self.use_result_cache,
+            font=('Segoe UI', 9),
+            fg='#ffffff',
+            bg='#363636',
+            selectcolor='#2b2b2b',
+            activebackground='#363636',
+            activeforeground='#ffffff'
+        ).grid(row=1, column=0, columnspan=4, padx=5, pady=5, sticky=tk.W)
+        
         # Delay
         delay_row = tk.Frame(settings_frame, bg='#363636')
         delay_row.pack(fill=tk.X, padx=10, pady=5)
         
+        # Adaptive pacing bounds (seconds between scene starts, per worker)
         tk.Label(
             delay_row,
-            text="Delay giữa scenes:",
+            text="Delay min/max:",
             font=('Segoe UI', 9),
             fg='#ffffff',
             bg='#363636'
         ).pack(side=tk.LEFT, padx=5)
         
-        self.delay = tk.IntVar(value=30)
-        delay_spinbox = tk.Spinbox(
+        self.min_delay = tk.IntVar(value=5)
+        self.max_delay = tk.IntVar(value=300)
+        for variable, upper in ((self.min_delay, 120), (self.max_delay, 900)):
+            tk.Spinbox(
+                delay_row,
+                from_=0,
+                to=upper,
+                textvariable=variable,
+                width=5,
+                font=('Segoe UI', 9),
+                bg='#2b2b2b',
+                fg='#ffffff',
+                buttonbackground='#0d7377',
+                insertbackground='#ffffff'
+            ).pack(side=tk.LEFT, padx=(5, 0))
+        
+        tk.Label(
+            delay_row,
+            text=" giây",
+            font=('Segoe UI', 9),
+            fg='#ffffff',
+            bg='#363636'
+        ).pack(side=tk.LEFT)
+        
+        # Workers (one Chrome profile / account per worker)
+        tk.Label(
+            delay_row,
+            text="Số workers:",
+            font=('Segoe UI', 9),
+            fg='#ffffff',
+            bg='#363636'
+        ).pack(side=tk.LEFT, padx=(20, 5))
+        
+        self.worker_count = tk.IntVar(value=1)
+        tk.Spinbox(
             delay_row,
-            from_=10,
-            to=120,
-            textvariable=self.delay,
-            width=5,
+            from_=1,
+            to=16,
+            textvariable=self.worker_count,
+            width=4,
             font=('Segoe UI', 9),
             bg='#2b2b2b',
             fg='#ffffff',
             buttonbackground='#0d7377',
             insertbackground='#ffffff'
-        )
-        delay_spinbox.pack(side=tk.LEFT, padx=5)
+        ).pack(side=tk.LEFT, padx=5)
         
+        # Scenes in flight per account: the next one is submitted in another tab
+        # while the previous one is still generating
         tk.Label(
             delay_row,
-            text="giây",
+            text="Tab/worker:",
             font=('Segoe UI', 9),
             fg='#ffffff',
             bg='#363636'
-        ).pack(side=tk.LEFT)
+        ).pack(side=tk.LEFT, padx=(20, 5))
+        
+        self.max_inflight = tk.IntVar(value=1)
+        tk.Spinbox(
+            delay_row,
+            from_=1,
+            to=4,
+            textvariable=self.max_inflight,
+            width=3,
+            font=('Segoe UI', 9),
+            bg='#2b2b2b',
+            fg='#ffffff',
+            buttonbackground='#0d7377',
+            insertbackground='#ffffff'
+        ).pack(side=tk.LEFT, padx=5)
+        
+        tk.Label(
+            delay_row,
+            text="Port đầu:",
+            font=('Segoe UI', 9),
+            fg='#ffffff',
+            bg='#363636'
+        ).pack(side=tk.LEFT, padx=(20, 5))
+        
+        self.base_port = tk.IntVar(value=9222)
+        tk.Entry(
+            delay_row,
+            textvariable=self.base_port,
+            width=6,
+            font=('Segoe UI', 9),
+            bg='#2b2b2b',
+            fg='#ffffff',
+            insertbackground='#ffffff'
+        ).pack(side=tk.LEFT, padx=5)
         
         # Progress Section
         progress_frame = tk.LabelFrame(
@@ -337,6 +643,19 @@ class BatchVideoGUI:
         )
         self.stat_pending.pack(side=tk.LEFT, padx=10)
         
+        self.stat_images = tk.Label(
+            stats_frame,
+            text="",
+            font=('Segoe UI', 9),
+            fg='#aaaaaa',
+            bg='#363636'
+        )
+        self.stat_images.pack(side=tk.LEFT, padx=10)
+        
+        # Per-worker state
+        self.workers_frame = tk.Frame(progress_frame, bg='#363636')
+        self.workers_frame.pack(fill=tk.X, padx=10, pady=5)
+        
         # Log
         log_label = tk.Label(
             progress_frame,
@@ -358,6 +677,10 @@ class BatchVideoGUI:
         )
         self.log_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
+        self.log_pipeline = LogPipeline(self.root, self.log_text)
+        self.log_pipeline.start()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
         # Control Buttons
         btn_frame = tk.Frame(self.root, bg='#2b2b2b')
         btn_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
@@ -406,6 +729,19 @@ class BatchVideoGUI:
         )
         self.stop_btn.pack(side=tk.LEFT, padx=5)
         
+        tk.Button(
+            btn_frame,
+            text="🔍 Kiểm Tra Ảnh",
+            command=self.preflight_check,
+            bg='#607D8B',
+            fg='#ffffff',
+            font=('Segoe UI', 11, 'bold'),
+            cursor='hand2',
+            relief=tk.FLAT,
+            padx=20,
+            pady=10
+        ).pack(side=tk.RIGHT, padx=5)
+        
         tk.Button(
             btn_frame,
             text="📊 Xem Storyboard",
@@ -437,117 +773,530 @@ class BatchVideoGUI:
         if folder:
             self.output_folder.set(folder)
     
+    def watch_scenes(self, reschedule=True):
+        """Re-parse the script in the background when it or the images folder changed"""
+        if reschedule:
+            self.root.after(1000, self.watch_scenes)
+        
+        script = self.script_path.get()
+        folder = self.images_folder.get()
+        try:
+            source = (script, os.stat(script).st_mtime_ns, folder,
+                      os.stat(folder).st_mtime_ns if folder and os.path.isdir(folder) else None)
+        except OSError:
+            return
+        if source == self.scene_source or self.scene_loading:
+            return
+        
+        self.scene_source = source
+        self.scene_loading = True
+        threading.Thread(target=self.load_scenes, args=(script, folder), daemon=True).start()
+    
+    def load_scenes(self, script, folder):
+        """Worker thread: parse (incrementally) and match images, then hand rows to Tk"""
+        try:
+            parser = get_script_parser(script)
+            started = time.perf_counter()
+            scenes = parser.parse()
+            image_map = {}
+            if folder and os.path.isdir(folder):
+                image_map = get_image_index(folder).match([s['sceneNumber'] for s in scenes])[0]
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        except (OSError, UnicodeDecodeError) as e:
+            self.root.after(0, self.show_scene_error, str(e))
+            return
+        
+        rows = [(
+            str(s['sceneNumber']),
+            '✓' if s['isDone'] else '',
+            '✓' if s['sceneNumber'] in image_map else '✗',
+            s['prompt'][:120]
+        ) for s in scenes]
+        summary = (f"{len(scenes)} scenes • {sum(1 for s in scenes if s['isDone'])} done • "
+                   f"{len(rows) - len(image_map)} thiếu ảnh • parse {elapsed_ms:.0f} ms "
+                   f"({parser.reparsed} block mới)")
+        self.root.after(0, self.show_scenes, rows, summary)
+    
+    def show_scenes(self, rows, summary):
+        """Update only the table rows whose values changed"""
+        self.scene_loading = False
+        table = self.scene_table
+        for i, values in enumerate(rows):
+            tags = ('done',) if values[1] else ('missing',) if values[2] == '✗' else ()
+            if i >= len(self.scene_rows):
+                table.insert('', tk.END, iid=str(i), values=values, tags=tags)
+            elif self.scene_rows[i] != values:
+                table.item(str(i), values=values, tags=tags)
+        for i in range(len(rows), len(self.scene_rows)):
+            table.delete(str(i))
+        self.scene_rows = rows
+        self.scene_summary.config(text=summary, fg='#ffffff')
+    
+    def show_scene_error(self, message):
+        self.scene_loading = False
+        self.scene_summary.config(text=f"❌ {message}", fg='#f44336')
+    
     def log(self, message):
-        self.log_text.insert(tk.END, message + '\n')
-        self.log_text.see(tk.END)
+        """Queue a log line (safe to call from any thread)"""
+        self.log_pipeline.write(message)
+    
+    def on_close(self):
+        """Close the window; a running batch is drained or stopped first"""
+        if not (self.is_running and self.engine):
+            self.close_window()
+            return
+        if self.closing:
+            if self.closing == 'drain' and messagebox.askyesno("Dừng ngay", "Hủy ngay các scene đang chạy?\nVideo đang tạo sẽ bị bỏ."):
+                self.closing = 'stop'
+                self.engine.stop()
+            return
+        answer = messagebox.askyesnocancel(
+            "Batch đang chạy",
+            "Batch đang chạy. Thoát sau khi các scene đang chạy hoàn tất?\n\n"
+            "Có: chờ các scene đang chạy rồi thoát\nKhông: hủy ngay các scene đang chạy\nHủy: tiếp tục chạy")
+        if answer is None:
+            return
+        self.closing = 'drain' if answer else 'stop'
+        self.update_status("Đang đóng...", '#f44336')
+        self.log("🚪 Cửa sổ sẽ đóng khi các worker đã dừng")
+        self.finish_closing()
+    
+    def finish_closing(self):
+        """Drain or stop the engine, then close once its workers have exited"""
+        if not self.pool:
+            # Still planning/starting: batch_started or batch_not_started comes back here
+            return
+        if self.closing == 'drain':
+            self.engine.drain()
+        else:
+            self.engine.stop()
+        self.wait_and_close()
+    
+    def wait_and_close(self):
+        # Short waits keep the window responsive while the workers finish
+        if self.engine.wait(0.05):
+            self.close_window()
+        else:
+            self.root.after(200, self.wait_and_close)
+    
+    def close_window(self):
+        """Flush queued log lines and close the log file before the window goes"""
+        self.log_pipeline.stop()
+        self.root.destroy()
     
     def update_status(self, text, color='#4CAF50'):
         self.status_label.config(text=text, fg=color)
     
     def start_batch(self):
-        # Validate inputs
-        if not self.script_path.get():
-            messagebox.showerror("Lỗi", "Vui lòng chọn file kịch bản!")
-            return
-        
-        if not self.images_folder.get():
-            messagebox.showerror("Lỗi", "Vui lòng chọn folder hình ảnh!")
+        try:
+            options = {
+                'script_path': self.script_path.get(),
+                'images_folder': self.images_folder.get(),
+                'output_folder': self.output_folder.get(),
+                'duration': self.duration.get(),
+                'resolution': self.resolution.get(),
+                'workers': int(self.worker_count.get()),
+                'max_inflight': max(1, int(self.max_inflight.get())),
+                'base_port': int(self.base_port.get()),
+                'min_delay': int(self.min_delay.get()),
+                'max_delay': int(self.max_delay.get()),
+                'wait_profile': 'conservative' if self.conservative_waits.get() else 'fast',
+                'skip_completed': self.skipCompleted.get(),
+                'prep_images': self.prep_images.get(),
+                'result_cache': self.use_result_cache.get(),
+                'priority': self.selected_priority()
+            }
+        except (tk.TclError, ValueError):
+            messagebox.showerror("Lỗi", "Số workers, port và delay phải là số!")
             return
         
-        if not self.output_folder.get():
-            messagebox.showerror("Lỗi", "Vui lòng chọn folder output!")
-            return
+        engine = BatchEngine(
+            options,
+            on_log=self.log,
+            on_worker_update=lambda w: self.root.after(0, self.update_worker, w.id, w.port, w.status, w.current_scene),
+            on_event=lambda event: self.root.after(0, self.handle_event, event),
+            on_finished=lambda data: self.root.after(0, self.batch_completed),
+            on_project_update=lambda entry: self.root.after(0, self.refresh_projects),
+            project_queue=self.project_queue
+        )
         
-        # Build command
-        cmd = [
-            'node',
-            'batch-process.js',
-            self.script_path.get(),
-            self.images_folder.get(),
-            self.output_folder.get(),
-            '--duration', self.duration.get(),
-            '--resolution', self.resolution.get()
-        ]
-        
-        if not self.skipCompleted.get():
-            cmd.append('--include-completed')
-        
-        self.log(f"🚀 Khởi động batch processing...")
-        self.log(f"📝 Script: {Path(self.script_path.get()).name}")
-        self.log(f"🖼️  Images: {self.images_folder.get()}")
-        self.log(f"📂 Output: {self.output_folder.get()}")
-        self.log(f"⚙️  Config: {self.duration.get()}, {self.resolution.get()}")
-        self.log("")
-        
-        # Disable controls
+        # Planning parses the scripts and indexes the images, and starting probes
+        # every worker's Chrome: both run off the Tk thread
         self.start_btn.config(state=tk.DISABLED)
+        self.update_status("Đang chuẩn bị...", '#ff9800')
+        self.engine = engine
+        self.pool = None
+        self.is_running = True
+        self.stats = BatchStats()
+        self.image_bytes = [0, 0]  # original / uploaded bytes of prepared images
+        self.stat_images.config(text="")
+        self.progress_tails = {}
+        self.worker_details = {}
+        self.worker_pacing = {}
+        self.update_stats()
+        threading.Thread(target=self.prepare_batch, args=(engine,), daemon=True).start()
+    
+    def prepare_batch(self, engine):
+        """Plan and start the batch (background thread); the result goes back to the Tk thread"""
+        try:
+            engine.plan()
+            started = engine.start()
+        except BatchError as e:
+            self.root.after(0, self.batch_not_started, engine, str(e), True)
+            return
+        if started:
+            self.root.after(0, self.batch_started, engine)
+        else:
+            self.root.after(0, self.batch_not_started, engine, "Không có scene nào để xử lý", False)
+    
+    def batch_not_started(self, engine, message, is_error):
+        if engine is not self.engine:
+            return
+        self.engine = None
+        self.is_running = False
+        if self.closing:
+            self.close_window()
+            return
+        self.start_btn.config(state=tk.NORMAL)
+        self.refresh_projects()
+        if is_error:
+            self.update_status("Sẵn sàng")
+            messagebox.showerror("Lỗi", message)
+        else:
+            self.update_status(message, '#ff9800')
+    
+    def batch_started(self, engine):
+        if engine is not self.engine:
+            return
         self.pause_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.NORMAL)
-        
-        self.is_running = True
         self.update_status("Đang chạy...", '#ff9800')
         
-        # Run in thread
-        thread = threading.Thread(target=self.run_batch, args=(cmd,))
-        thread.daemon = True
-        thread.start()
-    
-    def run_batch(self, cmd):
-        # Working directory is current directory where this script is located
-        cwd = os.path.dirname(os.path.abspath(__file__))
-        
-        self.process = subprocess.Popen(
-            cmd,
-            cwd=cwd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
-        )
+        self.pool = engine.pool
+        first_project = next(iter(self.pool.projects.values()))
+        self.log_pipeline.set_log_file(first_project.progress.log_file)
+        self.progress_tails = {
+            project.id: ProgressTail(project.progress.progress_file)
+            for project in self.pool.projects.values()
+        }
+        self.create_worker_rows(self.pool.workers)
+        self.poll_progress()
+        if self.closing:
+            self.finish_closing()
+    
+    def poll_progress(self):
+        """Refresh the counters from the projects' progress journals, reading only new lines"""
+        if not self.progress_tails:
+            return
+        changed = [tail.poll() for tail in self.progress_tails.values()]
+        if any(changed):
+            totals = {'totalScenes': 0, 'runCompleted': 0, 'runFailed': 0}
+            for tail in self.progress_tails.values():
+                for key in totals:
+                    totals[key] += tail.data[key]
+            if self.stats.update_progress(totals):
+                self.update_stats()
+            self.refresh_projects()
+        if self.is_running:
+            self.root.after(500, self.poll_progress)
+    
+    def selected_priority(self):
+        labels = {label: priority for priority, label in PRIORITY_LABELS.items()}
+        return labels.get(self.priority.get(), 'normal')
+    
+    def selected_project(self):
+        selection = self.project_table.selection()
+        return int(selection[0]) if selection else None
+    
+    def queue_engine(self):
+        """The running engine, or one that only edits the queue"""
+        if self.is_running and self.engine:
+            return self.engine
+        return BatchEngine({}, on_log=self.log, project_queue=self.project_queue)
+    
+    def add_project(self):
+        """Queue the selected script/images/output; joins the running batch right away"""
+        try:
+            entry = self.queue_engine().add_project(
+                self.script_path.get(),
+                self.images_folder.get(),
+                self.output_folder.get(),
+                priority=self.selected_priority(),
+                skip_completed=self.skipCompleted.get()
+            )
+        except BatchError as e:
+            messagebox.showerror("Lỗi", str(e))
+            return
+        self.log(f"📚 Project #{entry['id']} {entry['name']} đã vào hàng đợi (ưu tiên {PRIORITY_LABELS[entry['priority']]})")
+        self.refresh_projects()
+    
+    def move_project(self, offset):
+        project_id = self.selected_project()
+        if project_id is None:
+            return
+        self.queue_engine().move_project(project_id, offset)
+        self.refresh_projects()
+    
+    def set_project_priority(self):
+        project_id = self.selected_project()
+        if project_id is None:
+            return
+        self.queue_engine().set_priority(project_id, self.selected_priority())
+        self.refresh_projects()
+    
+    def cancel_project(self):
+        """Cancel a waiting or running project; a finished one is removed from the list"""
+        project_id = self.selected_project()
+        entry = self.project_queue.get(project_id) if project_id is not None else None
+        if not entry:
+            return
+        if entry['state'] in ('done', 'cancelled'):
+            self.project_queue.remove(project_id)
+        elif entry['state'] != 'running' or messagebox.askyesno(
+                "Hủy project", f"Hủy project {entry['name']}?\nScene đang chạy vẫn hoàn tất, scene còn lại bị bỏ qua."):
+            self.queue_engine().cancel_project(project_id)
+        self.refresh_projects()
+    
+    def refresh_projects(self):
+        """Show the project queue in its order, keeping the selection"""
+        table = self.project_table
+        selected = self.selected_project()
+        table.delete(*table.get_children())
+        for entry in self.project_queue.entries():
+            tail = self.progress_tails.get(entry['id'])
+            progress = ''
+            if tail and tail.data['totalScenes']:
+                progress = f"{tail.data['runCompleted'] + tail.data['runFailed']}/{tail.data['totalScenes']}"
+            table.insert('', tk.END, iid=str(entry['id']), values=(
+                entry['id'],
+                entry['name'],
+                PRIORITY_LABELS[entry['priority']],
+                STATE_LABELS.get(entry['state'], entry['state']),
+                progress,
+                entry['outputFolder']
+            ))
+        if selected is not None and table.exists(str(selected)):
+            table.selection_set(str(selected))
+    
+    def create_worker_rows(self, workers):
+        for child in self.workers_frame.winfo_children():
+            child.destroy()
+        self.worker_labels = {}
+        self.worker_state = {}
         
-        for line in self.process.stdout:
-            if not self.is_running:
-                break
-            self.root.after(0, self.log, line.rstrip())
+        for i, worker in enumerate(workers):
+            label = tk.Label(
+                self.workers_frame,
+                font=('Consolas', 9),
+                fg='#ffffff',
+                bg='#2b2b2b',
+                anchor='w',
+                width=34,
+                padx=5
+            )
+            label.grid(row=i // 3, column=i % 3, sticky='w', padx=3, pady=2)
+            self.worker_labels[worker.id] = label
+            self.update_worker(worker.id, worker.port, worker.status, worker.current_scene)
+    
+    def update_worker(self, worker_id, port, status, scene_number):
+        self.worker_state[worker_id] = (port, status, scene_number)
+        self.render_worker(worker_id)
+    
+    def render_worker(self, worker_id):
+        label = self.worker_labels.get(worker_id)
+        if not label or worker_id not in self.worker_state:
+            return
         
-        self.process.wait()
+        port, status, scene_number = self.worker_state[worker_id]
+        colors = {
+            'idle': '#aaaaaa',
+            'working': '#ff9800',
+            'waiting': '#2196F3',
+            'chrome': '#ce93d8',
+            'paused': '#ffeb3b',
+            'error': '#f44336',
+            'offline': '#777777'
+        }
+        scene_text = f" • Scene {scene_number}" if scene_number is not None else ''
+        if status == 'working':
+            detail = self.worker_details.get(worker_id, '')
+        else:
+            # Waiting / idle rows show the worker's current pace
+            detail = self.worker_pacing.get(worker_id, '')
+        detail_text = f" • {detail}" if detail else ''
+        label.config(text=f"W{worker_id} :{port}  {status}{scene_text}{detail_text}", fg=colors.get(status, '#ffffff'))
+    
+    def handle_event(self, event):
+        """Drive counters, progress bar and worker rows from protocol events"""
+        if self.stats.apply(event):
+            self.update_stats()
         
-        if self.is_running:
-            self.root.after(0, self.batch_completed)
+        kind = event['type']
+        if kind == 'project-started' and self.pool:
+            # A project added to the running batch
+            project = self.pool.projects.get(event['projectId'])
+            if project and project.id not in self.progress_tails:
+                self.progress_tails[project.id] = ProgressTail(project.progress.progress_file)
+            self.refresh_projects()
+        if kind == 'batch-state':
+            self.show_batch_state(event['state'])
+            return
+        if kind == 'image-prepared':
+            self.show_image_savings(event)
+        if kind in ('scene-completed', 'scene-failed', 'latency-report'):
+            self.show_latency()
+        
+        worker_id = event.get('workerId')
+        if worker_id is None:
+            return
+        
+        if kind == 'scene-started':
+            self.worker_details[worker_id] = ''
+        elif kind == 'stage':
+            self.worker_details[worker_id] = event.get('stage', '')
+        elif kind == 'poll':
+            self.worker_details[worker_id] = f"waiting ({event.get('attempt')})"
+        elif kind == 'download-progress':
+            detail = f"download {event.get('bytes', 0) / 1024 / 1024:.1f} MB"
+            if event.get('total'):
+                detail += f" ({event['bytes'] * 100 // event['total']}%)"
+            self.worker_details[worker_id] = detail
+        elif kind == 'pacing':
+            icon = {'backoff': '🐢', 'speeding-up': '⚡'}.get(event.get('state'), '')
+            self.worker_pacing[worker_id] = f"pace {event.get('interval')}s {icon}".rstrip()
+        else:
+            return
+        
+        self.render_worker(worker_id)
+    
+    def show_latency(self):
+        """Refresh the latency tab from the pool's report"""
+        if not self.pool:
+            return
+        rows = self.pool.latency.summary()
+        self.latency_table.delete(*self.latency_table.get_children())
+        for row in rows:
+            if row['unit'] == 'ms':
+                values = [f"{row[key] / 1000:.1f}s" for key in ('p50', 'p95', 'max')]
+            else:
+                values = [f"{row[key]:.2f} {row['unit']}" for key in ('p50', 'p95', 'max')]
+            self.latency_table.insert('', tk.END, values=(row['metric'], row['count'], *values))
+        self.latency_summary.config(
+            text=f"{len(self.pool.latency.scenes)} jobs • thời gian mỗi bước (p50 / p95 / max)",
+            fg='#ffffff'
+        )
+    
+    def show_image_savings(self, event):
+        self.image_bytes[0] += event['sourceBytes']
+        self.image_bytes[1] += event['bytes']
+        saved = self.image_bytes[0] - self.image_bytes[1]
+        percent = round(saved * 100 / self.image_bytes[0]) if self.image_bytes[0] else 0
+        self.stat_images.config(text=f"🗜️ Ảnh: -{saved / 1024 / 1024:.1f} MB ({percent}%)")
+    
+    def update_stats(self):
+        self.stat_total.config(text=f"Total: {self.stats.total}")
+        self.stat_completed.config(text=f"✅ Completed: {self.stats.completed}")
+        self.stat_failed.config(text=f"❌ Failed: {self.stats.failed}")
+        self.stat_pending.config(text=f"⏳ Pending: {self.stats.pending}")
+        self.progress_bar['value'] = self.stats.percent
     
     def batch_completed(self):
+        if not self.is_running:
+            return
+        if not self.pool:
+            # Finished before batch_started ran (every scene came from the cache)
+            self.root.after(50, self.batch_completed)
+            return
         self.is_running = False
-        self.update_status("✅ Hoàn thành!", '#4CAF50')
-        self.log("\n✅ Batch processing hoàn thành!")
+        self.is_paused = False
+        self.poll_progress()
+        if self.closing:
+            return  # wait_and_close destroys the window
         
         # Re-enable controls
         self.start_btn.config(state=tk.NORMAL)
-        self.pause_btn.config(state=tk.DISABLED)
-        self.stop_btn.config(state=tk.DISABLED)
+        self.pause_btn.config(state=tk.DISABLED, text="⏸️ Tạm Dừng")
+        self.stop_btn.config(state=tk.DISABLED, text="⏹️ Dừng")
+        
+        if self.pool and self.pool.halt_event.is_set():
+            self.update_status("Đã dừng", '#f44336')
+            self.log("\n🛑 Batch processing đã dừng! Các scene chưa xong sẽ chạy lại ở lần sau.")
+            return
         
+        self.update_status("✅ Hoàn thành!", '#4CAF50')
+        self.log("\n✅ Batch processing hoàn thành!")
         messagebox.showinfo("Hoàn thành", "Batch processing đã hoàn thành!\nClick 'Xem Storyboard' để xem kết quả.")
     
-    def pause_batch(self):
-        # TODO: Implement pause functionality
-        if self.is_paused:
-            self.is_paused = False
+    def show_batch_state(self, state):
+        """Reflect the pool's run state (batch-state event) in the controls"""
+        if not self.is_running:
+            return
+        self.is_paused = state == 'paused'
+        if state == 'running':
+            self.update_status("Đang chạy...", '#ff9800')
             self.pause_btn.config(text="⏸️ Tạm Dừng")
             self.log("▶️  Tiếp tục...")
-        else:
-            self.is_paused = True
+        elif state == 'paused':
+            self.update_status("Tạm dừng (scene đang chạy vẫn hoàn tất)", '#ffeb3b')
             self.pause_btn.config(text="▶️ Tiếp Tục")
-            self.log("⏸️  Tạm dừng...")
-    
-    def stop_batch(self):
-        if self.process:
-            self.process.terminate()
-            self.is_running = False
-            self.update_status("Đã dừng", '#f44336')
-            self.log("\n🛑 Batch processing đã dừng!")
-            
-            self.start_btn.config(state=tk.NORMAL)
+            self.log("⏸️  Tạm dừng: không nhận scene mới, scene đang chạy vẫn hoàn tất")
+        elif state == 'draining':
+            self.update_status("Đang dừng sau các scene đang chạy...", '#ff9800')
+            self.pause_btn.config(state=tk.DISABLED)
+            self.stop_btn.config(text="⛔ Dừng Ngay")
+            self.log("🛑 Dừng sau khi các scene đang chạy hoàn tất (bấm ⛔ Dừng Ngay để hủy ngay)")
+        elif state == 'stopping':
+            self.update_status("Đang hủy...", '#f44336')
             self.pause_btn.config(state=tk.DISABLED)
             self.stop_btn.config(state=tk.DISABLED)
+            self.log("⛔ Hủy ngay các scene đang chạy")
+    
+    def pause_batch(self):
+        if not self.engine:
+            return
+        if self.is_paused:
+            self.engine.resume()
+        else:
+            self.engine.pause()
+    
+    def stop_batch(self):
+        """First press drains (running scenes finish), second press stops hard"""
+        if not self.engine:
+            return
+        if self.engine.state != 'draining':
+            self.engine.drain()
+        elif messagebox.askyesno("Dừng ngay", "Hủy ngay các scene đang chạy?\nVideo đang tạo sẽ bị bỏ."):
+            self.engine.stop()
+    
+    def preflight_check(self):
+        """Report scenes with missing or ambiguous images before starting a batch"""
+        if not self.script_path.get() or not self.images_folder.get():
+            messagebox.showerror("Lỗi", "Vui lòng chọn file kịch bản và folder hình ảnh!")
+            return
+        
+        try:
+            scenes = parse_script_file(self.script_path.get())
+            started = time.perf_counter()
+            index = get_image_index(self.images_folder.get())
+            image_map, missing, ambiguous = index.match([s['sceneNumber'] for s in scenes])
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        except OSError as e:
+            messagebox.showerror("Lỗi", str(e))
+            return
+        
+        self.log(f"🔍 Kiểm tra ảnh: {len(image_map)}/{len(scenes)} scenes có ảnh ({elapsed_ms:.0f} ms)")
+        if missing:
+            self.log(f"   ❌ Thiếu ảnh: {', '.join(map(str, missing))}")
+        for scene_number, chosen, others in ambiguous:
+            self.log(f"   ⚠️  Scene {scene_number}: dùng {chosen}, bỏ qua {', '.join(others)}")
+        
+        if missing or ambiguous:
+            messagebox.showwarning(
+                "Kiểm tra ảnh",
+                f"{len(missing)} scenes thiếu ảnh, {len(ambiguous)} scenes có nhiều ảnh.\nXem chi tiết trong log."
+            )
+        else:
+            messagebox.showinfo("Kiểm tra ảnh", f"Tất cả {len(scenes)} scenes đều có ảnh.")
     
     def view_storyboard(self):
         if not self.output_folder.get():
@@ -4,8 +4,12 @@ import subprocess
 import threading
 import os
 import json
-import time
-from datetime import datetime
+
+from chrome_probe import probe_browser, wait_for_chrome
+from events import parse_event_line, read_manifest
+from log_pipeline import LogPipeline
+
+CDP_PORT = 9222
 
 class GrokGUI:
     def __init__(self, root):
@@ -17,6 +21,9 @@ class GrokGUI:
         # Variables
         self.process = None
         self.is_running = False
+        self.probe_cancel = None  # Set until the automation process exists; set() cancels the start
+        self.process_lock = threading.Lock()  # Stop vs. starting the process
+        self.last_job_dir = None  # Directory of the last finished job
         
         # Styling
         style = ttk.Style()
@@ -113,11 +120,21 @@ class GrokGUI:
         self.log_text.grid(row=7, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
         main_frame.rowconfigure(7, weight=1)
         
+        self.log_pipeline = LogPipeline(self.root, self.log_text, timestamps=True)
+        self.log_pipeline.set_log_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'grok-gui.log'))
+        self.log_pipeline.start()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
         # Status bar
         self.status_var = tk.StringVar(value="Ready")
         status_bar = ttk.Label(main_frame, textvariable=self.status_var, 
                                relief=tk.SUNKEN, anchor=tk.W, font=('Segoe UI', 9))
-        status_bar.grid(row=8, column=0, columnspan=3, sticky=(tk.W, tk.E))
+        status_bar.grid(row=8, column=0, columnspan=2, sticky=(tk.W, tk.E))
+        
+        # Shown only while waiting for Chrome to accept connections
+        self.probe_bar = ttk.Progressbar(main_frame, mode='indeterminate', length=120)
+        self.probe_bar.grid(row=8, column=2, sticky=tk.E, padx=(5, 0))
+        self.probe_bar.grid_remove()
         
         self.log("Grok Video Automation Tool initialized ✓")
         self.log("Fill in the parameters and click 'Generate Video' to start")
@@ -132,20 +149,12 @@ class GrokGUI:
             self.image_path.insert(0, filename)
     
     def log(self, message):
-        """Add message to log with timestamp"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.log_text.see(tk.END)
-        self.log_text.config(state=tk.DISABLED)
+        """Queue a log line with timestamp (safe to call from any thread)"""
+        self.log_pipeline.write(message)
 
     def check_chrome_debugger_running(self):
-        """Check if something is listening on port 9222"""
-        import socket
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        result = sock.connect_ex(('127.0.0.1', 9222))
-        sock.close()
-        return result == 0
+        """Check if Chrome answers DevTools requests on CDP_PORT"""
+        return probe_browser(CDP_PORT) is not None
 
     def launch_chrome(self):
         """Attempt to launch Chrome with remote debugging"""
@@ -168,7 +177,7 @@ class GrokGUI:
         try:
             cmd = [
                 chrome_exe,
-                "--remote-debugging-port=9222",
+                f"--remote-debugging-port={CDP_PORT}",
                 r"--user-data-dir=C:\chrome-debug-profile"
             ]
             subprocess.Popen(cmd)
@@ -199,16 +208,6 @@ class GrokGUI:
         if cdn:
             config["cdnUrl"] = cdn
         
-        # Auto-launch Chrome if needed
-        if not self.check_chrome_debugger_running():
-            self.log("Chrome debugger not detected. Launching Chrome...")
-            if self.launch_chrome():
-                self.log("✅ Chrome launched successfully")
-                time.sleep(3) # Wait for Chrome to start
-            else:
-                self.log("❌ Failed to launch Chrome automatically. Please open it manually.")
-                return
-
         # Save config to temporary file
         config_path = os.path.join(os.path.dirname(__file__), 'temp_config.json')
         with open(config_path, 'w', encoding='utf-8') as f:
@@ -222,75 +221,180 @@ class GrokGUI:
         self.is_running = True
         self.generate_btn.config(state=tk.DISABLED)
         self.stop_btn.config(state=tk.NORMAL)
-        self.status_var.set("Running automation...")
+        self.status_var.set("Checking Chrome...")
         
-        # Run in separate thread
-        thread = threading.Thread(target=self.run_automation, args=(config_path,), daemon=True)
+        # Chrome checks and the automation run in a separate thread
+        self.probe_cancel = threading.Event()
+        thread = threading.Thread(target=self.prepare_chrome, args=(config_path, self.probe_cancel), daemon=True)
         thread.start()
     
-    def run_automation(self, config_path):
-        """Run the Node.js automation script"""
+    def prepare_chrome(self, config_path, cancel_event):
+        """Launch Chrome if needed and wait until it is ready, then run the automation"""
+        if not self.check_chrome_debugger_running():
+            self.log("Chrome debugger not detected. Launching Chrome...")
+            if not self.launch_chrome():
+                self.log("❌ Failed to launch Chrome automatically. Please open it manually.")
+                self.root.after(0, self.status_var.set, "Chrome not available")
+                self.root.after(0, self.reset_ui)
+                return
+            self.log("✅ Chrome launched, waiting for it to accept connections...")
+        
+        self.root.after(0, self.show_probe, True)
+        result = wait_for_chrome(CDP_PORT, cancel_event,
+                                 on_status=lambda text: self.root.after(0, self.status_var.set, text))
+        self.root.after(0, self.show_probe, False)
+        
+        if result == 'cancelled':
+            return
+        if result == 'timeout':
+            self.log(f"❌ Chrome did not become ready on port {CDP_PORT}")
+            self.root.after(0, self.status_var.set, "Chrome not ready")
+            self.root.after(0, messagebox.showerror, "Error",
+                            "Chrome did not become ready. Check that it is running with remote debugging.")
+            self.root.after(0, self.reset_ui)
+            return
+        
+        if cancel_event.is_set():
+            return
+        self.log("✅ Chrome is ready")
+        self.root.after(0, self.status_var.set, "Running automation...")
+        self.run_automation(config_path, cancel_event)
+    
+    def show_probe(self, active):
+        """Show or hide the Chrome readiness indicator"""
+        if active:
+            self.probe_bar.grid()
+            self.probe_bar.start(15)
+        else:
+            self.probe_bar.stop()
+            self.probe_bar.grid_remove()
+    
+    def run_automation(self, config_path, cancel_event):
+        """Run the Node.js automation script (unless Stop was pressed before it started)"""
         try:
-            cmd = ['node', 'grok-automation.js', config_path]
-            self.process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,  # Combine stderr with stdout
-                text=True,
-                encoding='utf-8',
-                bufsize=1,
-                cwd=os.path.dirname(__file__)
-            )
+            cmd = ['node', 'grok-automation.js', config_path, '--port', str(CDP_PORT)]
+            with self.process_lock:
+                if cancel_event.is_set():
+                    return
+                self.process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,  # Combine stderr with stdout
+                    text=True,
+                    encoding='utf-8',
+                    bufsize=1,
+                    cwd=os.path.dirname(__file__)
+                )
+                # From here on Stop terminates the process instead
+                self.probe_cancel = None
             
             # Read output in real-time
+            manifest_path = None
             for line in self.process.stdout:
-                line = line.strip()
-                if line:
-                    self.root.after(0, self.log, line)
+                text, event = parse_event_line(line.strip())
+                if text:
+                    self.log(text)
+                if event:
+                    if event['type'] in ('job-completed', 'job-failed'):
+                        manifest_path = event.get('manifestPath')
+                    self.root.after(0, self.handle_event, event)
+            
+            manifest = read_manifest(manifest_path)
+            if manifest:
+                self.last_job_dir = os.path.dirname(manifest_path)
+                if manifest.get('videoPath'):
+                    self.log(f"🎞️ Video: {manifest['videoPath']}")
             
             # Wait for process to complete
             self.process.wait()
             
             # Check exit code
             if self.process.returncode == 0:
-                self.root.after(0, self.log, "✓ Automation completed successfully!")
+                self.log("✓ Automation completed successfully!")
                 self.root.after(0, self.status_var.set, "Completed successfully")
                 self.root.after(0, messagebox.showinfo, "Success", 
                               "Video generated successfully! Check the downloads folder.")
             else:
-                self.root.after(0, self.log, f"✗ Automation failed with code {self.process.returncode}")
+                self.log(f"✗ Automation failed with code {self.process.returncode}")
                 self.root.after(0, self.status_var.set, "Failed")
                 self.root.after(0, messagebox.showerror, "Error", 
                               f"Automation failed. Check the log for details.")
             
         except FileNotFoundError:
-            self.root.after(0, self.log, "✗ Error: Node.js not found. Please install Node.js")
+            self.log("✗ Error: Node.js not found. Please install Node.js")
             self.root.after(0, messagebox.showerror, "Error", 
                           "Node.js not found. Please install Node.js and try again.")
         except Exception as e:
-            self.root.after(0, self.log, f"✗ Error: {str(e)}")
+            self.log(f"✗ Error: {str(e)}")
             self.root.after(0, messagebox.showerror, "Error", str(e))
         finally:
             self.root.after(0, self.reset_ui)
     
+    def handle_event(self, event):
+        """Show automation stage and download progress in the status bar"""
+        if not self.is_running:
+            return
+        
+        kind = event['type']
+        if kind == 'stage':
+            self.status_var.set(f"Running automation... ({event.get('stage')})")
+        elif kind == 'poll':
+            self.status_var.set(f"Running automation... (waiting for video, check {event.get('attempt')})")
+        elif kind == 'download-progress':
+            detail = f"downloaded {event.get('bytes', 0) / 1024 / 1024:.1f} MB"
+            if event.get('total'):
+                detail += f" / {event['total'] / 1024 / 1024:.1f} MB"
+            self.status_var.set(f"Running automation... ({detail})")
+    
     def stop_automation(self):
-        """Stop the running automation"""
-        if self.process and self.process.poll() is None:
-            self.process.terminate()
+        """Stop the running automation, or cancel the wait for Chrome"""
+        with self.process_lock:
+            probe_cancel = self.probe_cancel
+            if probe_cancel:
+                probe_cancel.set()
+            process = self.process
+        if probe_cancel:
+            self.log("⏹ Waiting for Chrome cancelled by user")
+            self.show_probe(False)
+            self.status_var.set("Stopped")
+            self.reset_ui()
+        elif process and process.poll() is None:
+            process.terminate()
             self.log("⏹ Automation stopped by user")
             self.status_var.set("Stopped")
             self.reset_ui()
     
+    def on_close(self):
+        """Stop a running automation, flush queued log lines and close the log file, then close"""
+        if self.is_running:
+            if not messagebox.askokcancel("Quit", "Automation is still running. Stop it and quit?"):
+                return
+            self.stop_automation()
+            process = self.process
+            if process:
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+        self.log_pipeline.stop()
+        self.root.destroy()
+    
     def reset_ui(self):
         """Reset UI after automation completes"""
         self.is_running = False
+        self.probe_cancel = None
         self.generate_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
-        if self.status_var.get() == "Running automation...":
+        if self.status_var.get().startswith("Running automation..."):
             self.status_var.set("Ready")
     
     def open_downloads_folder(self):
-        """Open the downloads folder"""
+        """Open the last job's folder, or the downloads folder"""
+        if self.last_job_dir and os.path.isdir(self.last_job_dir):
+            os.startfile(self.last_job_dir)
+            self.log(f"Opened job folder: {self.last_job_dir}")
+            return
+        
         downloads_path = os.path.join(os.path.dirname(__file__), 'downloads')
         
         if not os.path.exists(downloads_path):
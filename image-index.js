@@ -0,0 +1,139 @@
+import fs from 'fs';
+import path from 'path';
+
+/**
+ * Scene number -> image file index, built in one pass over the images folder.
+ *
+ * Matching rule (shared with image_index.py and src/main/services/ImageIndex.ts):
+ *   - only .png / .jpg / .jpeg files (any case) are considered
+ *   - the scene number comes from the file name without extension:
+ *       "Scene 12"           (canonical)          rank 0
+ *       "12", "012"          (number only)        rank 1
+ *       "scene_12_final"     (first number in it) rank 2
+ *   - per scene the lowest rank wins, then extension priority
+ *     .png > .jpg > .jpeg > .PNG > .JPG > .JPEG, then name
+ * A scene with more than one candidate file is reported as ambiguous.
+ *
+ * Indexes are cached per folder and rebuilt when the folder's mtime changes
+ * (adding, removing or renaming a file updates it).
+ */
+
+export const IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.PNG', '.JPG', '.JPEG'];
+
+const CANONICAL_RE = /^scene\s*(\d+)$/i;
+const NUMBER_ONLY_RE = /^(\d+)$/;
+const FIRST_NUMBER_RE = /(\d+)/;
+
+/**
+ * Scene number and match rank of an image file name
+ * @param {string} fileName - File name (no directory)
+ * @returns {Object|null} { sceneNumber, rank, extRank } or null when not a scene image
+ */
+export function parseImageName(fileName) {
+    const ext = path.extname(fileName);
+    if (!/^\.(png|jpe?g)$/i.test(ext)) return null;
+
+    const stem = fileName.slice(0, -ext.length).trim();
+    const extIndex = IMAGE_EXTENSIONS.indexOf(ext);
+    const extRank = extIndex === -1 ? IMAGE_EXTENSIONS.length : extIndex;
+
+    let match = CANONICAL_RE.exec(stem);
+    if (match) return { sceneNumber: parseInt(match[1]), rank: 0, extRank };
+
+    match = NUMBER_ONLY_RE.exec(stem);
+    if (match) return { sceneNumber: parseInt(match[1]), rank: 1, extRank };
+
+    match = FIRST_NUMBER_RE.exec(stem);
+    if (match) return { sceneNumber: parseInt(match[1]), rank: 2, extRank };
+
+    return null;
+}
+
+function compareCandidates(a, b) {
+    return a.rank - b.rank || a.extRank - b.extRank || (a.name < b.name ? -1 : a.name > b.name ? 1 : 0);
+}
+
+export class ImageIndex {
+    /**
+     * Build the index with a single directory read
+     * @param {string} folder - Images folder
+     */
+    constructor(folder) {
+        this.folder = folder;
+        this.mtimeMs = fs.statSync(folder).mtimeMs;
+        this.candidates = new Map(); // sceneNumber -> sorted candidates
+
+        for (const entry of fs.readdirSync(folder, { withFileTypes: true })) {
+            if (!entry.isFile()) continue;
+            const parsed = parseImageName(entry.name);
+            if (!parsed) continue;
+
+            const list = this.candidates.get(parsed.sceneNumber) || [];
+            list.push({ ...parsed, name: entry.name });
+            this.candidates.set(parsed.sceneNumber, list);
+        }
+
+        for (const list of this.candidates.values()) {
+            list.sort(compareCandidates);
+        }
+    }
+
+    /**
+     * Best image for a scene
+     * @param {number} sceneNumber - Scene number
+     * @returns {string|null} Image path
+     */
+    get(sceneNumber) {
+        const list = this.candidates.get(sceneNumber);
+        return list ? path.join(this.folder, list[0].name) : null;
+    }
+
+    /**
+     * Match a list of scenes in one go
+     * @param {Array<number>} sceneNumbers - Scene numbers to look up
+     * @returns {Object} { imageMap, missing, ambiguous } where ambiguous is
+     *   [{ sceneNumber, chosen, others }]
+     */
+    match(sceneNumbers) {
+        const imageMap = {};
+        const missing = [];
+        const ambiguous = [];
+
+        for (const sceneNumber of sceneNumbers) {
+            const list = this.candidates.get(sceneNumber);
+            if (!list) {
+                missing.push(sceneNumber);
+                continue;
+            }
+            imageMap[sceneNumber] = path.join(this.folder, list[0].name);
+            if (list.length > 1) {
+                ambiguous.push({
+                    sceneNumber,
+                    chosen: list[0].name,
+                    others: list.slice(1).map(c => c.name)
+                });
+            }
+        }
+
+        return { imageMap, missing, ambiguous };
+    }
+}
+
+const cache = new Map(); // resolved folder -> ImageIndex
+
+/**
+ * Cached index of a folder, rebuilt when the folder changed
+ * @param {string} folder - Images folder
+ * @returns {ImageIndex}
+ */
+export function getImageIndex(folder) {
+    const key = path.resolve(folder);
+    const cached = cache.get(key);
+    if (cached && cached.mtimeMs === fs.statSync(key).mtimeMs) {
+        return cached;
+    }
+
+    const index = new ImageIndex(key);
+    cache.set(key, index);
+    return index;
+}
@@ -0,0 +1,88 @@
+import os
+import re
+
+# Same matching rule as image-index.js:
+#   "Scene 12.png" (rank 0) > "12.png" (rank 1) > "scene_12_final.png" (rank 2),
+#   then extension priority, then name. More than one candidate = ambiguous.
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.PNG', '.JPG', '.JPEG']
+
+CANONICAL_RE = re.compile(r'^scene\s*(\d+)$', re.IGNORECASE)
+NUMBER_ONLY_RE = re.compile(r'^(\d+)$')
+FIRST_NUMBER_RE = re.compile(r'(\d+)')
+
+
+def parse_image_name(file_name):
+    """Return (scene_number, rank, ext_rank) for a scene image name, else None"""
+    stem, ext = os.path.splitext(file_name)
+    if ext.lower() not in ('.png', '.jpg', '.jpeg'):
+        return None
+
+    stem = stem.strip()
+    ext_rank = IMAGE_EXTENSIONS.index(ext) if ext in IMAGE_EXTENSIONS else len(IMAGE_EXTENSIONS)
+
+    for rank, pattern in enumerate((CANONICAL_RE, NUMBER_ONLY_RE)):
+        match = pattern.match(stem)
+        if match:
+            return int(match.group(1)), rank, ext_rank
+
+    match = FIRST_NUMBER_RE.search(stem)
+    if match:
+        return int(match.group(1)), 2, ext_rank
+    return None
+
+
+class ImageIndex:
+    """Scene number -> image files, built with one os.scandir pass"""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.mtime = os.stat(folder).st_mtime_ns
+        self.candidates = {}  # sceneNumber -> [(rank, ext_rank, name)] sorted
+
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                parsed = parse_image_name(entry.name)
+                if parsed:
+                    scene_number, rank, ext_rank = parsed
+                    self.candidates.setdefault(scene_number, []).append((rank, ext_rank, entry.name))
+
+        for candidates in self.candidates.values():
+            candidates.sort()
+
+    def get(self, scene_number):
+        candidates = self.candidates.get(scene_number)
+        return os.path.join(self.folder, candidates[0][2]) if candidates else None
+
+    def match(self, scene_numbers):
+        """Return (image_map, missing, ambiguous) for the given scenes
+
+        ambiguous holds (scene_number, chosen_name, other_names) tuples.
+        """
+        image_map = {}
+        missing = []
+        ambiguous = []
+        for scene_number in scene_numbers:
+            candidates = self.candidates.get(scene_number)
+            if not candidates:
+                missing.append(scene_number)
+                continue
+            image_map[scene_number] = os.path.join(self.folder, candidates[0][2])
+            if len(candidates) > 1:
+                ambiguous.append((scene_number, candidates[0][2], [c[2] for c in candidates[1:]]))
+        return image_map, missing, ambiguous
+
+
+_cache = {}
+
+
+def get_image_index(folder):
+    """Cached index of folder, rebuilt when the folder's mtime changes"""
+    key = os.path.abspath(folder)
+    cached = _cache.get(key)
+    if cached and cached.mtime == os.stat(key).st_mtime_ns:
+        return cached
+    index = ImageIndex(key)
+    _cache[key] = index
+    return index
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Optional: without Pillow the original images are uploaded
+    Image = None
+
+# Scene images are normalized before upload: downscaled to what the output
+# resolution needs, re-encoded and stripped of metadata. Results are cached
+# under <output>/cache/images by content hash + settings, so re-runs and
+# retries reuse them.
+PREP_VERSION = 1  # bump when the encoding below changes
+SHORT_SIDES = {'480p': 480, '720p': 720}
+HEADROOM = 1.5  # keep some detail above the output size for Grok's own resize
+JPEG_QUALITY = 90
+
+available = Image is not None
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def settings_key(resolution):
+    return f"v{PREP_VERSION}_{resolution}_q{JPEG_QUALITY}"
+
+
+def cached_output(cache_dir, content_hash, resolution):
+    """Existing cache file for this content and settings, or None"""
+    for extension in ('.jpg', '.png'):
+        path = os.path.join(cache_dir, f"{content_hash[:24]}_{settings_key(resolution)}{extension}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def prepare_image(source, resolution, cache_dir):
+    """Normalize one image into the cache (runs in a pool process)
+
+    Returns {source, path, sourceBytes, bytes, cached}. path is the original
+    when re-encoding would not make it smaller.
+    """
+    content_hash = file_hash(source)
+    source_bytes = os.path.getsize(source)
+    output = cached_output(cache_dir, content_hash, resolution)
+    cached = output is not None
+
+    if not cached:
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+            short_side = int(SHORT_SIDES.get(resolution, 720) * HEADROOM)
+            if min(image.size) > short_side:
+                scale = short_side / min(image.size)
+                image = image.resize((round(image.width * scale), round(image.height * scale)),
+                                     Image.LANCZOS)
+
+            has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+            extension = '.png' if has_alpha else '.jpg'
+            output = os.path.join(cache_dir, f"{content_hash[:24]}_{settings_key(resolution)}{extension}")
+            temp_path = f"{output}.{os.getpid()}.tmp"
+
+            # Saving without exif/icc/info drops the metadata
+            if has_alpha:
+                image.save(temp_path, 'PNG', optimize=True)
+            else:
+                image.convert('RGB').save(temp_path, 'JPEG', quality=JPEG_QUALITY, optimize=True,
+                                          progressive=True)
+        os.replace(temp_path, output)
+
+    output_bytes = os.path.getsize(output)
+    if output_bytes >= source_bytes:
+        output, output_bytes = source, source_bytes
+    return {
+        'source': source,
+        'path': output,
+        'sourceBytes': source_bytes,
+        'bytes': output_bytes,
+        'cached': cached
+    }
+
+
+class ImagePreparer:
+    """Prepares a batch's images in a process pool ahead of their scenes
+
+    start() queues every image; get() blocks until one image is ready and
+    falls back to the original when preparing it failed.
+    """
+
+    def __init__(self, cache_dir, resolution, processes=None):
+        self.cache_dir = cache_dir
+        self.resolution = resolution
+        self.processes = processes or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.executor = None
+        self.futures = {}
+        self.lock = threading.Lock()
+
+    def start(self, paths):
+        self.executor = ProcessPoolExecutor(max_workers=self.processes)
+        self.add(paths)
+
+    def add(self, paths, cache_dir=None):
+        """Queue more images, e.g. of a project joining a running batch (cached in cache_dir)"""
+        cache_dir = cache_dir or self.cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        with self.lock:
+            for path in dict.fromkeys(paths):
+                if path not in self.futures:
+                    self.futures[path] = self.executor.submit(prepare_image, path, self.resolution, cache_dir)
+
+    def get(self, path):
+        """{source, path, sourceBytes, bytes, cached} for one image"""
+        with self.lock:
+            future = self.futures.get(path)
+            if future is None:
+                future = self.futures[path] = self.executor.submit(
+                    prepare_image, path, self.resolution, self.cache_dir)
+        try:
+            return future.result()
+        except Exception as e:
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            return {'source': path, 'path': path, 'sourceBytes': size, 'bytes': size,
+                    'cached': False, 'error': str(e)}
+
+    def close(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,114 @@
+import fs from 'fs';
+import path from 'path';
+
+/**
+ * Per-run latency report built from job manifests (result.json).
+ *
+ * grok-automation.js records how long each job spent in every stage
+ * (manifest.stages, ms) plus totalMs and bytes. The report keeps one row per
+ * scene and summarises each metric as count / p50 / p95 / max, written to
+ * <output>/reports/latency_<runId>.json and .csv.
+ *
+ * latency.py builds the same report for the Python batch GUI.
+ */
+
+export const STAGES = [
+    'connect', 'resume', 'queue', 'navigate', 'upload', 'transition', 'paste',
+    'options', 'submit', 'generate', 'download'
+];
+
+/**
+ * Nearest-rank percentile
+ * @param {Array<number>} sorted - Values in ascending order
+ * @param {number} p - Percentile (0-100)
+ * @returns {number|null}
+ */
+export function percentile(sorted, p) {
+    if (sorted.length === 0) return null;
+    return sorted[Math.max(0, Math.ceil((p / 100) * sorted.length) - 1)];
+}
+
+function summarize(values) {
+    const sorted = [...values].sort((a, b) => a - b);
+    return {
+        count: sorted.length,
+        p50: percentile(sorted, 50),
+        p95: percentile(sorted, 95),
+        max: sorted.length ? sorted[sorted.length - 1] : null
+    };
+}
+
+export class LatencyReport {
+    /**
+     * @param {string} runId - Used in the report file names
+     */
+    constructor(runId = new Date().toISOString().replace(/[:.]/g, '-')) {
+        this.runId = runId;
+        this.scenes = [];
+    }
+
+    /**
+     * Add one finished job
+     * @param {number} sceneNumber - Scene number
+     * @param {Object} manifest - The job's result.json
+     */
+    add(sceneNumber, manifest) {
+        if (!manifest || !manifest.stages) return;
+        this.scenes.push({
+            sceneNumber,
+            status: manifest.status,
+            stages: manifest.stages,
+            totalMs: manifest.totalMs,
+            bytes: manifest.bytes || null
+        });
+    }
+
+    /**
+     * @returns {Array<Object>} { metric, unit, count, p50, p95, max } rows
+     */
+    summary() {
+        const rows = [];
+        const addRow = (metric, unit, values) => {
+            if (values.length) rows.push({ metric, unit, ...summarize(values) });
+        };
+
+        for (const stage of STAGES) {
+            addRow(stage, 'ms', this.scenes.filter(s => s.stages[stage] !== undefined).map(s => s.stages[stage]));
+        }
+        addRow('total', 'ms', this.scenes.filter(s => s.totalMs !== undefined).map(s => s.totalMs));
+
+        const downloads = this.scenes.filter(s => s.bytes && s.stages.download);
+        addRow('download_size', 'MB', downloads.map(s => s.bytes / 1024 / 1024));
+        addRow('download_rate', 'MB/s', downloads.map(s => (s.bytes / 1024 / 1024) / (s.stages.download / 1000)));
+        return rows;
+    }
+
+    /**
+     * Write the JSON and CSV reports
+     * @param {string} outputFolder - Batch output folder
+     * @returns {Object} { jsonPath, csvPath }
+     */
+    write(outputFolder) {
+        const reportsFolder = path.join(outputFolder, 'reports');
+        fs.mkdirSync(reportsFolder, { recursive: true });
+
+        const summary = this.summary();
+        const jsonPath = path.join(reportsFolder, `latency_${this.runId}.json`);
+        fs.writeFileSync(jsonPath, JSON.stringify({
+            runId: this.runId,
+            generatedAt: new Date().toISOString(),
+            summary,
+            scenes: this.scenes
+        }, null, 2));
+
+        const round = (value) => value === null ? '' : Math.round(value * 100) / 100;
+        const lines = ['metric,unit,count,p50,p95,max'];
+        for (const row of summary) {
+            lines.push([row.metric, row.unit, row.count, round(row.p50), round(row.p95), round(row.max)].join(','));
+        }
+        const csvPath = path.join(reportsFolder, `latency_${this.runId}.csv`);
+        fs.writeFileSync(csvPath, lines.join('\n') + '\n');
+
+        return { jsonPath, csvPath };
+    }
+}
@@ -0,0 +1,104 @@
+import json
+import math
+import os
+import threading
+from datetime import datetime
+
+# Same report as latency.js: per-stage durations from job manifests
+# summarised as count / p50 / p95 / max, written to <output>/reports/
+STAGES = [
+    'connect', 'resume', 'queue', 'navigate', 'upload', 'transition', 'paste',
+    'options', 'submit', 'generate', 'download'
+]
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(values):
+    ordered = sorted(values)
+    return {
+        'count': len(ordered),
+        'p50': percentile(ordered, 50),
+        'p95': percentile(ordered, 95),
+        'max': ordered[-1] if ordered else None
+    }
+
+
+class LatencyReport:
+    """Scene rows of one run; add() may be called from worker threads"""
+
+    def __init__(self, run_id=None):
+        self.run_id = run_id or datetime.now().strftime('%Y-%m-%dT%H-%M-%S')
+        self.scenes = []
+        self.lock = threading.Lock()
+
+    def add(self, scene_number, manifest):
+        if not manifest or 'stages' not in manifest:
+            return
+        with self.lock:
+            self.scenes.append({
+                'sceneNumber': scene_number,
+                'status': manifest.get('status'),
+                'stages': manifest['stages'],
+                'totalMs': manifest.get('totalMs'),
+                'bytes': manifest.get('bytes')
+            })
+
+    def summary(self):
+        """Rows of {metric, unit, count, p50, p95, max}"""
+        with self.lock:
+            scenes = list(self.scenes)
+
+        rows = []
+
+        def add_row(metric, unit, values):
+            if values:
+                rows.append({'metric': metric, 'unit': unit, **summarize(values)})
+
+        for stage in STAGES:
+            add_row(stage, 'ms', [s['stages'][stage] for s in scenes if stage in s['stages']])
+        add_row('total', 'ms', [s['totalMs'] for s in scenes if s['totalMs'] is not None])
+
+        downloads = [s for s in scenes if s['bytes'] and s['stages'].get('download')]
+        add_row('download_size', 'MB', [s['bytes'] / 1024 / 1024 for s in downloads])
+        add_row('download_rate', 'MB/s', [
+            (s['bytes'] / 1024 / 1024) / (s['stages']['download'] / 1000) for s in downloads
+        ])
+        return rows
+
+    def write(self, output_folder):
+        """Write latency_<run>.json and .csv; returns (json_path, csv_path)"""
+        reports_folder = os.path.join(output_folder, 'reports')
+        os.makedirs(reports_folder, exist_ok=True)
+
+        summary = self.summary()
+        with self.lock:
+            scenes = list(self.scenes)
+
+        json_path = os.path.join(reports_folder, f"latency_{self.run_id}.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'runId': self.run_id,
+                'generatedAt': datetime.now().isoformat(),
+                'summary': summary,
+                'scenes': scenes
+            }, f, ensure_ascii=False, indent=2)
+
+        def fmt(value):
+            if value is None:
+                return ''
+            value = round(value, 2)
+            return str(int(value)) if value == int(value) else str(value)
+
+        csv_path = os.path.join(reports_folder, f"latency_{self.run_id}.csv")
+        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+            f.write('metric,unit,count,p50,p95,max\n')
+            for row in summary:
+                f.write(','.join([row['metric'], row['unit'], str(row['count']),
+                                  fmt(row['p50']), fmt(row['p95']), fmt(row['max'])]) + '\n')
+        return json_path, csv_path
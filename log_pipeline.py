@@ -0,0 +1,118 @@
+import os
+import queue
+import re
+import tkinter as tk
+from datetime import datetime
+
+# "....." progress lines printed by grok-automation.js while polling,
+# optionally behind a "[Worker N]" prefix added by the batch GUI
+DOTS_RE = re.compile(r'^(\[[^\]]+\]\s*)?\.+$')
+
+
+class LogPipeline:
+    """Thread-safe log queue drained into a Tk text widget on a fixed tick
+
+    Any thread may call write(). The Tk thread drains the queue every
+    interval_ms, inserts all pending lines in one batch, folds polling dots
+    into a single counter line and trims the widget to the last max_lines
+    lines. Every line is also appended to log_file when one is set.
+    """
+
+    def __init__(self, root, widget, max_lines=2000, interval_ms=100, timestamps=False):
+        self.root = root
+        self.widget = widget
+        self.max_lines = max_lines
+        self.interval_ms = interval_ms
+        self.timestamps = timestamps
+        self.queue = queue.Queue()
+        self.log_file = None
+        self.spinner = None  # (prefix, count) when the last widget line is a dot counter
+        self.after_id = None
+
+    def start(self):
+        if self.after_id is None:
+            self.after_id = self.root.after(self.interval_ms, self.drain)
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        self.drain(reschedule=False)
+        self.set_log_file(None)
+
+    def set_log_file(self, path):
+        """Stream every line to path (None closes the current file)"""
+        if self.log_file:
+            self.log_file.close()
+            self.log_file = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.log_file = open(path, 'a', encoding='utf-8')
+
+    def write(self, message):
+        self.queue.put((datetime.now(), message))
+
+    def drain(self, reschedule=True):
+        items = []
+        try:
+            while True:
+                items.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        if items:
+            self.flush(items)
+
+        if reschedule:
+            self.after_id = self.root.after(self.interval_ms, self.drain)
+
+    def flush(self, items):
+        if self.log_file:
+            self.log_file.write(''.join(f"[{ts.isoformat()}] {msg}\n" for ts, msg in items))
+            self.log_file.flush()
+
+        at_bottom = self.widget.yview()[1] >= 0.999
+        state = self.widget.cget('state')
+        self.widget.config(state=tk.NORMAL)
+
+        chunk = []
+        for ts, message in items:
+            for line in message.split('\n'):
+                dots = DOTS_RE.match(line)
+                if dots:
+                    self.insert(chunk)
+                    chunk = []
+                    self.update_spinner(dots.group(1) or '', line.count('.'), ts)
+                    continue
+                if self.timestamps:
+                    line = f"[{ts.strftime('%H:%M:%S')}] {line}"
+                chunk.append(line)
+        self.insert(chunk)
+
+        # Content ends with a newline, so 'end-1c' sits on the empty line after the last one
+        excess = int(self.widget.index('end-1c').split('.')[0]) - 1 - self.max_lines
+        if excess > 0:
+            self.widget.delete('1.0', f"{excess + 1}.0")
+
+        self.widget.config(state=state)
+        if at_bottom:
+            self.widget.see(tk.END)
+
+    def insert(self, lines):
+        if lines:
+            self.widget.insert(tk.END, '\n'.join(lines) + '\n')
+            self.spinner = None
+
+    def update_spinner(self, prefix, dots, ts):
+        if self.spinner and self.spinner[0] == prefix:
+            count = self.spinner[1] + dots
+            self.widget.delete('end-2l', 'end-1c')
+        else:
+            count = dots
+
+        spin = '|/-\\'[count % 4]
+        text = f"{prefix}⏳ {spin} polling... {count}"
+        if self.timestamps:
+            text = f"[{ts.strftime('%H:%M:%S')}] {text}"
+        self.widget.insert(tk.END, text + '\n')
+        self.spinner = (prefix, count)
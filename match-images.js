@@ -1,6 +1,7 @@
 import fs from 'fs';
 import path from 'path';
 import { fileURLToPath } from 'url';
+import { getImageIndex } from './image-index.js';
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
@@ -12,55 +13,30 @@ const __dirname = path.dirname(__filename);
  * @returns {string|null} Image path or null if not found
  */
 export function findImageForScene(sceneNumber, imagesFolder) {
-    // Pattern: "Scene 1.png", "Scene 2.png", etc.
-    const imageName = `Scene ${sceneNumber}.png`;
-    const imagePath = path.join(imagesFolder, imageName);
-
-    if (fs.existsSync(imagePath)) {
-        return imagePath;
-    }
-
-    // Try alternative extensions
-    const alternatives = ['.jpg', '.jpeg', '.PNG', '.JPG', '.JPEG'];
-    for (const ext of alternatives) {
-        const altName = `Scene ${sceneNumber}${ext}`;
-        const altPath = path.join(imagesFolder, altName);
-        if (fs.existsSync(altPath)) {
-            return altPath;
-        }
-    }
-
-    return null;
+    return getImageIndex(imagesFolder).get(sceneNumber);
 }
 
 /**
  * Generate image path map for all scenes
  * @param {Array} scenes - Array of scene objects
  * @param {string} imagesFolder - Path to images folder
- * @returns {Object} Map of scene number to image path
+ * @returns {Object} { imageMap, missing, ambiguous }
  */
 export function generateImagePathMap(scenes, imagesFolder) {
     console.log(`🖼️  Matching images from: ${imagesFolder}`);
 
-    const imageMap = {};
-    const missing = [];
-
-    scenes.forEach(scene => {
-        const imagePath = findImageForScene(scene.sceneNumber, imagesFolder);
-        if (imagePath) {
-            imageMap[scene.sceneNumber] = imagePath;
-        } else {
-            missing.push(scene.sceneNumber);
-        }
-    });
+    const { imageMap, missing, ambiguous } = getImageIndex(imagesFolder).match(scenes.map(s => s.sceneNumber));
 
     console.log(`✅ Found images: ${Object.keys(imageMap).length}/${scenes.length}`);
 
     if (missing.length > 0) {
         console.log(`⚠️  Missing images for scenes: ${missing.join(', ')}`);
     }
+    ambiguous.forEach(({ sceneNumber, chosen, others }) => {
+        console.log(`⚠️  Scene ${sceneNumber}: using ${chosen}, also found ${others.join(', ')}`);
+    });
 
-    return { imageMap, missing };
+    return { imageMap, missing, ambiguous };
 }
 
 /**
@@ -105,7 +81,7 @@ export function validateImagesFolder(imagesFolder) {
 
     // Count image files
     const files = fs.readdirSync(imagesFolder);
-    const imageFiles = files.filter(f => /\.(png|jpg|jpeg)$/i.test(f));
+    const imageFiles = files.filter(f => /\.(png|jpe?g)$/i.test(f));
 
     return {
         valid: true,
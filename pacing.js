@@ -0,0 +1,91 @@
+/**
+ * Adaptive pacing for one account (one browser profile).
+ *
+ * A token bucket that holds a single token: a job may start once `interval`
+ * seconds have passed since the previous start. The interval adapts:
+ *   - a success no slower than usual shrinks it (x SPEED_UP, down to minDelay)
+ *   - a throttling / timeout failure doubles it (up to maxDelay) and holds
+ *     the next start for a full interval; consecutive signals keep doubling
+ *   - any other failure leaves it alone
+ *
+ * pacing.py implements the same rules for the Python batch GUI.
+ */
+
+export const SPEED_UP = 0.8;
+export const BACKOFF = 2;
+export const SLOW_FACTOR = 1.25; // success slower than 1.25x the average does not speed up
+
+const THROTTLE_RE = /rate.?limit|too many|throttl|quota|try again later|\b429\b|timed? ?out|timeout/i;
+
+/**
+ * Whether a failure reason looks like the service pushing back
+ * @param {string} reason - Failure reason
+ * @returns {boolean}
+ */
+export function isThrottleSignal(reason) {
+    return THROTTLE_RE.test(reason || '');
+}
+
+export class Pacer {
+    /**
+     * @param {Object} options - { minDelay, maxDelay, initialDelay } in seconds
+     */
+    constructor({ minDelay = 5, maxDelay = 300, initialDelay = 30 } = {}) {
+        this.minDelay = minDelay;
+        this.maxDelay = Math.max(minDelay, maxDelay);
+        this.interval = this.clamp(initialDelay);
+        this.lastStart = null;
+        this.holdUntil = 0;
+        this.avgDuration = null;
+        this.state = 'steady'; // steady | speeding-up | backoff
+    }
+
+    clamp(seconds) {
+        return Math.min(this.maxDelay, Math.max(this.minDelay, seconds));
+    }
+
+    /**
+     * Take the token for the next job
+     * @returns {number} Seconds to wait before starting it
+     */
+    reserve() {
+        const now = Date.now();
+        const readyAt = Math.max(
+            this.lastStart === null ? now : this.lastStart + this.interval * 1000,
+            this.holdUntil,
+            now
+        );
+        this.lastStart = readyAt;
+        return (readyAt - now) / 1000;
+    }
+
+    /**
+     * Feed back the outcome of a job
+     * @param {boolean} success - Whether the job produced a video
+     * @param {number} durationMs - How long the job took
+     * @param {string} reason - Failure reason
+     */
+    record(success, durationMs, reason = '') {
+        if (success) {
+            const usual = this.avgDuration === null || durationMs <= this.avgDuration * SLOW_FACTOR;
+            this.avgDuration = this.avgDuration === null ? durationMs : this.avgDuration * 0.7 + durationMs * 0.3;
+            this.interval = usual ? this.clamp(this.interval * SPEED_UP) : this.interval;
+            this.state = usual ? 'speeding-up' : 'steady';
+        } else if (isThrottleSignal(reason)) {
+            this.interval = this.clamp(Math.max(this.interval, 1) * BACKOFF);
+            this.holdUntil = Date.now() + this.interval * 1000;
+            this.state = 'backoff';
+        }
+    }
+
+    /**
+     * @returns {Object} Payload of the `pacing` event
+     */
+    snapshot() {
+        return {
+            interval: Math.round(this.interval * 10) / 10,
+            perHour: Math.round(3600 / Math.max(this.interval, 1)),
+            state: this.state
+        };
+    }
+}
@@ -0,0 +1,62 @@
+import re
+import time
+
+# Same rules as pacing.js: a one-token bucket per account whose interval
+# shrinks on usual-speed successes and doubles (with a hold) on throttling
+SPEED_UP = 0.8
+BACKOFF = 2
+SLOW_FACTOR = 1.25
+
+THROTTLE_RE = re.compile(r'rate.?limit|too many|throttl|quota|try again later|\b429\b|timed? ?out|timeout', re.IGNORECASE)
+
+
+def is_throttle_signal(reason):
+    return bool(THROTTLE_RE.search(reason or ''))
+
+
+class Pacer:
+    """Adaptive start interval for one account (not thread-safe)"""
+
+    def __init__(self, min_delay=5, max_delay=300, initial_delay=30):
+        self.min_delay = min_delay
+        self.max_delay = max(min_delay, max_delay)
+        self.interval = self.clamp(initial_delay)
+        self.last_start = None
+        self.hold_until = 0
+        self.avg_duration = None
+        self.state = 'steady'  # steady | speeding-up | backoff
+
+    def clamp(self, seconds):
+        return min(self.max_delay, max(self.min_delay, seconds))
+
+    def reserve(self):
+        """Take the token for the next job; returns seconds to wait before starting it"""
+        now = time.monotonic()
+        ready_at = max(
+            now if self.last_start is None else self.last_start + self.interval,
+            self.hold_until,
+            now
+        )
+        self.last_start = ready_at
+        return ready_at - now
+
+    def record(self, success, duration, reason=''):
+        """Feed back a job outcome (duration in seconds)"""
+        if success:
+            usual = self.avg_duration is None or duration <= self.avg_duration * SLOW_FACTOR
+            self.avg_duration = duration if self.avg_duration is None else self.avg_duration * 0.7 + duration * 0.3
+            if usual:
+                self.interval = self.clamp(self.interval * SPEED_UP)
+            self.state = 'speeding-up' if usual else 'steady'
+        elif is_throttle_signal(reason):
+            self.interval = self.clamp(max(self.interval, 1) * BACKOFF)
+            self.hold_until = time.monotonic() + self.interval
+            self.state = 'backoff'
+
+    def snapshot(self):
+        """Payload of the pacing event"""
+        return {
+            'interval': round(self.interval, 1),
+            'perHour': round(3600 / max(self.interval, 1)),
+            'state': self.state
+        }
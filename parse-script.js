@@ -5,6 +5,16 @@ import { fileURLToPath } from 'url';
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 
+// Script grammar, shared with script_parser.py and src/main/services/ScriptParser.ts:
+// a header is "Scene <number> [(tag)...]:" (case-insensitive) and a scene is
+// done when one of its tags reads "(done)", spaces inside the parentheses allowed.
+export const SCENE_HEADER_RE = /^Scene\s+(\d+)\s*((?:\([^()]*\)\s*)*):/i;
+export const DONE_TAG_RE = /\(\s*done\s*\)/i;
+const METADATA_FIELDS = ['ENVIRONMENT', 'LIGHTING', 'CAMERA', 'Voice', 'Sound', 'Music'];
+// A value runs to the next "|" or the next "FIELD:", whichever comes first
+const FIELD_NAMES = METADATA_FIELDS.join('|');
+const METADATA_RE = new RegExp(`(${FIELD_NAMES}):\\s*((?:(?!\\b(?:${FIELD_NAMES}):)[^|])+)`, 'gi');
+
 /**
  * Parse script file to extract scene information
  * @param {string} scriptPath - Path to script file
@@ -23,8 +33,8 @@ export function parseScriptFile(scriptPath) {
     for (let i = 0; i < lines.length; i++) {
         const line = lines[i].trim();
 
-        // Detect scene header: "Scene 1:" or "Scene 16 ( done):"
-        const sceneMatch = line.match(/^Scene\s+(\d+)\s*(\(\s*done\s*\))?:/i);
+        // Detect scene header: "Scene 1:", "Scene 16 ( done):", "Scene 2 (done) :"
+        const sceneMatch = line.match(SCENE_HEADER_RE);
 
         if (sceneMatch) {
             // Save previous scene if exists
@@ -35,7 +45,7 @@ export function parseScriptFile(scriptPath) {
 
             // Start new scene
             const sceneNumber = parseInt(sceneMatch[1]);
-            const isDone = !!sceneMatch[2];
+            const isDone = DONE_TAG_RE.test(sceneMatch[2]);
 
             currentScene = {
                 sceneNumber: sceneNumber,
@@ -51,8 +61,7 @@ export function parseScriptFile(scriptPath) {
             currentPrompt = '';
 
             // Extract prompt from same line (after "Scene X:")
-            const promptStart = line.indexOf(':') + 1;
-            const promptLine = line.substring(promptStart).trim();
+            const promptLine = line.substring(sceneMatch[0].length).trim();
 
             if (promptLine) {
                 // Extract only the text before first "|" (metadata separator)
@@ -102,15 +111,15 @@ export function parseScriptFile(scriptPath) {
  * @param {string} metadataText - Metadata text to parse
  */
 function parseMetadata(scene, metadataText) {
-    const fields = ['ENVIRONMENT', 'LIGHTING', 'CAMERA', 'Voice', 'Sound', 'Music'];
-
-    fields.forEach(field => {
-        const regex = new RegExp(`${field}:\\s*([^|]+)`, 'i');
-        const match = metadataText.match(regex);
-        if (match) {
-            scene[field.toLowerCase()] = match[1].trim();
+    // One precompiled pattern for all fields; the first value of a field wins
+    const seen = new Set();
+    for (const match of metadataText.matchAll(METADATA_RE)) {
+        const field = match[1].toLowerCase();
+        if (!seen.has(field)) {
+            seen.add(field);
+            scene[field] = match[2].trim();
         }
-    });
+    }
 }
 
 /**
@@ -0,0 +1,218 @@
+import fs from 'fs';
+
+/**
+ * Append-only journal behind progress/batch_progress.json.
+ *
+ * batch_progress.json is a snapshot; every change since then is one JSON line in
+ * batch_progress.journal.jsonl:
+ *   { seq, op: 'start', ts, total, pending }
+ *   { seq, op: 'current', ts, sceneNumber }
+ *   { seq, op: 'completed', ts, sceneNumber, videoPath }
+ *   { seq, op: 'failed', ts, sceneNumber, error }
+ * Loading replays the journal on top of the snapshot, skipping records the
+ * snapshot already holds (seq <= journalSeq) and a torn last line left by a
+ * crash. Every COMPACT_EVERY records the state is written to a new snapshot
+ * (temp file + rename) and the journal is truncated.
+ *
+ * progress_journal.py implements the same format for the Python GUI.
+ */
+
+export const JOURNAL_SUFFIX = '.journal.jsonl';
+export const COMPACT_EVERY = 100;
+
+/**
+ * @returns {Object} Progress data for a folder with no history
+ */
+function emptyProgress() {
+    const now = new Date().toISOString();
+    return {
+        totalScenes: 0,
+        completed: [],
+        failed: [],
+        pending: [],
+        currentScene: null,
+        startedAt: now,
+        lastUpdated: now,
+        runCompleted: 0,
+        runFailed: 0,
+        journalSeq: 0
+    };
+}
+
+/**
+ * Path of the journal that belongs to a snapshot file
+ * @param {string} progressFile - Path of batch_progress.json
+ * @returns {string}
+ */
+export function journalPath(progressFile) {
+    return progressFile.replace(/\.json$/, '') + JOURNAL_SUFFIX;
+}
+
+/**
+ * Fold one record into the state
+ * @param {Object} data - Progress data without its pending list
+ * @param {Set<number>} pending - Live set of pending scene numbers
+ * @param {Object} record - Journal record
+ */
+export function applyRecord(data, pending, record) {
+    switch (record.op) {
+        case 'start':
+            data.totalScenes = record.total;
+            pending.clear();
+            record.pending.forEach(n => pending.add(n));
+            data.runCompleted = 0;
+            data.runFailed = 0;
+            break;
+        case 'current':
+            data.currentScene = record.sceneNumber;
+            break;
+        case 'completed':
+            data.completed.push({
+                sceneNumber: record.sceneNumber,
+                videoPath: record.videoPath,
+                completedAt: record.ts
+            });
+            pending.delete(record.sceneNumber);
+            data.runCompleted++;
+            break;
+        case 'failed':
+            data.failed.push({
+                sceneNumber: record.sceneNumber,
+                error: record.error,
+                failedAt: record.ts
+            });
+            pending.delete(record.sceneNumber);
+            data.runFailed++;
+            break;
+    }
+    data.lastUpdated = record.ts;
+    data.journalSeq = record.seq;
+}
+
+/**
+ * Read complete journal lines starting at a byte offset
+ * @param {string} file - Journal path
+ * @param {number} offset - Byte offset to start at
+ * @returns {Object} { records, end } where end is the offset after the last complete line
+ */
+export function readJournal(file, offset = 0) {
+    if (!fs.existsSync(file)) return { records: [], end: 0 };
+
+    const buffer = fs.readFileSync(file).subarray(offset);
+    const records = [];
+    let start = 0;
+    let newline;
+
+    while ((newline = buffer.indexOf(0x0a, start)) !== -1) {
+        const line = buffer.subarray(start, newline).toString('utf-8').trim();
+        if (line) {
+            try {
+                records.push(JSON.parse(line));
+            } catch (e) {
+                break; // Corrupt line: stop here, like a torn tail
+            }
+        }
+        start = newline + 1;
+    }
+
+    return { records, end: offset + start };
+}
+
+/**
+ * Rebuild progress from snapshot + journal
+ * @param {string} progressFile - Path of batch_progress.json
+ * @returns {Object} { data, pending, journalEnd, journalRecords }
+ */
+export function replayProgress(progressFile) {
+    let data = emptyProgress();
+    if (fs.existsSync(progressFile)) {
+        try {
+            data = { ...data, ...JSON.parse(fs.readFileSync(progressFile, 'utf-8')) };
+        } catch (e) {
+            console.error(`⚠️ Unreadable progress snapshot ${progressFile}: ${e.message}`);
+        }
+    }
+
+    const pending = new Set(data.pending);
+    delete data.pending; // Tracked in the Set while replaying / running
+    const { records, end } = readJournal(journalPath(progressFile));
+    for (const record of records) {
+        if (record.seq > data.journalSeq) applyRecord(data, pending, record);
+    }
+
+    return { data, pending, journalEnd: end, journalRecords: records.length };
+}
+
+/**
+ * Current progress in the batch_progress.json shape (snapshot + journal)
+ * @param {string} progressFile - Path of batch_progress.json
+ * @returns {Object}
+ */
+export function loadProgress(progressFile) {
+    const { data, pending } = replayProgress(progressFile);
+    return { ...data, pending: [...pending] };
+}
+
+/**
+ * Writer side: owns the journal of one output folder
+ */
+export class ProgressJournal {
+    /**
+     * @param {string} progressFile - Path of batch_progress.json
+     */
+    constructor(progressFile) {
+        this.progressFile = progressFile;
+        this.journalFile = journalPath(progressFile);
+
+        const { data, pending, journalEnd, journalRecords } = replayProgress(progressFile);
+        this.data = data;
+        this.pending = pending;
+
+        // Drop a torn tail so new records start on a fresh line
+        if (fs.existsSync(this.journalFile) && fs.statSync(this.journalFile).size > journalEnd) {
+            fs.truncateSync(this.journalFile, journalEnd);
+        }
+        this.fd = fs.openSync(this.journalFile, 'a');
+        this.sinceCompact = journalRecords;
+    }
+
+    /**
+     * Append one record and apply it
+     * @param {string} op - start | current | completed | failed
+     * @param {Object} fields - Record payload
+     */
+    append(op, fields = {}) {
+        const record = { seq: this.data.journalSeq + 1, op, ts: new Date().toISOString(), ...fields };
+        fs.writeSync(this.fd, JSON.stringify(record) + '\n');
+        applyRecord(this.data, this.pending, record);
+
+        if (++this.sinceCompact >= COMPACT_EVERY) {
+            this.compact();
+        }
+    }
+
+    /**
+     * @returns {Object} State in the batch_progress.json shape
+     */
+    snapshot() {
+        return { ...this.data, pending: [...this.pending] };
+    }
+
+    /**
+     * Write the snapshot atomically, then empty the journal
+     */
+    compact() {
+        const tempFile = `${this.progressFile}.tmp`;
+        fs.writeFileSync(tempFile, JSON.stringify(this.snapshot(), null, 2));
+        fs.renameSync(tempFile, this.progressFile);
+        fs.ftruncateSync(this.fd, 0);
+        this.sinceCompact = 0;
+    }
+
+    close() {
+        if (this.fd === null) return;
+        this.compact();
+        fs.closeSync(this.fd);
+        this.fd = null;
+    }
+}
@@ -0,0 +1,194 @@
+import json
+import os
+from datetime import datetime
+
+# Same format as progress-journal.js: batch_progress.json is a snapshot and
+# every change since then is one JSON line in batch_progress.journal.jsonl
+JOURNAL_SUFFIX = '.journal.jsonl'
+COMPACT_EVERY = 100
+
+
+def journal_path(progress_file):
+    base = progress_file[:-len('.json')] if progress_file.endswith('.json') else progress_file
+    return base + JOURNAL_SUFFIX
+
+
+def empty_progress():
+    now = datetime.now().isoformat()
+    return {
+        'totalScenes': 0,
+        'completed': [],
+        'failed': [],
+        'pending': [],
+        'currentScene': None,
+        'startedAt': now,
+        'lastUpdated': now,
+        'runCompleted': 0,
+        'runFailed': 0,
+        'journalSeq': 0
+    }
+
+
+def apply_record(data, pending, record):
+    """Fold one journal record into data; pending is the live ordered set (a dict)"""
+    op = record['op']
+    if op == 'start':
+        data['totalScenes'] = record['total']
+        pending.clear()
+        pending.update(dict.fromkeys(record['pending']))
+        data['runCompleted'] = 0
+        data['runFailed'] = 0
+    elif op == 'current':
+        data['currentScene'] = record['sceneNumber']
+    elif op == 'completed':
+        data['completed'].append({
+            'sceneNumber': record['sceneNumber'],
+            'videoPath': record['videoPath'],
+            'completedAt': record['ts']
+        })
+        pending.pop(record['sceneNumber'], None)
+        data['runCompleted'] += 1
+    elif op == 'failed':
+        data['failed'].append({
+            'sceneNumber': record['sceneNumber'],
+            'error': record['error'],
+            'failedAt': record['ts']
+        })
+        pending.pop(record['sceneNumber'], None)
+        data['runFailed'] += 1
+    data['lastUpdated'] = record['ts']
+    data['journalSeq'] = record['seq']
+
+
+def read_journal(path, offset=0):
+    """Read complete lines from offset; returns (records, end_offset, corrupt)
+
+    An unterminated last line (torn write) is left for later. A terminated line
+    that does not parse stops the read with corrupt=True.
+    """
+    if not os.path.exists(path):
+        return [], 0, False
+
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        chunk = f.read()
+
+    records = []
+    end = offset
+    for line in chunk.split(b'\n')[:-1]:
+        text = line.strip()
+        if text:
+            try:
+                records.append(json.loads(text))
+            except ValueError:
+                return records, end, True
+        end += len(line) + 1
+    return records, end, False
+
+
+def replay_progress(progress_file):
+    """Rebuild (data, pending, journal_end, journal_records) from snapshot + journal"""
+    data = empty_progress()
+    if os.path.exists(progress_file):
+        try:
+            with open(progress_file, 'r', encoding='utf-8') as f:
+                data.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    pending = dict.fromkeys(data.pop('pending'))
+    records, end, _ = read_journal(journal_path(progress_file))
+    for record in records:
+        if record['seq'] > data['journalSeq']:
+            apply_record(data, pending, record)
+    return data, pending, end, len(records)
+
+
+class ProgressJournal:
+    """Writer side: owns the journal of one output folder (not thread-safe)"""
+
+    def __init__(self, progress_file):
+        self.progress_file = progress_file
+        self.journal_file = journal_path(progress_file)
+        self.data, self.pending, end, self.since_compact = replay_progress(progress_file)
+
+        # Drop a torn tail so new records start on a fresh line
+        if os.path.exists(self.journal_file) and os.path.getsize(self.journal_file) > end:
+            os.truncate(self.journal_file, end)
+        self.file = open(self.journal_file, 'a', encoding='utf-8')
+
+    def append(self, op, **fields):
+        record = {'seq': self.data['journalSeq'] + 1, 'op': op, 'ts': datetime.now().isoformat(), **fields}
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.file.flush()
+        apply_record(self.data, self.pending, record)
+
+        self.since_compact += 1
+        if self.since_compact >= COMPACT_EVERY:
+            self.compact()
+
+    def snapshot(self):
+        return {**self.data, 'pending': list(self.pending)}
+
+    def compact(self):
+        """Write the snapshot atomically, then empty the journal"""
+        temp_file = self.progress_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, self.progress_file)
+        self.file.truncate(0)
+        self.since_compact = 0
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.compact()
+        self.file.close()
+
+
+class ProgressTail:
+    """Incremental reader of a progress journal
+
+    poll() reads only the bytes appended since the last call. When the writer
+    compacts (journal truncated) or the sequence breaks, it reloads the
+    snapshot once and carries on from there.
+    """
+
+    def __init__(self, progress_file):
+        self.progress_file = progress_file
+        self.journal_file = journal_path(progress_file)
+        self.reload()
+
+    def reload(self):
+        self.data, self.pending, self.offset, _ = replay_progress(self.progress_file)
+
+    def poll(self):
+        """Apply new journal records; returns True when anything changed"""
+        try:
+            size = os.path.getsize(self.journal_file)
+        except OSError:
+            size = 0
+
+        if size < self.offset:
+            self.reload()
+            return True
+        if size == self.offset:
+            return False
+
+        records, end, corrupt = read_journal(self.journal_file, self.offset)
+        changed = False
+        for record in records:
+            if record['seq'] <= self.data['journalSeq']:
+                continue
+            if record['seq'] != self.data['journalSeq'] + 1:
+                # Compacted and regrown since the last poll
+                self.reload()
+                return True
+            apply_record(self.data, self.pending, record)
+            changed = True
+
+        if corrupt:
+            self.reload()
+            return True
+        self.offset = end
+        return changed
@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+# Projects waiting for (or running on) the batch workers, and the scheduler
+# that shares the workers between them.
+#
+# ProjectQueue is the persistent list the GUI and CLI edit: one entry per
+# script/images/output set with a priority and a state, in the user's order,
+# written to projects.json (temp file + rename) on every change. A queue that
+# was interrupted comes back with its unfinished projects queued again.
+#
+# FairScheduler hands out scenes across the running projects by smooth
+# weighted round-robin: with weights 4 and 1 the picks go A A B A A A A B ...
+# so a small urgent project gets its share of the workers right away instead
+# of waiting behind a long one. Equal weights alternate; ties go to the
+# project that comes first in the queue.
+PRIORITIES = {'high': 4, 'normal': 2, 'low': 1}
+
+STATES = ('queued', 'running', 'done', 'cancelled')
+
+
+class ProjectQueue:
+    """Ordered, persistent list of projects; safe to use from several threads"""
+
+    def __init__(self, path=None, on_log=None):
+        self.path = path
+        self.on_log = on_log or print  # Write failures are reported here
+        self.projects = []
+        self.lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        """Read the file; finished projects are dropped, interrupted ones queued again"""
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                projects = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.projects = [p for p in projects if p.get('state') in ('queued', 'running')]
+        for project in self.projects:
+            project['state'] = 'queued'
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            data = json.dumps(self.projects, ensure_ascii=False, indent=2)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            self.on_log(f"⚠️ Could not write project queue {self.path}: {e}")
+
+    def get(self, project_id):
+        with self.lock:
+            return next((p for p in self.projects if p['id'] == project_id), None)
+
+    def find(self, script_path, output_folder):
+        """The unfinished project with this script and output, if any"""
+        with self.lock:
+            return next((
+                p for p in self.projects
+                if p['state'] in ('queued', 'running')
+                and os.path.abspath(p['scriptPath']) == os.path.abspath(script_path)
+                and os.path.abspath(p['outputFolder']) == os.path.abspath(output_folder)
+            ), None)
+
+    def add(self, script_path, images_folder, output_folder, priority='normal', skip_completed=True):
+        """Append a project and return its entry"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        with self.lock:
+            project = {
+                'id': max((p['id'] for p in self.projects), default=0) + 1,
+                'name': os.path.splitext(os.path.basename(script_path))[0],
+                'scriptPath': script_path,
+                'imagesFolder': images_folder,
+                'outputFolder': output_folder,
+                'skipCompleted': skip_completed,
+                'priority': priority,
+                'state': 'queued',
+                'addedAt': datetime.now().isoformat()
+            }
+            self.projects.append(project)
+        self.save()
+        return project
+
+    def update(self, project_id, **fields):
+        """Change fields of one project; returns the entry or None"""
+        with self.lock:
+            project = self.get(project_id)
+            if project:
+                project.update(fields)
+        if project:
+            self.save()
+        return project
+
+    def move(self, project_id, offset):
+        """Move a project up (offset < 0) or down the list; returns whether it moved"""
+        with self.lock:
+            project = self.get(project_id)
+            if not project:
+                return False
+            index = self.projects.index(project)
+            target = min(max(index + offset, 0), len(self.projects) - 1)
+            if target == index:
+                return False
+            self.projects.insert(target, self.projects.pop(index))
+        self.save()
+        return True
+
+    def remove(self, project_id):
+        with self.lock:
+            before = len(self.projects)
+            self.projects = [p for p in self.projects if p['id'] != project_id]
+            removed = len(self.projects) < before
+        if removed:
+            self.save()
+        return removed
+
+    def order(self):
+        with self.lock:
+            return [p['id'] for p in self.projects]
+
+    def entries(self, *states):
+        """Copies of the entries (in queue order), optionally only those in the given states"""
+        with self.lock:
+            return [dict(p) for p in self.projects if not states or p['state'] in states]
+
+
+class FairScheduler:
+    """Smooth weighted round-robin over per-project lanes of jobs (not thread-safe)"""
+
+    def __init__(self):
+        self.lanes = {}  # project id -> {jobs, weight, current}
+        self.order = []
+
+    def add(self, project_id, jobs, weight):
+        """Queue jobs for a project (appends when its lane exists)"""
+        lane = self.lanes.get(project_id)
+        if lane:
+            lane['jobs'].extend(jobs)
+            lane['weight'] = weight
+            return
+        self.lanes[project_id] = {'jobs': deque(jobs), 'weight': weight, 'current': 0}
+        if project_id not in self.order:
+            self.order.append(project_id)
+
+    def set_weight(self, project_id, weight):
+        if project_id in self.lanes:
+            self.lanes[project_id]['weight'] = weight
+
+    def set_order(self, project_ids):
+        """Tie-break order; ids not listed keep their place after the listed ones"""
+        self.order = [i for i in project_ids if i in self.lanes] + [i for i in self.order if i not in project_ids]
+
+    def cancel(self, project_id):
+        """Drop a project's waiting jobs; returns how many there were"""
+        lane = self.lanes.pop(project_id, None)
+        if project_id in self.order:
+            self.order.remove(project_id)
+        return len(lane['jobs']) if lane else 0
+
+    def pending(self, project_id=None):
+        if project_id is not None:
+            lane = self.lanes.get(project_id)
+            return len(lane['jobs']) if lane else 0
+        return sum(len(lane['jobs']) for lane in self.lanes.values())
+
+    def next(self):
+        """(project_id, job) of the next job to run, or None when every lane is empty"""
+        active = [i for i in self.order if self.lanes[i]['jobs']]
+        if not active:
+            return None
+        total = 0
+        chosen = None
+        for project_id in active:
+            lane = self.lanes[project_id]
+            lane['current'] += lane['weight']
+            total += lane['weight']
+            if chosen is None or lane['current'] > self.lanes[chosen]['current']:
+                chosen = project_id
+        lane = self.lanes[chosen]
+        lane['current'] -= total
+        return chosen, lane['jobs'].popleft()
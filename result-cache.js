@@ -0,0 +1,155 @@
+import crypto from 'crypto';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+
+/**
+ * Machine-wide cache of generated videos, keyed by what produced them.
+ *
+ * The key is the SHA-256 of [KEY_VERSION, prompt, SHA-256 of the image bytes,
+ * duration, resolution], so the same scene in a retry, a re-run or a copied
+ * project maps to the same entry. Entries are plain files <root>/<key>.mp4;
+ * a hit is copied into the project. Entries and project videos are separate
+ * files (never hard links), so editing a delivered video leaves the cache
+ * intact; the copy is a cheap clone where the file system supports it.
+ * The file mtime is the LRU clock: hits touch it, and eviction removes the
+ * oldest entries once the cache grows past maxBytes.
+ *
+ * Root: GROK_RESULT_CACHE or ~/.grok-video-cache; size cap in MB:
+ * GROK_RESULT_CACHE_MB (default 20480). result_cache.py and
+ * src/main/services/ResultCache.ts share the key and the layout.
+ */
+
+export const KEY_VERSION = 1;
+
+const DEFAULT_MAX_MB = 20 * 1024;
+
+const imageHashes = new Map(); // path -> { size, mtimeMs, hash }
+
+/**
+ * SHA-256 of a file, remembered per path until its size or mtime changes
+ * @param {string} filePath - Image path
+ * @returns {string} Hex digest
+ */
+export function hashFile(filePath) {
+    const stat = fs.statSync(filePath);
+    const known = imageHashes.get(filePath);
+    if (known && known.size === stat.size && known.mtimeMs === stat.mtimeMs) return known.hash;
+
+    const hash = crypto.createHash('sha256').update(fs.readFileSync(filePath)).digest('hex');
+    imageHashes.set(filePath, { size: stat.size, mtimeMs: stat.mtimeMs, hash });
+    return hash;
+}
+
+/**
+ * Cache key of one generation
+ * @param {Object} inputs - { prompt, imagePath, duration, resolution }
+ * @returns {string} Hex key
+ */
+export function resultKey({ prompt, imagePath, duration, resolution }) {
+    const imageHash = imagePath ? hashFile(imagePath) : '';
+    const material = JSON.stringify([KEY_VERSION, (prompt || '').trim(), imageHash, duration, resolution]);
+    return crypto.createHash('sha256').update(material).digest('hex');
+}
+
+/**
+ * Copy src to dest, as a copy-on-write clone when the file system can
+ * @param {string} src - Existing file
+ * @param {string} dest - New path (replaced if present)
+ */
+function copyFile(src, dest) {
+    fs.mkdirSync(path.dirname(dest), { recursive: true });
+    fs.copyFileSync(src, dest, fs.constants.COPYFILE_FICLONE);
+}
+
+export class ResultCache {
+    /**
+     * @param {Object} options - { root, maxBytes, onLog(message) } onLog reports store failures
+     */
+    constructor({ root, maxBytes, onLog } = {}) {
+        this.root = root || process.env.GROK_RESULT_CACHE || path.join(os.homedir(), '.grok-video-cache');
+        this.maxBytes = maxBytes || (parseFloat(process.env.GROK_RESULT_CACHE_MB) || DEFAULT_MAX_MB) * 1024 * 1024;
+        this.onLog = onLog || (message => console.error(message));
+        this.stats = { hits: 0, misses: 0, stored: 0, evicted: 0 };
+    }
+
+    entryPath(key) {
+        return path.join(this.root, `${key}.mp4`);
+    }
+
+    /**
+     * Copy the cached video for key to dest
+     * @param {string} key - From resultKey
+     * @param {string} dest - Where the project wants the video
+     * @returns {boolean} Whether it was a hit
+     */
+    materialize(key, dest) {
+        const entry = this.entryPath(key);
+        try {
+            const now = new Date();
+            fs.utimesSync(entry, now, now);
+            copyFile(entry, dest);
+        } catch (error) {
+            this.stats.misses++;
+            return false;
+        }
+        this.stats.hits++;
+        return true;
+    }
+
+    /**
+     * Add a finished video under key
+     * @param {string} key - From resultKey
+     * @param {string} videoPath - Downloaded video (stays where it is)
+     */
+    store(key, videoPath) {
+        try {
+            const tempPath = `${this.entryPath(key)}.${process.pid}.tmp`;
+            copyFile(videoPath, tempPath);
+            const now = new Date();
+            fs.utimesSync(tempPath, now, now);
+            fs.renameSync(tempPath, this.entryPath(key));
+            this.stats.stored++;
+            this.evict();
+        } catch (error) {
+            this.onLog(`⚠️ Could not cache ${videoPath}: ${error.message}`);
+        }
+    }
+
+    /**
+     * Remove least recently used entries until the cache fits in maxBytes
+     */
+    evict() {
+        const entries = fs.readdirSync(this.root)
+            .filter(name => name.endsWith('.mp4'))
+            .map(name => {
+                const stat = fs.statSync(path.join(this.root, name));
+                return { name, size: stat.size, mtimeMs: stat.mtimeMs };
+            })
+            .sort((a, b) => a.mtimeMs - b.mtimeMs);
+
+        let total = entries.reduce((sum, e) => sum + e.size, 0);
+        for (const entry of entries) {
+            if (total <= this.maxBytes) break;
+            fs.rmSync(path.join(this.root, entry.name), { force: true });
+            total -= entry.size;
+            this.stats.evicted++;
+        }
+    }
+
+    /**
+     * @returns {Object} Run counters plus the cache's current size
+     */
+    summary() {
+        let entries = 0;
+        let bytes = 0;
+        if (fs.existsSync(this.root)) {
+            for (const name of fs.readdirSync(this.root)) {
+                if (!name.endsWith('.mp4')) continue;
+                entries++;
+                bytes += fs.statSync(path.join(this.root, name)).size;
+            }
+        }
+        return { ...this.stats, entries, bytes };
+    }
+}
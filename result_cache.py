@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+# Same cache as result-cache.js: <root>/<key>.mp4, key = SHA-256 of
+# [KEY_VERSION, prompt, SHA-256 of the image, duration, resolution], file
+# mtime as the LRU clock. Root: GROK_RESULT_CACHE or ~/.grok-video-cache.
+# Entries and the project videos made from them are separate copies, never
+# hard links, so editing a delivered video cannot change the cached one.
+KEY_VERSION = 1
+DEFAULT_MAX_MB = 20 * 1024
+
+_image_hashes = {}  # path -> (size, mtime_ns, hash)
+_hash_lock = threading.Lock()
+
+
+def hash_file(path):
+    """SHA-256 of a file, remembered per path until its size or mtime changes"""
+    stat = os.stat(path)
+    with _hash_lock:
+        known = _image_hashes.get(path)
+    if known and known[:2] == (stat.st_size, stat.st_mtime_ns):
+        return known[2]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    with _hash_lock:
+        _image_hashes[path] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def result_key(prompt, image_path, duration, resolution):
+    image_hash = hash_file(image_path) if image_path else ''
+    material = json.dumps([KEY_VERSION, (prompt or '').strip(), image_hash, duration, resolution],
+                          ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def copy_file(src, dest):
+    """Copy src to dest (replaced if present), creating dest's folder"""
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    shutil.copyfile(src, dest)
+
+
+class ResultCache:
+    """Generated videos by input hash; safe to use from worker threads"""
+
+    def __init__(self, root=None, max_bytes=None, on_log=None):
+        self.root = root or os.environ.get('GROK_RESULT_CACHE') or os.path.join(
+            os.path.expanduser('~'), '.grok-video-cache')
+        if max_bytes is None:
+            try:
+                max_bytes = float(os.environ.get('GROK_RESULT_CACHE_MB', DEFAULT_MAX_MB)) * 1024 * 1024
+            except ValueError:
+                max_bytes = DEFAULT_MAX_MB * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.on_log = on_log or print  # Store failures are reported here
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+        self.lock = threading.Lock()
+
+    def entry_path(self, key):
+        return os.path.join(self.root, f"{key}.mp4")
+
+    def materialize(self, key, dest):
+        """Copy the cached video for key to dest; returns whether it was a hit"""
+        entry = self.entry_path(key)
+        try:
+            os.utime(entry)
+            copy_file(entry, dest)
+        except OSError:
+            with self.lock:
+                self.stats['misses'] += 1
+            return False
+        with self.lock:
+            self.stats['hits'] += 1
+        return True
+
+    def store(self, key, video_path):
+        """Add a finished video under key (the video stays where it is)"""
+        try:
+            temp_path = f"{self.entry_path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            copy_file(video_path, temp_path)
+            os.utime(temp_path)
+            os.replace(temp_path, self.entry_path(key))
+            with self.lock:
+                self.stats['stored'] += 1
+            self.evict()
+        except OSError as e:
+            self.on_log(f"⚠️ Could not cache {video_path}: {e}")
+
+    def entries(self):
+        """(name, size, mtime) of every cached video, oldest first"""
+        found = []
+        if os.path.isdir(self.root):
+            for entry in os.scandir(self.root):
+                if entry.name.endswith('.mp4'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    found.append((entry.name, stat.st_size, stat.st_mtime))
+        return sorted(found, key=lambda e: e[2])
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for name, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.root, name))
+            except OSError:
+                continue
+            total -= size
+            with self.lock:
+                self.stats['evicted'] += 1
+
+    def summary(self):
+        """Run counters plus the cache's current size (payload of result-cache)"""
+        entries = self.entries()
+        with self.lock:
+            stats = dict(self.stats)
+        return {**stats, 'entries': len(entries), 'bytes': sum(size for _, size, _ in entries)}
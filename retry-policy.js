@@ -0,0 +1,88 @@
+/**
+ * What to do with a failed scene.
+ *
+ * classifyFailure() sorts a failure into a class from the job's failure kind
+ * (result.json, see video-watcher.js) and its reason text. Each class has a
+ * policy:
+ *   retry          run it again right away (flaky UI step, lost download;
+ *                  a submitted generation is reopened from its checkpoint)
+ *   backoff        requeue it for the end of the batch, delay doubling per attempt
+ *   other-account  requeue it for another account (a runner with a single
+ *                  account treats this as backoff)
+ *   give-up        retrying cannot help (the prompt or image was rejected)
+ * Every scene gets at most maxRetries retries whatever its class.
+ */
+
+export const FAILURE_CLASSES = ['ui-drift', 'upload', 'rejected', 'throttled', 'timeout', 'download', 'disconnect', 'unknown'];
+
+export const DEFAULT_POLICIES = {
+    'ui-drift': { action: 'retry', delay: 0 },
+    upload: { action: 'backoff', delay: 15 },
+    rejected: { action: 'give-up', delay: 0 },
+    throttled: { action: 'other-account', delay: 120 },
+    timeout: { action: 'backoff', delay: 60 },
+    download: { action: 'retry', delay: 0 },
+    disconnect: { action: 'other-account', delay: 30 },
+    unknown: { action: 'backoff', delay: 30 }
+};
+
+// Failure kinds reported by grok-automation.js
+const KIND_CLASSES = {
+    moderated: 'rejected',
+    rejected: 'rejected',
+    quota: 'throttled',
+    'server-error': 'timeout',
+    'progress-lost': 'timeout',
+    timeout: 'timeout',
+    navigated: 'ui-drift',
+    'page-crashed': 'disconnect'
+};
+
+// Reason text, for failures without a kind; first match wins
+const REASON_CLASSES = [
+    { failureClass: 'disconnect', pattern: /ECONNREFUSED|ECONNRESET|Target (page, context or browser )?(has been )?closed|browser has been closed|has been disconnected|worker exited|WebSocket|connectOverCDP/i },
+    { failureClass: 'throttled', pattern: /rate.?limit|too many|quota|\b429\b/i },
+    { failureClass: 'rejected', pattern: /moderat|content polic|violat/i },
+    { failureClass: 'download', pattern: /download|Video file not found|Video not found/i },
+    { failureClass: 'upload', pattern: /filechooser|setFiles|Upload a file|upload/i },
+    { failureClass: 'ui-drift', pattern: /locator|waitFor|selector|not visible|strict mode|element is not|Timeout \d+ms exceeded/i },
+    { failureClass: 'timeout', pattern: /timed? ?out|timeout|did not appear/i }
+];
+
+/**
+ * Sort a failure into one of FAILURE_CLASSES
+ * @param {string} reason - Error message
+ * @param {string} kind - Failure kind from the job manifest, if any
+ * @returns {string} Failure class
+ */
+export function classifyFailure(reason, kind = null) {
+    if (kind && KIND_CLASSES[kind]) return KIND_CLASSES[kind];
+    const match = REASON_CLASSES.find(r => r.pattern.test(reason || ''));
+    return match ? match.failureClass : 'unknown';
+}
+
+export class RetryPolicy {
+    /**
+     * @param {Object} options - { maxRetries, policies } policies override DEFAULT_POLICIES per class
+     */
+    constructor({ maxRetries = 2, policies = {} } = {}) {
+        this.maxRetries = maxRetries;
+        this.policies = { ...DEFAULT_POLICIES, ...policies };
+    }
+
+    /**
+     * Decide about one failed attempt
+     * @param {string} reason - Error message
+     * @param {string} kind - Failure kind from the job manifest, if any
+     * @param {number} attempt - Attempts made so far, including this one
+     * @returns {Object} { failureClass, action, delay } delay in seconds before the retry
+     */
+    decide(reason, kind, attempt) {
+        const failureClass = classifyFailure(reason, kind);
+        const policy = this.policies[failureClass] || this.policies.unknown;
+        if (policy.action === 'give-up' || attempt > this.maxRetries) {
+            return { failureClass, action: 'give-up', delay: 0 };
+        }
+        return { failureClass, action: policy.action, delay: policy.delay * 2 ** (attempt - 1) };
+    }
+}
@@ -0,0 +1,144 @@
+import hashlib
+import re
+
+# Script grammar (shared with parse-script.js and src/main/services/ScriptParser.ts):
+#
+#   header   := "Scene" <spaces> NUMBER <spaces> tag* ":" rest      (case-insensitive)
+#   tag      := "(" text ")"; the scene is done when a tag reads "(done)",
+#               spaces inside the parentheses allowed
+#   block    := a header line and every line up to the next header
+#
+# Within a block the prompt is `rest` up to the first "|". If that is empty, the
+# first text before "|" on a later "|" line is used. Plain lines (not starting
+# with "=") are appended until "ENVIRONMENT" shows up. "FIELD: value" pairs
+# after a "|" fill the metadata fields (a value ends at the next "|" or the
+# next "FIELD:"), and a later line overrides an earlier one. Blocks that end up without a prompt are dropped, and lines before the
+# first header are ignored.
+SCENE_HEADER_RE = re.compile(r'^Scene\s+(\d+)\s*((?:\([^()]*\)\s*)*):', re.IGNORECASE)
+DONE_TAG_RE = re.compile(r'\(\s*done\s*\)', re.IGNORECASE)
+METADATA_FIELDS = ('ENVIRONMENT', 'LIGHTING', 'CAMERA', 'Voice', 'Sound', 'Music')
+METADATA_RE = re.compile(r'({0}):\s*((?:(?!\b(?:{0}):)[^|])+)'.format('|'.join(METADATA_FIELDS)), re.IGNORECASE)
+
+
+def match_header(line):
+    """Header match for a stripped line, else None (cheap prefix test first)"""
+    if line[:5].lower() != 'scene':
+        return None
+    return SCENE_HEADER_RE.match(line)
+
+
+def parse_metadata(scene, text):
+    seen = set()
+    for match in METADATA_RE.finditer(text):
+        field = match.group(1).lower()
+        if field not in seen:
+            seen.add(field)
+            scene[field] = match.group(2).strip()
+
+
+def parse_block(lines):
+    """Parse one scene block (stripped lines, header first); None when it has no prompt"""
+    header = match_header(lines[0])
+    scene = {
+        'sceneNumber': int(header.group(1)),
+        'isDone': bool(DONE_TAG_RE.search(header.group(2))),
+        'prompt': ''
+    }
+    for field in METADATA_FIELDS:
+        scene[field.lower()] = ''
+
+    parts = lines[0][header.end():].strip().split('|')
+    prompt = parts[0].strip()
+    if len(parts) > 1:
+        parse_metadata(scene, '|'.join(parts[1:]))
+
+    for line in lines[1:]:
+        if '|' in line:
+            parts = line.split('|')
+            if not prompt and parts[0].strip():
+                prompt = parts[0].strip()
+            parse_metadata(scene, '|'.join(parts[1:]))
+        elif line and not line.startswith('='):
+            if 'ENVIRONMENT' not in prompt and 'ENVIRONMENT' not in line:
+                prompt += ' ' + line
+
+    if not prompt:
+        return None
+    scene['prompt'] = prompt.strip()
+    return scene
+
+
+def split_blocks(text):
+    """Single pass over the text; returns a list of blocks (lists of stripped lines)"""
+    blocks = []
+    current = None
+    for raw in text.split('\n'):
+        line = raw.strip()
+        if match_header(line):
+            current = [line]
+            blocks.append(current)
+        elif current is not None:
+            current.append(line)
+    return blocks
+
+
+class ScriptParser:
+    """Parses one script file and keeps the result between calls
+
+    parse() returns the cached scenes while the file hash is unchanged. After
+    an edit only blocks whose text changed are parsed again, the rest come
+    from the block cache.
+    """
+
+    def __init__(self, script_path):
+        self.script_path = script_path
+        self.file_hash = None
+        self.scenes = []
+        self.blocks = {}  # block text -> parsed scene (or None)
+        self.reparsed = 0
+
+    def parse(self):
+        with open(self.script_path, 'rb') as f:
+            raw = f.read()
+
+        file_hash = hashlib.sha1(raw).hexdigest()
+        if file_hash == self.file_hash:
+            self.reparsed = 0
+            return self.scenes
+
+        blocks = {}
+        scenes = []
+        reparsed = 0
+        for block in split_blocks(raw.decode('utf-8-sig')):
+            key = '\n'.join(block)
+            if key in blocks:
+                scene = blocks[key]
+            elif key in self.blocks:
+                scene = self.blocks[key]
+            else:
+                scene = parse_block(block)
+                reparsed += 1
+            blocks[key] = scene
+            if scene:
+                scenes.append(dict(scene))
+
+        self.file_hash = file_hash
+        self.blocks = blocks
+        self.scenes = scenes
+        self.reparsed = reparsed
+        return scenes
+
+
+_parsers = {}
+
+
+def get_script_parser(script_path):
+    """Parser for a path, shared so its caches survive between callers"""
+    parser = _parsers.get(script_path)
+    if parser is None:
+        parser = _parsers[script_path] = ScriptParser(script_path)
+    return parser
+
+
+def parse_script_file(script_path):
+    return get_script_parser(script_path).parse()
@@ -4,6 +4,7 @@ import icon from '../../resources/icon.png?asset'
 
 import { AutomationService } from './services/AutomationService'
 import { parseScriptFile, updateScriptScene } from './services/ScriptParser'
+import { getImageIndex } from './services/ImageIndex'
 import path from 'path'
 import fs from 'fs'
 
@@ -137,19 +138,12 @@ app.whenReady().then(() => {
 
     // Map images to scenes
     try {
-      const imageFiles = fs.readdirSync(imagesPath);
-      scenes = scenes.map(scene => {
-        // Look for image matching scene number (e.g. "1.png", "Scene 1.png")
-        const match = imageFiles.find(f => {
-          const num = f.match(/\d+/);
-          return num && parseInt(num[0]) === scene.sceneNumber;
-        });
-
-        return {
-          ...scene,
-          imagePath: match ? path.join(imagesPath, match) : undefined
-        };
-      });
+      // Same rule as the batch runner (e.g. "Scene 1.png" beats "scene_1_old.png")
+      const index = getImageIndex(imagesPath);
+      scenes = scenes.map(scene => ({
+        ...scene,
+        imagePath: index.get(scene.sceneNumber)
+      }));
     } catch (e) {
       console.error('Error mapping images:', e);
     }
@@ -185,7 +179,7 @@ app.whenReady().then(() => {
 
   ipcMain.handle('automation:retry', async (_, scriptPath, imagesFolder, sceneNumbers) => {
     if (!automationService) throw new Error('Service not initialized');
-    // Force retry for specific scenes
+    // Force retry for specific scenes; while a batch runs they join it
     automationService.startBatch(scriptPath, imagesFolder, {
       specificScenes: sceneNumbers,
       force: true
@@ -195,6 +189,25 @@ app.whenReady().then(() => {
     return true;
   });
 
+  ipcMain.handle('automation:projects', async () => {
+    return automationService ? automationService.getProjects() : [];
+  });
+
+  ipcMain.handle('automation:cancelProject', async (_, projectId) => {
+    if (!automationService) throw new Error('Service not initialized');
+    return automationService.cancelProject(projectId);
+  });
+
+  ipcMain.handle('automation:moveProject', async (_, projectId, offset) => {
+    if (!automationService) throw new Error('Service not initialized');
+    return automationService.moveProject(projectId, offset);
+  });
+
+  ipcMain.handle('automation:setProjectPriority', async (_, projectId, priority) => {
+    if (!automationService) throw new Error('Service not initialized');
+    automationService.setProjectPriority(projectId, priority);
+  });
+
   ipcMain.handle('automation:stop', async () => {
     if (automationService) {
       automationService.stop();
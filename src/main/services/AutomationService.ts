@@ -3,6 +3,9 @@ import path from 'path';
 import { spawn, ChildProcess } from 'child_process';
 import { app } from 'electron';
 import { parseScriptFile, Scene } from './ScriptParser';
+import { getImageIndex } from './ImageIndex';
+import { ResultCache, resultKey } from './ResultCache';
+import { FairScheduler, ProjectPriority } from './ProjectScheduler';
 
 interface AutomationConfig {
     basePort: number;
@@ -13,6 +16,32 @@ interface AutomationConfig {
     resolution: string;
 }
 
+interface BatchOptions {
+    specificScenes?: number[];
+    force?: boolean;
+    priority?: ProjectPriority;
+}
+
+interface QueuedScene {
+    scene: Scene;
+    force: boolean;
+}
+
+// One script + project root in the batch; several share the workers by priority
+interface BatchProject {
+    id: number;
+    name: string;
+    scriptPath: string;
+    outputFolder: string;
+    priority: ProjectPriority;
+    state: 'running' | 'done' | 'cancelled';
+    imageMap: Record<number, string>;
+    active: Set<number>; // scene numbers waiting or generating
+    failedScenes: Set<number>;
+    running: number;
+    stats: { total: number; completed: number; failed: number; pending: number };
+}
+
 interface WorkerAccount {
     id: number;
     port: number;
@@ -26,6 +55,11 @@ export class AutomationService {
     private accounts: WorkerAccount[] = [];
     private chromeProcesses: ChildProcess[] = [];
     private isRunning: boolean = false;
+    private resultCache = new ResultCache({ onLog: message => this.log(message) });
+    private scheduler = new FairScheduler<QueuedScene>();
+    private projects = new Map<number, BatchProject>();
+    private nextProjectId = 1;
+    private inFlight = 0; // scenes generating across all projects
 
     // Callback for sending logs to UI
     private onLog: (msg: string) => void;
@@ -143,7 +177,14 @@ export class AutomationService {
         await new Promise(r => setTimeout(r, 4000));
     }
 
-    async startBatch(scriptPath: string, imagesFolder: string, options?: { specificScenes?: number[], force?: boolean }) {
+    async startBatch(scriptPath: string, imagesFolder: string, options?: BatchOptions) {
+        // A second start or a retry joins the running worker loop instead of
+        // spawning another one over the same accounts
+        if (this.isRunning) {
+            this.enqueueProject(scriptPath, imagesFolder, options);
+            return;
+        }
+
         // Ensure service is initialized and workers are running
         if (this.accounts.length === 0) {
             this.log('⚠️ Service not initialized, attempting to initialize...');
@@ -162,29 +203,74 @@ export class AutomationService {
         }
 
         this.isRunning = true;
+        this.resultCache = new ResultCache({ onLog: message => this.log(message) }); // Fresh hit/miss counters per batch
+        this.scheduler = new FairScheduler<QueuedScene>();
+        this.projects.clear();
+        this.inFlight = 0;
+        this.enqueueProject(scriptPath, imagesFolder, options);
+
+        const promises = this.accounts.map(acc => this.processWorker(acc));
+        await Promise.all(promises);
+
+        this.isRunning = false;
+        const { hits, misses, stored, evicted } = this.resultCache.stats;
+        this.log(`♻️ Result cache: ${hits} hits, ${misses} misses, ${stored} stored, ${evicted} evicted`);
+        this.log('🎉 Batch processing finished!');
+    }
+
+    // Queue a project's scenes on the scheduler. Scenes of a project that is
+    // already in the batch (same script and project root) join its lane.
+    enqueueProject(scriptPath: string, imagesFolder: string, options?: BatchOptions): BatchProject {
         const scenes = parseScriptFile(scriptPath);
 
         // Derive output folder from project root (parent of images folder)
         const projectRoot = path.dirname(imagesFolder);
-        this.config.outputFolder = projectRoot;
-        this.log(`📂 Project Root: ${projectRoot}`);
-        this.log(`📂 Output Video Folder: ${path.join(projectRoot, 'video')}`);
+        let project = [...this.projects.values()].find(p =>
+            p.scriptPath === scriptPath && p.outputFolder === projectRoot && p.state !== 'cancelled');
+        const isNew = !project;
+        if (!project) {
+            project = {
+                id: this.nextProjectId++,
+                name: path.basename(projectRoot),
+                scriptPath,
+                outputFolder: projectRoot,
+                priority: options?.priority || 'normal',
+                state: 'running',
+                imageMap: {},
+                active: new Set<number>(),
+                failedScenes: new Set<number>(),
+                running: 0,
+                stats: { total: scenes.length, completed: 0, failed: 0, pending: 0 }
+            };
+            this.projects.set(project.id, project);
+            this.log(`📂 Project Root: ${projectRoot}`);
+            this.log(`📂 Output Video Folder: ${path.join(projectRoot, 'video')}`);
+        } else if (options?.priority) {
+            project.priority = options.priority;
+        }
+        const current = project;
+        current.state = 'running';
 
         // SMART RESUME: Check for existing videos
         const videoFolder = path.join(projectRoot, 'video');
-        const totalScenes = scenes.length;
         let completedCount = 0;
+        let alreadyQueued = 0;
 
         // Clone scenes to avoid mutating cached ones if any
         const allScenes = scenes.map(s => ({ ...s }));
 
-        const queue: Scene[] = [];
+        const queue: QueuedScene[] = [];
 
         for (const scene of allScenes) {
             // Filter specific scenes if requested
             if (options?.specificScenes && !options.specificScenes.includes(scene.sceneNumber)) {
                 continue; // Skip scenes not in the list
             }
+            // Waiting or generating already
+            if (current.active.has(scene.sceneNumber)) {
+                alreadyQueued++;
+                continue;
+            }
 
             const videoName = `scene_${String(scene.sceneNumber).padStart(3, '0')}.mp4`;
             const videoPath = path.join(videoFolder, videoName);
@@ -192,6 +278,7 @@ export class AutomationService {
             // If forced, we ignore existing video (and maybe overwrite it later)
             // If NOT forced, we check existence
             if (!options?.force && fs.existsSync(videoPath)) {
+                if (!isNew) continue; // Counted when the project was queued
                 // Mark as done
                 scene.isDone = true;
                 scene.videoPath = videoPath;
@@ -202,6 +289,7 @@ export class AutomationService {
                 // We delay slightly to ensure stats are init
                 setTimeout(() => {
                     this.onProgress({
+                        projectId: current.id,
                         updatedScene: {
                             sceneNumber: scene.sceneNumber,
                             status: 'completed',
@@ -210,131 +298,239 @@ export class AutomationService {
                     });
                 }, 100);
             } else {
-                queue.push(scene);
+                queue.push({ scene, force: !!options?.force });
+                current.active.add(scene.sceneNumber);
+                // A retried scene is pending again
+                if (current.failedScenes.delete(scene.sceneNumber)) current.stats.failed--;
             }
         }
 
         this.log(`📊 Batch/Retry: Found ${completedCount} completed (skipped), ${queue.length} scenes to process.`);
+        if (alreadyQueued > 0) this.log(`📚 ${alreadyQueued} scenes are already queued or running`);
 
-        // Initialize stats
-        const stats = {
-            total: totalScenes,
-            completed: completedCount,
-            failed: 0,
-            pending: queue.length
-        };
-        this.onProgress(stats);
-
-        const processWorker = async (account: WorkerAccount) => {
-            while (queue.length > 0 && this.isRunning) {
-                const scene = queue.shift();
-                if (!scene) break;
-
-                this.log(`\n[Worker ${account.id}] Processing Scene ${scene.sceneNumber}...`);
-                this.onWorkerUpdate({ id: account.id, status: 'working', currentScene: scene.sceneNumber });
-
-                // Notify scene started
-                this.onProgress({
-                    ...stats,
-                    updatedScene: {
-                        sceneNumber: scene.sceneNumber,
-                        status: 'generating',
-                        workerId: account.id
-                    }
-                });
-                this.log(`🍪 [Worker ${account.id}] Using cookie file: ${path.basename(account.cookiePath)}`);
+        // Resolve every scene image with one folder read
+        try {
+            const { imageMap: matched, ambiguous } = getImageIndex(imagesFolder).match(queue.map(q => q.scene.sceneNumber));
+            Object.assign(current.imageMap, matched);
+            for (const a of ambiguous) {
+                this.log(`⚠️ Scene ${a.sceneNumber}: using ${a.chosen}, also found ${a.others.join(', ')}`);
+            }
+        } catch (e) {
+            this.log(`⚠️ Could not access images folder: ${e}`);
+        }
 
-                // Resolve image path
-                // Simple logic: Look for matching number in filename
-                let imagePath = '';
-                try {
-                    const files = fs.readdirSync(imagesFolder);
-                    const match = files.find(f => {
-                        const num = f.match(/\d+/);
-                        // Ensure we match "1.png", "scene_1.jpg" etc, but strictly link number to scene
-                        return num && parseInt(num[0]) === scene.sceneNumber;
-                    });
-                    if (match) imagePath = path.join(imagesFolder, match);
-                } catch (e) {
-                    this.log(`⚠️ Could not access images folder: ${e}`);
+        current.stats.completed += completedCount;
+        current.stats.pending += queue.length;
+        this.scheduler.add(current.id, queue, current.priority);
+        if (!isNew || this.projects.size > 1) {
+            this.log(`📚 Project ${current.name} (${current.priority}): ${queue.length} scenes added to the running batch`);
+        }
+        this.onProgress({ ...current.stats, projectId: current.id });
+        this.finishProjectIfDone(current); // Nothing left to generate in it
+        return current;
+    }
+
+    private async processWorker(account: WorkerAccount) {
+        while (this.isRunning) {
+            const picked = this.scheduler.next();
+            if (!picked) {
+                // Nothing waiting: keep the account while other scenes run,
+                // a retry or another project may still join
+                if (this.inFlight === 0) break;
+                await new Promise(r => setTimeout(r, 1000));
+                continue;
+            }
+
+            const project = this.projects.get(picked.projectId)!;
+            const { scene, force } = picked.item;
+            project.running++;
+            this.inFlight++;
+            try {
+                await this.processScene(account, project, scene, force);
+            } finally {
+                project.running--;
+                this.inFlight--;
+                project.active.delete(scene.sceneNumber);
+                this.finishProjectIfDone(project);
+            }
+        }
+        this.onWorkerUpdate({ id: account.id, status: 'offline', currentScene: null });
+    }
+
+    private async processScene(account: WorkerAccount, project: BatchProject, scene: Scene, force: boolean) {
+        const stats = project.stats;
+        const imagePath = project.imageMap[scene.sceneNumber] || '';
+
+        // Generated before from the same prompt, image and settings: copy it instead.
+        // A forced retry asks for a new video, so it skips the lookup.
+        const cacheKey = this.sceneCacheKey(scene, imagePath);
+        const cachedPath = path.join(project.outputFolder, 'video', `scene_${String(scene.sceneNumber).padStart(3, '0')}.mp4`);
+        if (cacheKey && !force && this.resultCache.materialize(cacheKey, cachedPath)) {
+            stats.completed++;
+            stats.pending--;
+            this.onProgress({
+                ...stats,
+                projectId: project.id,
+                updatedScene: {
+                    sceneNumber: scene.sceneNumber,
+                    status: 'completed',
+                    videoPath: cachedPath
                 }
+            });
+            this.log(`♻️ [Worker ${account.id}] Scene ${scene.sceneNumber} reused from cache`);
+            return;
+        }
 
-                let attempts = 0;
-                let success = false;
+        this.log(`\n[Worker ${account.id}] Processing Scene ${scene.sceneNumber}...`);
+        this.onWorkerUpdate({ id: account.id, status: 'working', currentScene: scene.sceneNumber });
+
+        // Notify scene started
+        this.onProgress({
+            ...stats,
+            projectId: project.id,
+            updatedScene: {
+                sceneNumber: scene.sceneNumber,
+                status: 'generating',
+                workerId: account.id
+            }
+        });
+        this.log(`🍪 [Worker ${account.id}] Using cookie file: ${path.basename(account.cookiePath)}`);
 
-                while (attempts <= this.config.maxRetries && !success && this.isRunning) {
-                    if (attempts > 0) this.log(`⚠️ [Worker ${account.id}] Retry ${attempts}...`);
+        let attempts = 0;
+        let success = false;
 
-                    try {
-                        const tempDownloadDir = await this.runAutomation(account, scene, imagePath);
-                        this.log(`   📂 runAutomation returned: ${tempDownloadDir}`);
-
-                        // Move from temp to project "video" folder
-                        this.log(`   🔄 Calling findAndMoveVideo...`);
-                        const videoPath = this.findAndMoveVideo(scene.sceneNumber, this.config.outputFolder, tempDownloadDir);
-                        this.log(`   📂 findAndMoveVideo returned: ${videoPath}`);
-
-                        // Cleanup
-                        try {
-                            if (fs.existsSync(tempDownloadDir)) {
-                                fs.rmSync(tempDownloadDir, { recursive: true, force: true });
-                            }
-                        } catch (e) { }
-
-                        if (videoPath) {
-                            stats.completed++;
-                            stats.pending--;
-                            this.onProgress({
-                                ...stats,
-                                updatedScene: {
-                                    sceneNumber: scene.sceneNumber,
-                                    status: 'completed',
-                                    videoPath: videoPath
-                                }
-                            });
-                            this.log(`✅ [Worker ${account.id}] Scene ${scene.sceneNumber} Complete`);
-                            this.log(`   Saved to: ${videoPath}`);
-                            this.onWorkerUpdate({ id: account.id, status: 'idle', currentScene: null }); // Idle after done
-                            success = true;
-                        } else {
-                            throw new Error('Video not found in temp folder');
+        while (attempts <= this.config.maxRetries && !success && this.isRunning) {
+            if (attempts > 0) this.log(`⚠️ [Worker ${account.id}] Retry ${attempts}...`);
+
+            try {
+                const tempDownloadDir = await this.runAutomation(account, scene, imagePath);
+                this.log(`   📂 runAutomation returned: ${tempDownloadDir}`);
+
+                // Move from temp to project "video" folder
+                this.log(`   🔄 Calling findAndMoveVideo...`);
+                const videoPath = this.findAndMoveVideo(scene.sceneNumber, project.outputFolder, tempDownloadDir);
+                this.log(`   📂 findAndMoveVideo returned: ${videoPath}`);
+
+                // Cleanup
+                try {
+                    if (fs.existsSync(tempDownloadDir)) {
+                        fs.rmSync(tempDownloadDir, { recursive: true, force: true });
+                    }
+                } catch (e) { }
+
+                if (videoPath) {
+                    if (cacheKey) this.resultCache.store(cacheKey, videoPath);
+                    stats.completed++;
+                    stats.pending--;
+                    this.onProgress({
+                        ...stats,
+                        projectId: project.id,
+                        updatedScene: {
+                            sceneNumber: scene.sceneNumber,
+                            status: 'completed',
+                            videoPath: videoPath
                         }
-                    } catch (error: any) {
-                        attempts++;
-                        // Enhanced Error Logging
-                        console.error(`[Worker ${account.id}] Error Details:`, error);
-                        this.log(`❌ [Worker ${account.id}] Scene ${scene.sceneNumber} Error: ${error.message}`);
-
-                        if (attempts > this.config.maxRetries) {
-                            this.log(`❌ [Worker ${account.id}] Scene ${scene.sceneNumber} FAILED after ${attempts} attempts.`);
-                            stats.failed++;
-                            stats.pending--;
-                            this.onProgress({
-                                ...stats,
-                                updatedScene: {
-                                    sceneNumber: scene.sceneNumber,
-                                    status: 'failed',
-                                    error: error.message
-                                }
-                            });
-                            this.onWorkerUpdate({ id: account.id, status: 'error', currentScene: scene.sceneNumber });
-                            this.onError(`Scene ${scene.sceneNumber} failed: ${error.message}`);
-                        } else {
-                            this.log(`⚠️ [Worker ${account.id}] Retrying (${attempts}/${this.config.maxRetries})...`);
-                            this.onWorkerUpdate({ id: account.id, status: 'retrying', currentScene: scene.sceneNumber });
-                            await new Promise(r => setTimeout(r, 5000));
+                    });
+                    this.log(`✅ [Worker ${account.id}] Scene ${scene.sceneNumber} Complete`);
+                    this.log(`   Saved to: ${videoPath}`);
+                    this.onWorkerUpdate({ id: account.id, status: 'idle', currentScene: null }); // Idle after done
+                    success = true;
+                } else {
+                    throw new Error('Video not found in temp folder');
+                }
+            } catch (error: any) {
+                attempts++;
+                // Enhanced Error Logging
+                console.error(`[Worker ${account.id}] Error Details:`, error);
+                this.log(`❌ [Worker ${account.id}] Scene ${scene.sceneNumber} Error: ${error.message}`);
+
+                if (attempts > this.config.maxRetries) {
+                    this.log(`❌ [Worker ${account.id}] Scene ${scene.sceneNumber} FAILED after ${attempts} attempts.`);
+                    stats.failed++;
+                    stats.pending--;
+                    project.failedScenes.add(scene.sceneNumber);
+                    this.onProgress({
+                        ...stats,
+                        projectId: project.id,
+                        updatedScene: {
+                            sceneNumber: scene.sceneNumber,
+                            status: 'failed',
+                            error: error.message
                         }
-                    }
+                    });
+                    this.onWorkerUpdate({ id: account.id, status: 'error', currentScene: scene.sceneNumber });
+                    this.onError(`Scene ${scene.sceneNumber} failed: ${error.message}`);
+                } else {
+                    this.log(`⚠️ [Worker ${account.id}] Retrying (${attempts}/${this.config.maxRetries})...`);
+                    this.onWorkerUpdate({ id: account.id, status: 'retrying', currentScene: scene.sceneNumber });
+                    await new Promise(r => setTimeout(r, 5000));
                 }
             }
-            this.onWorkerUpdate({ id: account.id, status: 'offline', currentScene: null });
-        };
+        }
+    }
 
-        const promises = this.accounts.map(acc => processWorker(acc));
-        await Promise.all(promises);
+    private finishProjectIfDone(project: BatchProject) {
+        if (project.state !== 'running' || project.running > 0 || this.scheduler.pending(project.id) > 0) return;
+        if (!this.isRunning) return; // Stopped: the rest runs next time
+        project.state = 'done';
+        this.log(`🏁 Project ${project.name}: ${project.stats.completed} completed, ${project.stats.failed} failed`);
+    }
 
-        this.isRunning = false;
-        this.log('🎉 Batch processing finished!');
+    // Projects of the current batch, in scheduling order
+    getProjects() {
+        const order = this.scheduler.projectIds();
+        const rank = (p: BatchProject) => order.includes(p.id) ? order.indexOf(p.id) : order.length + p.id;
+        return [...this.projects.values()]
+            .sort((a, b) => rank(a) - rank(b))
+            .map(p => ({
+                id: p.id,
+                name: p.name,
+                scriptPath: p.scriptPath,
+                priority: p.priority,
+                state: p.state,
+                waiting: this.scheduler.pending(p.id),
+                running: p.running,
+                ...p.stats
+            }));
+    }
+
+    // Drop a project's waiting scenes; the ones generating finish
+    cancelProject(projectId: number): number {
+        const project = this.projects.get(projectId);
+        if (!project || project.state !== 'running') return 0;
+        const dropped = this.scheduler.cancel(projectId);
+        project.state = 'cancelled';
+        project.active.clear();
+        project.stats.pending -= dropped;
+        this.log(`🚫 Project ${project.name}: cancelled, ${dropped} scenes dropped`);
+        this.onProgress({ ...project.stats, projectId: project.id });
+        return dropped;
+    }
+
+    // Earlier projects win ties for a free worker
+    moveProject(projectId: number, offset: number): boolean {
+        return this.scheduler.move(projectId, offset);
+    }
+
+    setProjectPriority(projectId: number, priority: ProjectPriority) {
+        const project = this.projects.get(projectId);
+        if (!project) return;
+        project.priority = priority;
+        this.scheduler.setPriority(projectId, priority);
+    }
+
+    // Result cache key of a scene, or null when its image cannot be read
+    sceneCacheKey(scene: Scene, imagePath: string): string | null {
+        try {
+            return resultKey({
+                prompt: scene.prompt,
+                imagePath,
+                duration: this.config.duration,
+                resolution: this.config.resolution
+            });
+        } catch (e) {
+            return null;
+        }
     }
 
     async runAutomation(account: WorkerAccount, scene: Scene, imagePath: string): Promise<string> {
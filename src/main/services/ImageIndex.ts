@@ -0,0 +1,114 @@
+import fs from 'fs';
+import path from 'path';
+
+// Port of image-index.js at the repo root; keep the matching rule in sync:
+//   "Scene 12.png" (rank 0) > "12.png" (rank 1) > "scene_12_final.png" (rank 2),
+//   then extension priority, then name. More than one candidate = ambiguous.
+
+export const IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.PNG', '.JPG', '.JPEG'];
+
+const CANONICAL_RE = /^scene\s*(\d+)$/i;
+const NUMBER_ONLY_RE = /^(\d+)$/;
+const FIRST_NUMBER_RE = /(\d+)/;
+
+interface Candidate {
+    name: string;
+    rank: number;
+    extRank: number;
+}
+
+export interface AmbiguousImage {
+    sceneNumber: number;
+    chosen: string;
+    others: string[];
+}
+
+export function parseImageName(fileName: string): { sceneNumber: number; rank: number; extRank: number } | null {
+    const ext = path.extname(fileName);
+    if (!/^\.(png|jpe?g)$/i.test(ext)) return null;
+
+    const stem = fileName.slice(0, -ext.length).trim();
+    const extIndex = IMAGE_EXTENSIONS.indexOf(ext);
+    const extRank = extIndex === -1 ? IMAGE_EXTENSIONS.length : extIndex;
+
+    let match = CANONICAL_RE.exec(stem);
+    if (match) return { sceneNumber: parseInt(match[1]), rank: 0, extRank };
+
+    match = NUMBER_ONLY_RE.exec(stem);
+    if (match) return { sceneNumber: parseInt(match[1]), rank: 1, extRank };
+
+    match = FIRST_NUMBER_RE.exec(stem);
+    if (match) return { sceneNumber: parseInt(match[1]), rank: 2, extRank };
+
+    return null;
+}
+
+function compareCandidates(a: Candidate, b: Candidate): number {
+    return a.rank - b.rank || a.extRank - b.extRank || (a.name < b.name ? -1 : a.name > b.name ? 1 : 0);
+}
+
+export class ImageIndex {
+    readonly folder: string;
+    readonly mtimeMs: number;
+    private candidates = new Map<number, Candidate[]>();
+
+    // One directory read for the whole folder
+    constructor(folder: string) {
+        this.folder = folder;
+        this.mtimeMs = fs.statSync(folder).mtimeMs;
+
+        for (const entry of fs.readdirSync(folder, { withFileTypes: true })) {
+            if (!entry.isFile()) continue;
+            const parsed = parseImageName(entry.name);
+            if (!parsed) continue;
+
+            const list = this.candidates.get(parsed.sceneNumber) || [];
+            list.push({ name: entry.name, rank: parsed.rank, extRank: parsed.extRank });
+            this.candidates.set(parsed.sceneNumber, list);
+        }
+
+        for (const list of this.candidates.values()) {
+            list.sort(compareCandidates);
+        }
+    }
+
+    get(sceneNumber: number): string | undefined {
+        const list = this.candidates.get(sceneNumber);
+        return list ? path.join(this.folder, list[0].name) : undefined;
+    }
+
+    match(sceneNumbers: number[]): { imageMap: Record<number, string>; missing: number[]; ambiguous: AmbiguousImage[] } {
+        const imageMap: Record<number, string> = {};
+        const missing: number[] = [];
+        const ambiguous: AmbiguousImage[] = [];
+
+        for (const sceneNumber of sceneNumbers) {
+            const list = this.candidates.get(sceneNumber);
+            if (!list) {
+                missing.push(sceneNumber);
+                continue;
+            }
+            imageMap[sceneNumber] = path.join(this.folder, list[0].name);
+            if (list.length > 1) {
+                ambiguous.push({ sceneNumber, chosen: list[0].name, others: list.slice(1).map(c => c.name) });
+            }
+        }
+
+        return { imageMap, missing, ambiguous };
+    }
+}
+
+const cache = new Map<string, ImageIndex>();
+
+// Cached per folder, rebuilt when the folder's mtime changes
+export function getImageIndex(folder: string): ImageIndex {
+    const key = path.resolve(folder);
+    const cached = cache.get(key);
+    if (cached && cached.mtimeMs === fs.statSync(key).mtimeMs) {
+        return cached;
+    }
+
+    const index = new ImageIndex(key);
+    cache.set(key, index);
+    return index;
+}
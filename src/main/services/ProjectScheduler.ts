@@ -0,0 +1,84 @@
+// Port of FairScheduler in project_queue.py at the repo root; keep the picking rule in sync:
+// smooth weighted round-robin over one lane per project, weights from the project's
+// priority, ties to the project added first. With weights 4 and 1 the picks go
+// A A B A A A A B ..., so a small urgent project is not stuck behind a long one.
+
+export type ProjectPriority = 'high' | 'normal' | 'low';
+
+export const PRIORITY_WEIGHTS: Record<ProjectPriority, number> = { high: 4, normal: 2, low: 1 };
+
+interface Lane<T> {
+    items: T[];
+    weight: number;
+    current: number;
+}
+
+export class FairScheduler<T> {
+    private lanes = new Map<number, Lane<T>>();
+    private order: number[] = [];
+
+    // Queue items for a project (appends when its lane exists)
+    add(projectId: number, items: T[], priority: ProjectPriority = 'normal') {
+        const weight = PRIORITY_WEIGHTS[priority];
+        const lane = this.lanes.get(projectId);
+        if (lane) {
+            lane.items.push(...items);
+            lane.weight = weight;
+            return;
+        }
+        this.lanes.set(projectId, { items: [...items], weight, current: 0 });
+        if (!this.order.includes(projectId)) this.order.push(projectId);
+    }
+
+    setPriority(projectId: number, priority: ProjectPriority) {
+        const lane = this.lanes.get(projectId);
+        if (lane) lane.weight = PRIORITY_WEIGHTS[priority];
+    }
+
+    // Move a project up (offset < 0) or down in the tie-break order
+    move(projectId: number, offset: number): boolean {
+        const index = this.order.indexOf(projectId);
+        if (index < 0) return false;
+        const target = Math.min(Math.max(index + offset, 0), this.order.length - 1);
+        if (target === index) return false;
+        this.order.splice(target, 0, ...this.order.splice(index, 1));
+        return true;
+    }
+
+    // Drop a project's waiting items; returns how many there were
+    cancel(projectId: number): number {
+        const lane = this.lanes.get(projectId);
+        this.lanes.delete(projectId);
+        this.order = this.order.filter(id => id !== projectId);
+        return lane ? lane.items.length : 0;
+    }
+
+    pending(projectId?: number): number {
+        if (projectId !== undefined) return this.lanes.get(projectId)?.items.length ?? 0;
+        let total = 0;
+        for (const lane of this.lanes.values()) total += lane.items.length;
+        return total;
+    }
+
+    projectIds(): number[] {
+        return [...this.order];
+    }
+
+    // Next item to run, or null when every lane is empty
+    next(): { projectId: number; item: T } | null {
+        const active = this.order.filter(id => this.lanes.get(id)!.items.length > 0);
+        if (active.length === 0) return null;
+
+        let total = 0;
+        let chosen = -1;
+        for (const id of active) {
+            const lane = this.lanes.get(id)!;
+            lane.current += lane.weight;
+            total += lane.weight;
+            if (chosen < 0 || lane.current > this.lanes.get(chosen)!.current) chosen = id;
+        }
+        const lane = this.lanes.get(chosen)!;
+        lane.current -= total;
+        return { projectId: chosen, item: lane.items.shift()! };
+    }
+}
@@ -0,0 +1,111 @@
+import crypto from 'crypto';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+
+// Port of result-cache.js at the repo root; keep the key and layout in sync:
+//   <root>/<key>.mp4, key = sha256(JSON [KEY_VERSION, prompt, sha256(image), duration, resolution]),
+//   file mtime = LRU clock. Root: GROK_RESULT_CACHE or ~/.grok-video-cache.
+
+export const KEY_VERSION = 1;
+
+const DEFAULT_MAX_MB = 20 * 1024;
+
+const imageHashes = new Map<string, { size: number; mtimeMs: number; hash: string }>();
+
+export interface ResultCacheStats {
+    hits: number;
+    misses: number;
+    stored: number;
+    evicted: number;
+}
+
+export function hashFile(filePath: string): string {
+    const stat = fs.statSync(filePath);
+    const known = imageHashes.get(filePath);
+    if (known && known.size === stat.size && known.mtimeMs === stat.mtimeMs) return known.hash;
+
+    const hash = crypto.createHash('sha256').update(fs.readFileSync(filePath)).digest('hex');
+    imageHashes.set(filePath, { size: stat.size, mtimeMs: stat.mtimeMs, hash });
+    return hash;
+}
+
+export function resultKey(inputs: { prompt: string; imagePath: string; duration: string; resolution: string }): string {
+    const imageHash = inputs.imagePath ? hashFile(inputs.imagePath) : '';
+    const material = JSON.stringify([KEY_VERSION, (inputs.prompt || '').trim(), imageHash, inputs.duration, inputs.resolution]);
+    return crypto.createHash('sha256').update(material).digest('hex');
+}
+
+// Copy (a copy-on-write clone where supported), never a hard link: editing
+// a delivered video must not change the cache entry it came from
+function copyFile(src: string, dest: string) {
+    fs.mkdirSync(path.dirname(dest), { recursive: true });
+    fs.copyFileSync(src, dest, fs.constants.COPYFILE_FICLONE);
+}
+
+export class ResultCache {
+    readonly root: string;
+    readonly maxBytes: number;
+    readonly stats: ResultCacheStats = { hits: 0, misses: 0, stored: 0, evicted: 0 };
+    private onLog: (message: string) => void;
+
+    // onLog reports store failures (default: stderr)
+    constructor(options: { root?: string; maxBytes?: number; onLog?: (message: string) => void } = {}) {
+        this.root = options.root || process.env.GROK_RESULT_CACHE || path.join(os.homedir(), '.grok-video-cache');
+        this.maxBytes = options.maxBytes || (parseFloat(process.env.GROK_RESULT_CACHE_MB || '') || DEFAULT_MAX_MB) * 1024 * 1024;
+        this.onLog = options.onLog || (message => console.error(message));
+    }
+
+    entryPath(key: string): string {
+        return path.join(this.root, `${key}.mp4`);
+    }
+
+    // Copy the cached video for key to dest; false on a miss
+    materialize(key: string, dest: string): boolean {
+        const entry = this.entryPath(key);
+        try {
+            const now = new Date();
+            fs.utimesSync(entry, now, now);
+            copyFile(entry, dest);
+        } catch (e) {
+            this.stats.misses++;
+            return false;
+        }
+        this.stats.hits++;
+        return true;
+    }
+
+    // Add a finished video under key (the video stays where it is)
+    store(key: string, videoPath: string) {
+        try {
+            const tempPath = `${this.entryPath(key)}.${process.pid}.tmp`;
+            copyFile(videoPath, tempPath);
+            const now = new Date();
+            fs.utimesSync(tempPath, now, now);
+            fs.renameSync(tempPath, this.entryPath(key));
+            this.stats.stored++;
+            this.evict();
+        } catch (e) {
+            this.onLog(`⚠️ Could not cache ${videoPath}: ${e}`);
+        }
+    }
+
+    // Remove least recently used entries until the cache fits in maxBytes
+    evict() {
+        const entries = fs.readdirSync(this.root)
+            .filter(name => name.endsWith('.mp4'))
+            .map(name => {
+                const stat = fs.statSync(path.join(this.root, name));
+                return { name, size: stat.size, mtimeMs: stat.mtimeMs };
+            })
+            .sort((a, b) => a.mtimeMs - b.mtimeMs);
+
+        let total = entries.reduce((sum, e) => sum + e.size, 0);
+        for (const entry of entries) {
+            if (total <= this.maxBytes) break;
+            fs.rmSync(path.join(this.root, entry.name), { force: true });
+            total -= entry.size;
+            this.stats.evicted++;
+        }
+    }
+}
@@ -17,6 +17,13 @@ export interface Scene {
     workerId?: number;
 }
 
+// Same header grammar as parse-script.js / script_parser.py: "Scene <number> [(tag)...]:"
+// and a scene is done when one of its tags reads "(done)" (spaces inside allowed)
+const SCENE_HEADER_RE = /^Scene\s+(\d+)\s*((?:\([^()]*\)\s*)*):/i;
+const DONE_TAG_RE = /\(\s*done\s*\)/i;
+// A value runs to the next "|" or the next "FIELD:", whichever comes first
+const METADATA_RE = /(ENVIRONMENT|LIGHTING|CAMERA|Voice|Sound|Music):\s*((?:(?!\b(?:ENVIRONMENT|LIGHTING|CAMERA|Voice|Sound|Music):)[^|])+)/gi;
+
 export function parseScriptFile(scriptPath: string): Scene[] {
     console.log(`📖 Parsing script: ${scriptPath}`);
 
@@ -35,22 +42,21 @@ export function parseScriptFile(scriptPath: string): Scene[] {
     let currentPrompt = '';
 
     const parseMetadata = (scene: Scene, metadataText: string) => {
-        const fields = ['ENVIRONMENT', 'LIGHTING', 'CAMERA', 'Voice', 'Sound', 'Music'];
-        fields.forEach(field => {
-            const regex = new RegExp(`${field}:\\s*([^|]+)`, 'i');
-            const match = metadataText.match(regex);
-            if (match) {
-                (scene as any)[field.toLowerCase()] = match[1].trim();
+        const seen = new Set<string>();
+        for (const match of metadataText.matchAll(METADATA_RE)) {
+            const field = match[1].toLowerCase();
+            if (!seen.has(field)) {
+                seen.add(field);
+                (scene as any)[field] = match[2].trim();
             }
-        });
+        }
     };
 
     for (let i = 0; i < lines.length; i++) {
         const line = lines[i].trim();
 
-        // Detect scene header: "Scene 1:" or "Scene 16 ( done):"
-        // Relaxed regex matches "Scene 1:" or "Scene 1 (done) :"
-        const sceneMatch = line.match(/^Scene\s+(\d+)[^:]*:/i);
+        // Detect scene header: "Scene 1:", "Scene 16 ( done):", "Scene 1 (done) :"
+        const sceneMatch = line.match(SCENE_HEADER_RE);
 
         if (sceneMatch) {
             // Save previous scene
@@ -61,7 +67,7 @@ export function parseScriptFile(scriptPath: string): Scene[] {
 
             // Start new scene
             const sceneNumber = parseInt(sceneMatch[1]);
-            const isDone = line.toLowerCase().includes('(done)');
+            const isDone = DONE_TAG_RE.test(sceneMatch[2]);
 
             currentScene = {
                 sceneNumber,
@@ -71,8 +77,7 @@ export function parseScriptFile(scriptPath: string): Scene[] {
             currentPrompt = '';
 
             // Extract prompt from same line
-            const promptStart = line.indexOf(':') + 1;
-            const promptLine = line.substring(promptStart).trim();
+            const promptLine = line.substring(sceneMatch[0].length).trim();
 
             if (promptLine) {
                 // Use FULL content as prompt
@@ -121,8 +126,8 @@ export function updateScriptScene(scriptPath: string, sceneNumber: number, newPr
         // Find start and end of the scene block
         for (let i = 0; i < lines.length; i++) {
             const line = lines[i].trim();
-            // Relaxed regex: Matches "Scene 1:" or "Scene 1 (done) :" or "Scene 1   :"
-            const sceneMatch = line.match(/^Scene\s+(\d+)[^:]*:/i);
+            // Matches "Scene 1:" or "Scene 1 (done) :" or "Scene 1   :"
+            const sceneMatch = line.match(SCENE_HEADER_RE);
 
             if (sceneMatch) {
                 const num = parseInt(sceneMatch[1]);
@@ -10,6 +10,10 @@ const api = {
     updatePrompt: (scriptPath: string, sceneNumber: number, newPrompt: string) => ipcRenderer.invoke('automation:updatePrompt', scriptPath, sceneNumber, newPrompt),
     retry: (scriptPath: string, imagesFolder: string, sceneNumbers: number[]) => ipcRenderer.invoke('automation:retry', scriptPath, imagesFolder, sceneNumbers),
     stop: () => ipcRenderer.invoke('automation:stop'),
+    projects: () => ipcRenderer.invoke('automation:projects'),
+    cancelProject: (projectId: number) => ipcRenderer.invoke('automation:cancelProject', projectId),
+    moveProject: (projectId: number, offset: number) => ipcRenderer.invoke('automation:moveProject', projectId, offset),
+    setProjectPriority: (projectId: number, priority: 'high' | 'normal' | 'low') => ipcRenderer.invoke('automation:setProjectPriority', projectId, priority),
     onLog: (callback: (msg: string) => void) => ipcRenderer.on('automation:log', (_, msg) => callback(msg)),
     onProgress: (callback: (data: any) => void) => ipcRenderer.on('automation:progress', (_, data) => callback(data)),
     onWorkerUpdate: (callback: (data: any) => void) => ipcRenderer.on('automation:worker-update', (_, data) => callback(data)),
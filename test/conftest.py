@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The Python modules live at the repo root next to the scripts that use them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,157 @@
+import { test } from 'node:test';
+import assert from 'node:assert/strict';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import http from 'http';
+import { downloadFile } from '../download.js';
+
+const BODY = Buffer.from('0123456789abcdef'.repeat(4096)); // 64 KB
+
+// Local server; handler(req, res) answers each request, every request is recorded
+async function serve(handler) {
+    const requests = [];
+    const server = http.createServer((req, res) => {
+        requests.push({ url: req.url, headers: req.headers });
+        handler(req, res, requests.length);
+    });
+    await new Promise(resolve => server.listen(0, '127.0.0.1', resolve));
+    const origin = `http://127.0.0.1:${server.address().port}`;
+    return { origin, requests, close: () => new Promise(resolve => server.close(resolve)) };
+}
+
+// Send the first `cut` bytes of the body, then drop the connection
+function sendAndDrop(res, headers, body, cut) {
+    res.writeHead(headers.status, headers.fields);
+    res.write(body.subarray(0, cut), () => setTimeout(() => res.socket.destroy(), 20));
+}
+
+function tempFile() {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'download-test-'));
+    return path.join(dir, 'video.mp4');
+}
+
+const quiet = { retryDelayMs: 10, timeoutMs: 5000 };
+
+test('resumes with a Range request after the connection drops', async (t) => {
+    t.mock.method(console, 'log', () => { });
+    const server = await serve((req, res, count) => {
+        const range = /^bytes=(\d+)-$/.exec(req.headers.range || '');
+        if (!range) {
+            return sendAndDrop(res, { status: 200, fields: { 'Content-Length': BODY.length } }, BODY, 20000);
+        }
+        const start = parseInt(range[1]);
+        const rest = BODY.subarray(start);
+        const fields = { 'Content-Length': rest.length, 'Content-Range': `bytes ${start}-${BODY.length - 1}/${BODY.length}` };
+        // Drop once more on the first resume, finish on the second
+        if (count === 2) return sendAndDrop(res, { status: 206, fields }, rest, 10000);
+        res.writeHead(206, fields);
+        res.end(rest);
+    });
+    const filePath = tempFile();
+
+    const size = await downloadFile(`${server.origin}/video.mp4`, filePath, quiet);
+    await server.close();
+
+    assert.equal(size, BODY.length);
+    assert.ok(fs.readFileSync(filePath).equals(BODY));
+    assert.ok(!fs.existsSync(`${filePath}.part`));
+    assert.deepEqual(server.requests.map(r => r.headers.range), [undefined, 'bytes=20000-', 'bytes=30000-']);
+});
+
+test('starts over when the server ignores Range', async (t) => {
+    t.mock.method(console, 'log', () => { });
+    const server = await serve((req, res, count) => {
+        const fields = { 'Content-Length': BODY.length };
+        if (count === 1) return sendAndDrop(res, { status: 200, fields }, BODY, 20000);
+        res.writeHead(200, fields);
+        res.end(BODY);
+    });
+    const filePath = tempFile();
+
+    const size = await downloadFile(`${server.origin}/video.mp4`, filePath, quiet);
+    await server.close();
+
+    assert.equal(size, BODY.length);
+    assert.ok(fs.readFileSync(filePath).equals(BODY));
+    assert.equal(server.requests[1].headers.range, 'bytes=20000-');
+});
+
+test('does not keep a partial file when every attempt fails', async (t) => {
+    t.mock.method(console, 'log', () => { });
+    const server = await serve((req, res) => {
+        sendAndDrop(res, { status: 200, fields: { 'Content-Length': BODY.length } }, BODY, 1000);
+    });
+    const filePath = tempFile();
+
+    await assert.rejects(downloadFile(`${server.origin}/video.mp4`, filePath, { ...quiet, maxAttempts: 2 }));
+    await server.close();
+
+    assert.ok(!fs.existsSync(filePath));
+    assert.ok(!fs.existsSync(`${filePath}.part`));
+});
+
+test('finishes a complete partial file left by a crashed run', async (t) => {
+    t.mock.method(console, 'log', () => { });
+    const server = await serve((req, res) => {
+        res.writeHead(416, { 'Content-Range': `bytes */${BODY.length}` });
+        res.end();
+    });
+    const filePath = tempFile();
+    fs.writeFileSync(`${filePath}.part`, BODY);
+
+    const size = await downloadFile(`${server.origin}/video.mp4`, filePath, quiet);
+    await server.close();
+
+    assert.equal(size, BODY.length);
+    assert.ok(fs.readFileSync(filePath).equals(BODY));
+    assert.equal(server.requests.length, 1);
+    assert.equal(server.requests[0].headers.range, `bytes=${BODY.length}-`);
+});
+
+test('starts over when a partial file does not fit the video', async (t) => {
+    t.mock.method(console, 'log', () => { });
+    const server = await serve((req, res) => {
+        if (req.headers.range) {
+            res.writeHead(416); // No Content-Range: the size stays unknown
+            return res.end();
+        }
+        res.writeHead(200, { 'Content-Length': BODY.length });
+        res.end(BODY);
+    });
+    const filePath = tempFile();
+    fs.writeFileSync(`${filePath}.part`, Buffer.alloc(BODY.length + 10));
+
+    const size = await downloadFile(`${server.origin}/video.mp4`, filePath, { ...quiet, maxAttempts: 2 });
+    await server.close();
+
+    assert.equal(size, BODY.length);
+    assert.ok(fs.readFileSync(filePath).equals(BODY));
+    assert.deepEqual(server.requests.map(r => r.headers.range), [`bytes=${BODY.length + 10}-`, undefined]);
+});
+
+test('keeps credentials on same-origin redirects only', async () => {
+    const cdn = await serve((req, res) => {
+        res.writeHead(200, { 'Content-Length': BODY.length });
+        res.end(BODY);
+    });
+    const site = await serve((req, res) => {
+        const location = req.url === '/video.mp4' ? '/moved.mp4' : `${cdn.origin}/video.mp4`;
+        res.writeHead(302, { Location: location });
+        res.end();
+    });
+    const headers = { Cookie: 'session=secret', authorization: 'Bearer secret', 'User-Agent': 'test-agent' };
+
+    await downloadFile(`${site.origin}/video.mp4`, tempFile(), { ...quiet, headers });
+    await Promise.all([site.close(), cdn.close()]);
+
+    assert.deepEqual(site.requests.map(r => r.url), ['/video.mp4', '/moved.mp4']);
+    for (const request of site.requests) {
+        assert.equal(request.headers.cookie, 'session=secret');
+        assert.equal(request.headers.authorization, 'Bearer secret');
+    }
+    assert.equal(cdn.requests.length, 1);
+    assert.equal(cdn.requests[0].headers.cookie, undefined);
+    assert.equal(cdn.requests[0].headers.authorization, undefined);
+    assert.equal(cdn.requests[0].headers['user-agent'], 'test-agent');
+});
@@ -0,0 +1,50 @@
+import { test } from 'node:test';
+import assert from 'node:assert/strict';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { CONFIG, createJob, runJob } from '../grok-automation.js';
+import { MockPage } from './mock-page.js';
+
+const OLD_POST = 'https://grok.com/imagine/post/abc';
+const NEW_POST = 'https://grok.com/imagine/post/def';
+const NEW_VIDEO = 'https://assets.grok.com/def.mp4';
+
+test('a resume without a video falls back to a fresh generation with a clean watcher', async () => {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'grok-resume-'));
+    const checkpointPath = path.join(dir, 'scene_001.json');
+    fs.writeFileSync(checkpointPath, JSON.stringify({
+        postUrl: OLD_POST,
+        submittedAt: new Date().toISOString(),
+        knownSrcs: [],
+        prompt: 'a cat',
+        imagePath: null
+    }));
+
+    // Reopened post shows nothing for the (shortened) resume wait
+    CONFIG.resume.minWaitMs = 50;
+    CONFIG.polling.timeoutMs = 0;
+
+    const page = new MockPage('https://grok.com/imagine');
+    const job = createJob({ sceneNumber: 1, prompt: 'a cat', checkpointPath, downloadDir: path.join(dir, 'job') });
+
+    const result = await runJob(page, job, async (page, job, videoWatcher) => {
+        assert.equal(job.resetToBase, true);
+        assert.equal(page.url(), OLD_POST);
+        // Only the new watcher listens; the resume's one was disposed
+        assert.equal(page.listenerCount('framenavigated'), 1);
+
+        // What generateVideo does: back to /imagine, upload onto a new post, arm, submit
+        page.navigate('https://grok.com/imagine');
+        page.navigate(NEW_POST);
+        await videoWatcher.arm();
+        setTimeout(() => page.dom.videos.push(NEW_VIDEO), 20);
+        const found = await videoWatcher.wait({ timeoutMs: 5000, intervalMs: 1000 });
+        return found.url;
+    });
+
+    assert.equal(result, NEW_VIDEO);
+    assert.equal(fs.existsSync(checkpointPath), false);
+    assert.equal(page.listenerCount('framenavigated'), 0);
+    fs.rmSync(dir, { recursive: true, force: true });
+});
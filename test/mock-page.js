@@ -0,0 +1,66 @@
+import { EventEmitter } from 'events';
+import { PROGRESS_SELECTOR, TOAST_SELECTOR } from '../video-watcher.js';
+
+// Stand-in for a Playwright page: page.evaluate() runs the function against a
+// fake document built from `dom`, events are emitted by hand.
+export class MockPage extends EventEmitter {
+    constructor(url) {
+        super();
+        this.currentUrl = url;
+        this.closed = false;
+        this.frame = { url: () => this.currentUrl };
+        this.dom = { videos: [], toasts: [], progress: [] };
+    }
+
+    url() {
+        return this.currentUrl;
+    }
+
+    mainFrame() {
+        return this.frame;
+    }
+
+    isClosed() {
+        return this.closed;
+    }
+
+    navigate(url) {
+        this.currentUrl = url;
+        this.emit('framenavigated', this.frame);
+    }
+
+    async goto(url) {
+        this.navigate(url);
+    }
+
+    async screenshot() { }
+
+    async evaluate(fn, arg) {
+        const dom = this.dom;
+        const saved = globalThis.document;
+        globalThis.document = {
+            querySelectorAll(selector) {
+                if (selector === 'video') return dom.videos.map(src => ({ src, currentSrc: src }));
+                if (selector === TOAST_SELECTOR) return dom.toasts.map(text => ({ innerText: text }));
+                if (selector === PROGRESS_SELECTOR) return dom.progress;
+                throw new Error(`unexpected selector ${selector}`);
+            }
+        };
+        try {
+            return fn(arg);
+        } finally {
+            globalThis.document = saved;
+        }
+    }
+
+    respond(url, status, { method = 'POST', resourceType = 'fetch', contentType = 'application/json' } = {}) {
+        const request = { method: () => method, resourceType: () => resourceType };
+        this.emit('request', request);
+        this.emit('response', {
+            url: () => url,
+            status: () => status,
+            headers: () => ({ 'content-type': contentType }),
+            request: () => request
+        });
+    }
+}
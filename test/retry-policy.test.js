@@ -0,0 +1,63 @@
+import { test } from 'node:test';
+import assert from 'node:assert/strict';
+import { classifyFailure, RetryPolicy, FAILURE_CLASSES, DEFAULT_POLICIES } from '../retry-policy.js';
+
+test('every class has a default policy', () => {
+    for (const failureClass of FAILURE_CLASSES) {
+        assert.ok(DEFAULT_POLICIES[failureClass], failureClass);
+    }
+});
+
+test('classifies by the manifest kind first', () => {
+    assert.equal(classifyFailure('Video file not found after generation', 'moderated'), 'rejected');
+    assert.equal(classifyFailure('anything', 'quota'), 'throttled');
+    assert.equal(classifyFailure('anything', 'server-error'), 'timeout');
+    assert.equal(classifyFailure('anything', 'progress-lost'), 'timeout');
+    assert.equal(classifyFailure('anything', 'navigated'), 'ui-drift');
+    assert.equal(classifyFailure('anything', 'page-crashed'), 'disconnect');
+});
+
+test('falls back to the reason text for unknown or missing kinds', () => {
+    assert.equal(classifyFailure('browserType.connectOverCDP: connect ECONNREFUSED 127.0.0.1:9222'), 'disconnect');
+    assert.equal(classifyFailure('Target page, context or browser has been closed'), 'disconnect');
+    assert.equal(classifyFailure('Automation worker exited (code 1)'), 'disconnect');
+    assert.equal(classifyFailure('HTTP 429 Too Many Requests'), 'throttled');
+    assert.equal(classifyFailure('Blocked by content policy'), 'rejected');
+    assert.equal(classifyFailure('Video file not found after generation'), 'download');
+    assert.equal(classifyFailure('page.waitForEvent: filechooser'), 'upload');
+    assert.equal(classifyFailure('locator.click: Timeout 30000ms exceeded'), 'ui-drift');
+    assert.equal(classifyFailure('Video did not appear'), 'timeout');
+    assert.equal(classifyFailure('something odd', 'no-such-kind'), 'unknown');
+    assert.equal(classifyFailure(undefined), 'unknown');
+});
+
+test('the first matching reason wins', () => {
+    // Both a disconnect and a download match; disconnect is listed first
+    assert.equal(classifyFailure('download aborted: WebSocket closed'), 'disconnect');
+});
+
+test('doubles the delay per attempt', () => {
+    const policy = new RetryPolicy({ maxRetries: 3 });
+    assert.deepEqual(policy.decide('Video did not appear', null, 1), { failureClass: 'timeout', action: 'backoff', delay: 60 });
+    assert.deepEqual(policy.decide('Video did not appear', null, 2), { failureClass: 'timeout', action: 'backoff', delay: 120 });
+    assert.deepEqual(policy.decide('Video did not appear', null, 3), { failureClass: 'timeout', action: 'backoff', delay: 240 });
+});
+
+test('gives up after maxRetries', () => {
+    const policy = new RetryPolicy({ maxRetries: 2 });
+    assert.equal(policy.decide('locator.click: Timeout 30000ms exceeded', null, 2).action, 'retry');
+    assert.deepEqual(policy.decide('locator.click: Timeout 30000ms exceeded', null, 3),
+        { failureClass: 'ui-drift', action: 'give-up', delay: 0 });
+    assert.equal(new RetryPolicy({ maxRetries: 0 }).decide('anything', 'quota', 1).action, 'give-up');
+});
+
+test('never retries rejected content', () => {
+    const policy = new RetryPolicy({ maxRetries: 5 });
+    assert.deepEqual(policy.decide('Blocked', 'moderated', 1), { failureClass: 'rejected', action: 'give-up', delay: 0 });
+});
+
+test('policies can be overridden per class', () => {
+    const policy = new RetryPolicy({ policies: { throttled: { action: 'backoff', delay: 10 } } });
+    assert.deepEqual(policy.decide('quota', 'quota', 2), { failureClass: 'throttled', action: 'backoff', delay: 20 });
+    assert.equal(policy.decide('Video did not appear', null, 1).delay, 60);
+});
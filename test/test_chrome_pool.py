@@ -0,0 +1,37 @@
+from batch_engine import DISCONNECT_RE
+from chrome_pool import ChromePool
+
+
+def make_pool(tmp_path, logs):
+    pool = ChromePool(9, 1, str(tmp_path), on_log=logs.append)
+    pool.launch = lambda instance: logs.append('launch') or True
+    return pool
+
+
+def test_restart_relaunches_own_browser(tmp_path):
+    logs = []
+    pool = make_pool(tmp_path, logs)
+    instance = pool.instances[0]
+    pool.restart(instance, "Chrome exited (code 1)")
+    assert logs[-1] == 'launch'
+    assert instance.restarts == 1
+
+
+def test_adopted_browser_is_not_relaunched(tmp_path):
+    logs = []
+    pool = make_pool(tmp_path, logs)
+    instance = pool.instances[0]
+    instance.adopted = True
+    pool.restart(instance, "Chrome stopped answering on its DevTools port")
+    assert 'launch' not in logs
+    assert instance.state == 'failed'
+
+
+def test_only_disconnects_count_against_the_browser():
+    assert DISCONNECT_RE.search('browserType.connectOverCDP: connect ECONNREFUSED 127.0.0.1:9222')
+    assert DISCONNECT_RE.search('Target page, context or browser has been closed')
+    assert DISCONNECT_RE.search('Automation worker exited')
+    assert DISCONNECT_RE.search('Generation failed (page-crashed): the tab crashed or was closed')
+    assert not DISCONNECT_RE.search('Video did not appear within 600s')
+    assert not DISCONNECT_RE.search('Blocked by content moderation')
+    assert not DISCONNECT_RE.search('locator.click: Timeout 30000ms exceeded')
@@ -0,0 +1,111 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from chrome_probe import probe_browser, wait_for_chrome
+
+
+class StubChrome(BaseHTTPRequestHandler):
+    """DevTools HTTP endpoints of a browser with the pages in server.pages"""
+
+    def do_GET(self):
+        if self.path == '/json/version' and self.server.accepting:
+            self.reply({'Browser': 'Chrome/130', 'webSocketDebuggerUrl': 'ws://127.0.0.1/devtools/browser/1'})
+        elif self.path == '/json/version':
+            self.reply({'Browser': 'Chrome/130'})  # Port open, CDP not yet accepted
+        elif self.path == '/json/list':
+            self.reply([{'type': 'page', 'url': url} for url in self.server.pages])
+        else:
+            self.send_error(404)
+
+    def do_PUT(self):
+        if self.path.startswith('/json/new?'):
+            self.server.opened.append(self.path[len('/json/new?'):])
+            if self.server.open_pages:
+                self.server.pages.append(self.path[len('/json/new?'):])
+            self.reply({'type': 'page'})
+        else:
+            self.send_error(404)
+
+    def reply(self, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def chrome():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubChrome)
+    server.accepting = True
+    server.pages = []
+    server.opened = []
+    server.open_pages = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def test_probe_needs_a_debugger_url(chrome):
+    port = chrome.server_address[1]
+    assert probe_browser(port)['Browser'] == 'Chrome/130'
+    chrome.accepting = False
+    assert probe_browser(port) is None
+    assert probe_browser(free_port()) is None
+
+
+def test_ready_once_the_page_is_open(chrome):
+    statuses = []
+    result = wait_for_chrome(chrome.server_address[1], threading.Event(), on_status=statuses.append,
+                             timeout=5, page_url='https://grok.com/imagine')
+    assert result == 'ready'
+    assert chrome.opened == ['https://grok.com/imagine']
+    assert statuses == ["Chrome is up, waiting for grok.com/imagine... (check 1)"]
+
+
+def test_ready_when_the_browser_comes_up_late(chrome):
+    chrome.accepting = False
+    chrome.pages.append('https://grok.com/imagine/post/1')
+    threading.Timer(0.5, setattr, (chrome, 'accepting', True)).start()
+    result = wait_for_chrome(chrome.server_address[1], threading.Event(), timeout=5)
+    assert result == 'ready'
+    assert chrome.opened == []
+
+
+def test_cancelled(chrome):
+    chrome.accepting = False
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+    started = time.monotonic()
+    assert wait_for_chrome(chrome.server_address[1], cancel, timeout=30) == 'cancelled'
+    assert time.monotonic() - started < 5
+
+
+def test_timeout_without_the_page(chrome):
+    chrome.open_pages = False
+    started = time.monotonic()
+    result = wait_for_chrome(chrome.server_address[1], threading.Event(), timeout=1)
+    assert result == 'timeout'
+    assert time.monotonic() - started < 3
+    assert len(chrome.opened) == 1  # The page is requested once, not on every check
+
+
+def test_timeout_without_chrome():
+    assert wait_for_chrome(free_port(), threading.Event(), timeout=0.5) == 'timeout'
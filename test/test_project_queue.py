@@ -0,0 +1,32 @@
+from project_queue import FairScheduler, ProjectQueue
+
+
+def test_queue_survives_a_restart(tmp_path):
+    path = str(tmp_path / 'projects.json')
+    queue = ProjectQueue(path)
+    first = queue.add('a.txt', 'images', 'out-a')
+    second = queue.add('b.txt', 'images', 'out-b', priority='high')
+    queue.update(first['id'], state='running')
+    queue.add('c.txt', 'images', 'out-c')
+    queue.update(3, state='done')
+
+    reloaded = ProjectQueue(path)
+    assert [(p['id'], p['state']) for p in reloaded.entries()] == [(first['id'], 'queued'), (second['id'], 'queued')]
+
+
+def test_write_failures_go_to_the_log(tmp_path):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    logs = []
+    queue = ProjectQueue(str(blocker / 'projects.json'), on_log=logs.append)
+    queue.add('a.txt', 'images', 'out')
+    assert len(logs) == 1 and logs[0].startswith('⚠️ Could not write project queue')
+
+
+def test_scheduler_shares_by_weight():
+    scheduler = FairScheduler()
+    scheduler.add('A', range(10), 1)
+    scheduler.add('B', range(10), 4)
+    picks = ''.join(scheduler.next()[0] for _ in range(10))
+    assert picks == 'BBABBBBABB'
+    assert scheduler.pending() == 10
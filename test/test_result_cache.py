@@ -0,0 +1,35 @@
+from result_cache import ResultCache, result_key
+
+
+def test_cached_video_is_independent_of_delivered_ones(tmp_path):
+    cache = ResultCache(root=str(tmp_path / 'cache'))
+    video = tmp_path / 'out' / 'scene_001.mp4'
+    video.parent.mkdir()
+    video.write_bytes(b'original')
+    cache.store('k', str(video))
+
+    video.write_bytes(b'edited by the user')
+    reused = tmp_path / 'other' / 'scene_001.mp4'
+    assert cache.materialize('k', str(reused))
+    assert reused.read_bytes() == b'original'
+
+    reused.write_bytes(b'edited again')
+    assert (tmp_path / 'cache' / 'k.mp4').read_bytes() == b'original'
+    assert cache.summary()['hits'] == 1 and cache.summary()['stored'] == 1
+
+
+def test_store_failures_go_to_the_log(tmp_path):
+    logs = []
+    cache = ResultCache(root=str(tmp_path / 'cache'), on_log=logs.append)
+    cache.store('k', str(tmp_path / 'missing.mp4'))
+    assert len(logs) == 1 and logs[0].startswith('⚠️ Could not cache')
+    assert not cache.materialize('k', str(tmp_path / 'dest.mp4'))
+
+
+def test_key_depends_on_the_image_bytes(tmp_path):
+    image = tmp_path / 'scene.png'
+    image.write_bytes(b'one')
+    first = result_key('prompt', str(image), '6s', '720p')
+    assert result_key('  prompt ', str(image), '6s', '720p') == first
+    image.write_bytes(b'two!')
+    assert result_key('prompt', str(image), '6s', '720p') != first
@@ -0,0 +1,51 @@
+from script_parser import ScriptParser, parse_block, split_blocks
+
+
+def scene_line(number, prompt='A fox runs through the snow'):
+    return f"Scene {number}: {prompt} | ENVIRONMENT: forest | LIGHTING: dusk | CAMERA: slow pan"
+
+
+def parse_text(text):
+    return [parse_block(block) for block in split_blocks(text)]
+
+
+def test_two_fields_in_one_segment():
+    scene, = parse_text("Scene 1: A fox | ENVIRONMENT: forest LIGHTING: dusk | CAMERA: wide\n")
+    assert scene['prompt'] == 'A fox'
+    assert (scene['environment'], scene['lighting'], scene['camera']) == ('forest', 'dusk', 'wide')
+
+
+def test_field_names_inside_values_need_a_colon():
+    scene, = parse_text("Scene 2: Rain | Sound: thunder and music Music: low drone\n")
+    assert scene['sound'] == 'thunder and music'
+    assert scene['music'] == 'low drone'
+
+
+def test_later_lines_and_done_tags():
+    text = "Scene 3 (done): Harbor at night\n| ENVIRONMENT: docks\n| ENVIRONMENT: pier\nScene 4:\nNo prompt here |\n"
+    first, second = parse_text(text)
+    assert first['isDone'] and first['environment'] == 'pier'
+    assert second['prompt'] == 'No prompt here'
+
+
+def test_large_script_reparses_only_changed_blocks(tmp_path):
+    path = tmp_path / 'script.txt'
+    lines = [scene_line(n) for n in range(1, 5001)]
+    path.write_text('\n'.join(lines), encoding='utf-8')
+    parser = ScriptParser(str(path))
+
+    scenes = parser.parse()
+    assert len(scenes) == 5000 and parser.reparsed == 5000
+    assert scenes[-1]['camera'] == 'slow pan'
+
+    assert parser.parse() is scenes and parser.reparsed == 0
+
+    lines[41] = scene_line(42, 'A fox sleeps')
+    path.write_text('\n'.join(lines), encoding='utf-8')
+    updated = parser.parse()
+    assert parser.reparsed == 1
+    assert updated[41]['prompt'] == 'A fox sleeps'
+    assert updated[:41] == scenes[:41] and updated[42:] == scenes[42:]
+
+    # The incremental result matches a parse from scratch
+    assert updated == ScriptParser(str(path)).parse()
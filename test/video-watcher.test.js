@@ -0,0 +1,151 @@
+import { test } from 'node:test';
+import assert from 'node:assert/strict';
+import { watchForVideo } from '../video-watcher.js';
+import { MockPage } from './mock-page.js';
+
+const POST_URL = 'https://grok.com/imagine/post/abc';
+const GENERATE_URL = 'https://grok.com/rest/app-chat/conversations/new';
+const progressLabel = (text) => ({ getAttribute: () => null, textContent: text });
+
+async function waitFor(watcher, timeoutMs = 1000) {
+    return watcher.wait({ timeoutMs, intervalMs: 1000 });
+}
+
+async function failureKind(promise) {
+    try {
+        await promise;
+    } catch (error) {
+        assert.equal(error.name, 'GenerationFailedError');
+        return error.kind;
+    }
+    return null;
+}
+
+test('finds a new video in the DOM', async () => {
+    const page = new MockPage(POST_URL);
+    page.dom.videos.push('https://assets.grok.com/old.mp4');
+    const watcher = watchForVideo(page, { checkMs: 10 });
+    await watcher.arm();
+    setTimeout(() => page.dom.videos.push('https://assets.grok.com/new.mp4'), 30);
+    assert.deepEqual(await waitFor(watcher), { url: 'https://assets.grok.com/new.mp4', via: 'dom' });
+    watcher.dispose();
+});
+
+test('finds a new video from its media response', async () => {
+    const page = new MockPage(POST_URL);
+    const watcher = watchForVideo(page, { checkMs: 1000 });
+    await watcher.arm();
+    setTimeout(() => {
+        page.dom.videos.push('blob:https://grok.com/1');
+        page.respond('https://assets.grok.com/new.mp4', 200, { method: 'GET', resourceType: 'media', contentType: 'video/mp4' });
+    }, 20);
+    // The <video> src must match for the response to count
+    setTimeout(() => {
+        page.dom.videos.push('https://assets.grok.com/late.mp4');
+        page.respond('https://assets.grok.com/late.mp4', 200, { method: 'GET', resourceType: 'media', contentType: 'video/mp4' });
+    }, 40);
+    assert.deepEqual(await waitFor(watcher), { url: 'https://assets.grok.com/late.mp4', via: 'network' });
+    watcher.dispose();
+});
+
+test('fails fast on a moderation toast', async () => {
+    const page = new MockPage(POST_URL);
+    const watcher = watchForVideo(page, { checkMs: 10 });
+    await watcher.arm();
+    setTimeout(() => page.dom.toasts.push('This content violates our policy'), 30);
+    assert.equal(await failureKind(waitFor(watcher, 5000)), 'moderated');
+    watcher.dispose();
+});
+
+test('classifies quota and server-error toasts', async () => {
+    for (const [text, kind] of [['Rate limit reached, try later', 'quota'], ['Something went wrong', 'server-error']]) {
+        const page = new MockPage(POST_URL);
+        const watcher = watchForVideo(page, { checkMs: 10 });
+        await watcher.arm();
+        page.dom.toasts.push(text);
+        assert.equal(await failureKind(waitFor(watcher, 5000)), kind);
+        watcher.dispose();
+    }
+});
+
+test('ignores upsells, unrelated toasts and toasts shown before arm', async () => {
+    const page = new MockPage(POST_URL);
+    page.dom.toasts.push('Something went wrong');
+    const watcher = watchForVideo(page, { checkMs: 10 });
+    await watcher.arm();
+    page.dom.toasts.push('Upgrade to SuperGrok for faster videos', 'Link copied', 'Failed to copy link');
+    assert.equal(await waitFor(watcher, 200), null);
+    watcher.dispose();
+});
+
+test('fails on an HTTP error of the generation request only', async () => {
+    const page = new MockPage(POST_URL);
+    const watcher = watchForVideo(page, { checkMs: 10 });
+    await watcher.arm();
+    page.respond('https://grok.com/rest/app-chat/like', 403);
+    page.respond('https://grok.com/rest/analytics', 500);
+    assert.equal(await waitFor(watcher, 100), null);
+
+    await watcher.arm();
+    page.respond(GENERATE_URL, 429);
+    assert.equal(await failureKind(waitFor(watcher, 5000)), 'quota');
+
+    await watcher.arm();
+    page.respond(GENERATE_URL, 502);
+    assert.equal(await failureKind(waitFor(watcher, 5000)), 'server-error');
+
+    await watcher.arm();
+    page.respond(GENERATE_URL, 400);
+    assert.equal(await failureKind(waitFor(watcher, 5000)), 'rejected');
+    watcher.dispose();
+});
+
+test('fails when the page leaves the post', async () => {
+    const page = new MockPage(POST_URL);
+    const watcher = watchForVideo(page, { checkMs: 10 });
+    await watcher.arm();
+    setTimeout(() => page.navigate('https://grok.com/imagine'), 20);
+    assert.equal(await failureKind(waitFor(watcher, 5000)), 'navigated');
+    watcher.dispose();
+});
+
+test('moving onto a post is not a failure', async () => {
+    const page = new MockPage('https://grok.com/imagine');
+    const watcher = watchForVideo(page, { checkMs: 10 });
+    await watcher.arm();
+    page.navigate(POST_URL);
+    assert.equal(await waitFor(watcher, 100), null);
+    watcher.dispose();
+});
+
+test('fails when the progress indicator goes away without a video', async () => {
+    const page = new MockPage(POST_URL);
+    page.dom.progress.push(progressLabel('42%'));
+    const watcher = watchForVideo(page, { checkMs: 10 });
+    await watcher.arm();
+    setTimeout(() => { page.dom.progress = []; }, 50);
+    assert.equal(await failureKind(waitFor(watcher, 5000)), 'progress-lost');
+    watcher.dispose();
+});
+
+test('fails when the tab crashes', async () => {
+    const page = new MockPage(POST_URL);
+    const watcher = watchForVideo(page, { checkMs: 1000 });
+    await watcher.arm();
+    setTimeout(() => page.emit('crash'), 20);
+    assert.equal(await failureKind(waitFor(watcher, 5000)), 'page-crashed');
+    watcher.dispose();
+});
+
+test('arming again drops an earlier failure', async () => {
+    const page = new MockPage(POST_URL);
+    const watcher = watchForVideo(page, { checkMs: 10 });
+    await watcher.arm();
+    page.navigate('https://grok.com/imagine');
+    assert.equal(await failureKind(waitFor(watcher, 5000)), 'navigated');
+
+    await watcher.arm();
+    setTimeout(() => page.dom.videos.push('https://assets.grok.com/new.mp4'), 20);
+    assert.deepEqual(await waitFor(watcher), { url: 'https://assets.grok.com/new.mp4', via: 'dom' });
+    watcher.dispose();
+});
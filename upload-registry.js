@@ -0,0 +1,80 @@
+import fs from 'fs';
+import path from 'path';
+
+/**
+ * Posts created by image uploads, per account.
+ *
+ * Uploading an image to Grok Imagine creates an /imagine/post/<id> page that
+ * can generate any number of videos from that image. The registry maps the
+ * image's SHA-256 to that post, so a retry or another scene with the same
+ * keyframe reopens the post and only enters its prompt instead of uploading
+ * again. Posts belong to the account that uploaded them: keep one registry
+ * file per Chrome profile (the default lives in that worker's download dir).
+ *
+ * File layout: { "<sha256>": { postUrl, uploadedAt, usedAt } }, written with
+ * temp file + rename. Jobs of one worker share the object in memory.
+ */
+
+const DEFAULT_MAX_AGE_MS = 7 * 24 * 60 * 60 * 1000;
+
+export class UploadRegistry {
+    /**
+     * @param {string} filePath - Registry JSON file
+     * @param {Object} options - { maxAgeMs } older uploads are not reused
+     */
+    constructor(filePath, { maxAgeMs = DEFAULT_MAX_AGE_MS } = {}) {
+        this.filePath = filePath;
+        this.maxAgeMs = maxAgeMs;
+        this.entries = {};
+        try {
+            this.entries = JSON.parse(fs.readFileSync(filePath, 'utf-8'));
+        } catch (error) {
+            // Missing or unreadable: start empty
+        }
+    }
+
+    /**
+     * @param {string} imageHash - SHA-256 of the image bytes
+     * @returns {Object|null} { postUrl, uploadedAt, usedAt }, or null when unknown or too old
+     */
+    get(imageHash) {
+        const entry = this.entries[imageHash];
+        if (!entry || !entry.postUrl) return null;
+        if (!(Date.now() - Date.parse(entry.uploadedAt) < this.maxAgeMs)) return null;
+        return entry;
+    }
+
+    /**
+     * Remember the post an upload of this image created (or was reused for)
+     * @param {string} imageHash - SHA-256 of the image bytes
+     * @param {string} postUrl - /imagine/post/ URL
+     */
+    set(imageHash, postUrl) {
+        const now = new Date().toISOString();
+        const known = this.entries[imageHash];
+        const uploadedAt = known && known.postUrl === postUrl ? known.uploadedAt : now;
+        this.entries[imageHash] = { postUrl, uploadedAt, usedAt: now };
+        this.save();
+    }
+
+    /**
+     * Forget a post that could not be reopened
+     * @param {string} imageHash - SHA-256 of the image bytes
+     */
+    delete(imageHash) {
+        if (!(imageHash in this.entries)) return;
+        delete this.entries[imageHash];
+        this.save();
+    }
+
+    save() {
+        try {
+            fs.mkdirSync(path.dirname(this.filePath), { recursive: true });
+            const tempPath = `${this.filePath}.${process.pid}.tmp`;
+            fs.writeFileSync(tempPath, JSON.stringify(this.entries, null, 2));
+            fs.renameSync(tempPath, this.filePath);
+        } catch (error) {
+            console.error(`⚠️ Could not write upload registry ${this.filePath}: ${error.message}`);
+        }
+    }
+}
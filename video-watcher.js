@@ -0,0 +1,304 @@
+/**
+ * Detects the generated video of one job on a Grok page.
+ *
+ * The primary signal is the page's own network traffic: the moment the page
+ * requests an mp4 / video response for a <video> element that was not there
+ * before submit, the job is done. A slow DOM scan runs as a fallback for
+ * videos that never show up as a media response (e.g. served from cache).
+ *
+ * Usage:
+ *   const watcher = watchForVideo(page);   // before the flow starts
+ *   await watcher.arm();                   // right before submitting
+ *   const found = await watcher.wait({ timeoutMs, intervalMs, onTick });
+ *   watcher.dispose();
+ *
+ * When resuming a job that was submitted by an earlier process, arm() takes the
+ * video srcs recorded at that submit instead of scanning the page, so a video
+ * that finished in the meantime is detected as soon as the post is reopened.
+ *
+ * Once armed, the watcher also looks for signs that no video is coming: an
+ * error toast, an HTTP error on a generation request sent after submit, the
+ * page leaving the post (or Grok Imagine), a progress indicator that went away
+ * without a video, or the page crashing. wait() then throws a
+ * GenerationFailedError whose kind classifies the failure, within seconds
+ * instead of at the end of the timeout.
+ */
+
+export const FAILURE_CHECK_MS = 2000; // Page probe interval while waiting
+const PROGRESS_LOST_CHECKS = 5; // Probes without the progress indicator (and no video) before giving up
+
+// Toasts and alerts; only ones that appear after arm() count
+export const TOAST_SELECTOR = '[role="alert"], [data-sonner-toast]';
+
+// Generation progress: a progressbar, or a busy / progress element showing "NN%".
+// Only these few elements are looked at, never the whole document.
+export const PROGRESS_SELECTOR = '[role="progressbar"], [aria-busy="true"], [class*="progress" i]';
+
+// Toast texts that end a generation. First match wins, so the specific messages
+// go before the generic ones; anything else (upsells, copy confirmations) is ignored.
+const FAILURE_TEXTS = [
+    { kind: 'moderated', pattern: /moderat|content polic|violat|not allowed|unable to generate|can't generate/i },
+    { kind: 'quota', pattern: /rate limit|limit reached|too many requests|quota/i },
+    { kind: 'server-error', pattern: /something went wrong|generation failed|failed to generate|internal (server )?error|try again later/i }
+];
+
+// The request that starts a generation. HTTP errors on other REST calls
+// (likes, history, analytics) say nothing about the video.
+const GENERATION_REQUEST = /grok\.com\/rest\/app-chat\/conversations\/new(\?|$)/i;
+
+export class GenerationFailedError extends Error {
+    /**
+     * @param {string} kind - moderated | quota | server-error | rejected | navigated |
+     *   progress-lost | page-crashed
+     * @param {string} message - What was seen
+     */
+    constructor(kind, message) {
+        super(`Generation failed (${kind}): ${message}`);
+        this.name = 'GenerationFailedError';
+        this.kind = kind;
+    }
+}
+
+/**
+ * Whether a network response looks like a video asset
+ * @param {Object} response - Playwright response
+ * @returns {boolean}
+ */
+function isVideoResponse(response) {
+    const url = response.url();
+    if (!url.startsWith('http') || response.status() >= 400) return false;
+
+    const contentType = response.headers()['content-type'] || '';
+    return response.request().resourceType() === 'media' ||
+        contentType.startsWith('video/') ||
+        /\.mp4(\?|$)/i.test(url);
+}
+
+/**
+ * Start watching a page for a newly generated video
+ * @param {Object} page - Playwright page
+ * @param {Object} options - { checkMs } page probe interval (FAILURE_CHECK_MS)
+ * @returns {Object} { arm, wait, dispose }
+ */
+export function watchForVideo(page, { checkMs = FAILURE_CHECK_MS } = {}) {
+    const known = new Set(); // Video URLs that existed before submit
+    const knownAlerts = new Set(); // Toast texts that were already showing at arm()
+    const sentAfterArm = new WeakSet(); // Requests issued since arm()
+    let armed = false;
+    let found = null;
+    let failure = null;
+    let wake = null;
+    let lastUrl = page.url();
+    let progressSeen = false;
+    let progressMissing = 0;
+
+    const resolveFound = (url, via) => {
+        if (found || failure) return;
+        found = { url, via };
+        if (wake) wake();
+    };
+
+    const fail = (kind, message) => {
+        if (found || failure) return;
+        failure = { kind, message };
+        if (wake) wake();
+    };
+
+    const onRequest = (request) => {
+        if (armed) sentAfterArm.add(request);
+    };
+
+    /**
+     * Leaving a post, or Grok Imagine altogether, means the generation was dropped.
+     * Moving onto a post is fine (text-to-video and resumed jobs do that).
+     * @param {string} url - Page URL now
+     */
+    const checkUrl = (url) => {
+        const previous = lastUrl;
+        lastUrl = url;
+        if (!armed || url === previous) return;
+        if ((previous.includes('/imagine/post/') && !url.includes('/imagine/post/')) ||
+            (previous.includes('grok.com/imagine') && !url.includes('grok.com/imagine'))) {
+            fail('navigated', `page moved from ${previous} to ${url}`);
+        }
+    };
+
+    const onNavigated = (frame) => {
+        if (frame === page.mainFrame()) checkUrl(frame.url());
+    };
+
+    const onCrash = () => {
+        if (armed) fail('page-crashed', 'the tab crashed or was closed');
+    };
+
+    const checkGenerationResponse = (response) => {
+        const request = response.request();
+        const status = response.status();
+        if (status < 400 || !sentAfterArm.has(request) || request.method() !== 'POST' ||
+            !GENERATION_REQUEST.test(response.url())) {
+            return;
+        }
+        const kind = status === 429 ? 'quota' : status >= 500 ? 'server-error' : 'rejected';
+        fail(kind, `HTTP ${status} from ${response.url()}`);
+    };
+
+    const onResponse = async (response) => {
+        if (armed && !found) checkGenerationResponse(response);
+        if (found || !isVideoResponse(response)) return;
+
+        const url = response.url();
+        if (!armed) {
+            known.add(url);
+            return;
+        }
+        if (known.has(url)) return;
+
+        // Only a <video> element on this page counts, not previews fetched elsewhere
+        try {
+            const attached = await page.evaluate((src) =>
+                Array.from(document.querySelectorAll('video')).some(v => v.src === src || v.currentSrc === src),
+                url
+            );
+            if (attached) resolveFound(url, 'network');
+        } catch (e) { }
+    };
+
+    page.on('request', onRequest);
+    page.on('response', onResponse);
+    page.on('framenavigated', onNavigated);
+    page.on('crash', onCrash);
+    page.on('close', onCrash);
+
+    /**
+     * One look at the page: video srcs, toast texts and whether a progress indicator shows
+     * @returns {Object} { videos, alerts, progress }
+     */
+    async function probePage() {
+        return page.evaluate(({ toastSelector, progressSelector }) => ({
+            videos: Array.from(document.querySelectorAll('video'))
+                .map(v => v.src)
+                .filter(src => src && !src.startsWith('blob:')),
+            alerts: Array.from(document.querySelectorAll(toastSelector))
+                .map(el => (el.innerText || '').trim())
+                .filter(Boolean),
+            progress: Array.from(document.querySelectorAll(progressSelector)).some(el =>
+                el.getAttribute('role') === 'progressbar' || el.getAttribute('aria-busy') === 'true' ||
+                /\b\d{1,3}%/.test(el.textContent || ''))
+        }), { toastSelector: TOAST_SELECTOR, progressSelector: PROGRESS_SELECTOR });
+    }
+
+    /**
+     * Probe the page: report a new video, or a failure state if one shows
+     */
+    async function checkPage() {
+        checkUrl(page.url());
+        const state = await probePage();
+
+        const src = state.videos.find(s => !known.has(s));
+        if (src) {
+            resolveFound(src, 'dom');
+            return;
+        }
+
+        for (const text of state.alerts) {
+            if (knownAlerts.has(text)) continue;
+            const match = FAILURE_TEXTS.find(f => f.pattern.test(text));
+            if (match) {
+                fail(match.kind, text.split('\n')[0].slice(0, 200));
+                return;
+            }
+        }
+
+        if (state.progress) {
+            progressSeen = true;
+            progressMissing = 0;
+        } else if (progressSeen && ++progressMissing >= PROGRESS_LOST_CHECKS) {
+            fail('progress-lost', 'the progress indicator went away without a video');
+        }
+    }
+
+    return {
+        /**
+         * Snapshot the videos already on the page; call right before submit.
+         * Arming again starts a new wait: an earlier result or failure is dropped.
+         * @param {Array<string>} knownSources - Srcs recorded at an earlier submit
+         *   (resume); when given, the page is not scanned
+         */
+        async arm(knownSources = null) {
+            armed = false;
+            found = null;
+            failure = null;
+            progressSeen = false;
+            progressMissing = 0;
+            const sources = knownSources || await page.evaluate(() =>
+                Array.from(document.querySelectorAll('video')).map(v => v.src)
+            ).catch(() => []);
+            sources.forEach(src => known.add(src));
+            const alerts = await page.evaluate((toastSelector) =>
+                Array.from(document.querySelectorAll(toastSelector)).map(el => (el.innerText || '').trim()),
+            TOAST_SELECTOR).catch(() => []);
+            alerts.forEach(text => knownAlerts.add(text));
+            lastUrl = page.url();
+            armed = true;
+        },
+
+        /**
+         * @returns {Array<string>} Video srcs that are not the job's result
+         */
+        knownSources() {
+            return [...known];
+        },
+
+        /**
+         * Wait for the new video. The page is probed every checkMs;
+         * onTick fires every intervalMs.
+         * @param {Object} options - { timeoutMs, intervalMs, onTick(attempt) }
+         * @returns {Object|null} { url, via: 'network' | 'dom' } or null on timeout
+         * @throws {GenerationFailedError} When the page shows the generation failed
+         */
+        async wait({ timeoutMs, intervalMs, onTick }) {
+            const deadline = Date.now() + timeoutMs;
+            let nextTick = Date.now() + intervalMs;
+            let attempt = 0;
+
+            while (!found && !failure && Date.now() < deadline) {
+                await new Promise(resolve => {
+                    const timer = setTimeout(resolve, Math.min(checkMs, deadline - Date.now()));
+                    wake = () => {
+                        clearTimeout(timer);
+                        resolve();
+                    };
+                });
+                wake = null;
+                if (found || failure) break;
+
+                if (Date.now() >= nextTick) {
+                    attempt++;
+                    nextTick += intervalMs;
+                    if (onTick) onTick(attempt);
+                }
+
+                try {
+                    await checkPage();
+                } catch (error) {
+                    // Mid-navigation the page cannot be evaluated; the URL check covers that
+                    if (page.isClosed()) onCrash();
+                }
+            }
+
+            if (!found && failure) {
+                throw new GenerationFailedError(failure.kind, failure.message);
+            }
+            return found;
+        },
+
+        dispose() {
+            page.off('request', onRequest);
+            page.off('response', onResponse);
+            page.off('framenavigated', onNavigated);
+            page.off('crash', onCrash);
+            page.off('close', onCrash);
+            if (wake) wake();
+        }
+    };
+}